@@ -0,0 +1,293 @@
+"""Throughput and memory benchmarks
+
+Run with ``python -m benchmarks.suite``. Every case reports its rate, in
+ant-ticks or cells per second, and the peak memory traced by tracemalloc
+while it was built and run. Results are written to JSON and, if there is a
+baseline, compared with it: a case more than ``tolerance`` slower or
+bigger than the baseline is a regression and the run exits with status 1.
+Save a baseline on the machine the comparisons are made on with
+``--save-baseline``.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from core.ant import Ant, Chemicals, Location, Nest, \
+    search_state_no_advoidance, \
+    search_state_with_avoidance, search_with_avoidance_and_jumps
+from core.colony import Colony
+from core.lattice import PeriodicLattice
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+SEARCH_STRATEGIES = {
+    'no_avoidance': search_state_no_advoidance,
+    'avoidance': search_state_with_avoidance,
+    'avoidance_and_jumps': search_with_avoidance_and_jumps,
+}
+# The return and gather paths are benchmarked through the default search
+# strategy, with every ant carrying food or sensing found chemical.
+PATHS = tuple(SEARCH_STRATEGIES) + ('return', 'gather')
+
+ANT_COUNTS = (10, 100, 1000)
+COLONY_COUNTS = (1000, 10000, 100000)
+GRIDS = ((50, 50), (500, 500), (2000, 2000))
+
+# The coefficients of the diffusing chemicals case
+DIFFUSION = {'search': 0.05, 'found': 0.05}
+
+
+def ants_case(path, n_ants, size):
+    nest = Nest(size[0] // 2, size[1] // 2)
+    chemicals = _chemicals(path, size)
+    ants = [Ant(nest=nest, chemicals=chemicals) for _ in range(n_ants)]
+    for ant in ants:
+        ant.search_strategy = SEARCH_STRATEGIES.get(
+            path,
+            search_state_with_avoidance
+        )
+        if path == 'return':
+            ant.food = 1
+            ant.location = nest + Location(size[0] // 4, 0)
+
+    def step():
+        for ant in ants:
+            ant.tick()
+    return step, n_ants
+
+
+def colony_case(path, n_ants, size):
+    nest = Nest(size[0] // 2, size[1] // 2)
+    colony = Colony(
+        nest=nest,
+        chemicals=_chemicals(path, size),
+        n_ants=n_ants,
+        search_strategy=SEARCH_STRATEGIES.get(
+            path,
+            search_state_with_avoidance
+        ),
+        seed=1
+    )
+    if path == 'return':
+        colony.food[:] = 1
+        colony.x += size[0] // 4
+    return colony.tick, n_ants
+
+
+def chemicals_case(lazy_decay, size, diffusion=None):
+    chemicals = Chemicals(
+        size=size,
+        lazy_decay=lazy_decay,
+        diffusion=diffusion
+    )
+    return chemicals.tick, size[0] * size[1]
+
+
+def indexing_case(size):
+    lattice = PeriodicLattice(np.zeros(size))
+    cells = [(x, -x) for x in range(-50, 50)]
+
+    def step():
+        for x, y in cells:
+            lattice[x, y] = lattice[x, y] + 1
+    return step, len(cells)
+
+
+def _chemicals(path, size):
+    chemicals = Chemicals(size=size)
+    if path == 'gather':
+        chemicals.found += 1.0
+    return chemicals
+
+
+def cases(quick=False):
+    """Yields the name, parameters, unit and setup of every case"""
+    ant_counts = ANT_COUNTS[1:2] if quick else ANT_COUNTS
+    colony_counts = COLONY_COUNTS[1:2] if quick else COLONY_COUNTS
+    grids = GRIDS[1:2] if quick else GRIDS
+
+    for path, n_ants, size in itertools.product(PATHS, ant_counts, grids):
+        yield (
+            'ants/{}/{}/{}x{}'.format(path, n_ants, *size),
+            {'path': path, 'n_ants': n_ants, 'size': size},
+            'ant-ticks/s',
+            lambda path=path, n_ants=n_ants, size=size:
+                ants_case(path, n_ants, size)
+        )
+    for path, n_ants, size in itertools.product(PATHS, colony_counts, grids):
+        yield (
+            'colony/{}/{}/{}x{}'.format(path, n_ants, *size),
+            {'path': path, 'n_ants': n_ants, 'size': size},
+            'ant-ticks/s',
+            lambda path=path, n_ants=n_ants, size=size:
+                colony_case(path, n_ants, size)
+        )
+    for lazy_decay, size in itertools.product((False, True), grids):
+        yield (
+            'chemicals/{}/{}x{}'.format(
+                'lazy' if lazy_decay else 'dense',
+                *size
+            ),
+            {'lazy_decay': lazy_decay, 'size': size},
+            'cells/s',
+            lambda lazy_decay=lazy_decay, size=size:
+                chemicals_case(lazy_decay, size)
+        )
+    for size in grids:
+        yield (
+            'chemicals/diffusing/{}x{}'.format(*size),
+            {'diffusion': DIFFUSION, 'size': size},
+            'cells/s',
+            lambda size=size: chemicals_case(False, size, DIFFUSION)
+        )
+    yield (
+        'lattice/indexing',
+        {'size': (500, 500)},
+        'cells/s',
+        lambda: indexing_case((500, 500))
+    )
+
+
+def measure(setup, min_time=0.2, warmup=1):
+    """Returns the rate of a case in units per second and its peak memory
+
+    setup returns the step to time and the units of work of one step. The
+    step is timed in a loop of at least min_time seconds, after warmup
+    untimed steps. Memory is traced over a separate setup and step, as
+    tracing slows everything down.
+    """
+    tracemalloc.start()
+    step, units = setup()
+    step()
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del step
+
+    step, units = setup()
+    for _ in range(warmup):
+        step()
+    steps = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        step()
+        steps += 1
+        elapsed = time.perf_counter() - start
+    return units * steps / elapsed, peak_bytes
+
+
+def run(quick=False, min_time=0.2, pattern=None, log=None):
+    results = {}
+    for name, params, unit, setup in cases(quick):
+        if pattern is not None and pattern not in name:
+            continue
+        rate, peak_bytes = measure(setup, min_time=min_time)
+        results[name] = {
+            'rate': rate,
+            'unit': unit,
+            'peak_bytes': peak_bytes,
+            'params': params,
+        }
+        if log is not None:
+            log('{:<45} {:>14.4g} {:<12} {:>10.3g} MB'.format(
+                name,
+                rate,
+                unit,
+                peak_bytes / 1e6
+            ))
+    return {
+        'machine': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'max_rss_bytes': _max_rss_bytes(),
+        },
+        'results': results,
+    }
+
+
+def compare(results, baseline, tolerance=0.2):
+    """Returns a message for every case that regressed against baseline
+
+    A case regresses if its rate fell below ``1 - tolerance`` times the
+    baseline rate or its peak memory rose above ``1 + tolerance`` times the
+    baseline peak. Cases missing from either side are skipped.
+    """
+    regressions = []
+    for name, result in sorted(results['results'].items()):
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        if result['rate'] < (1 - tolerance) * base['rate']:
+            regressions.append('{}: {:.4g} {} is slower than {:.4g}'.format(
+                name,
+                result['rate'],
+                result['unit'],
+                base['rate']
+            ))
+        if result['peak_bytes'] > (1 + tolerance) * base['peak_bytes']:
+            regressions.append(
+                '{}: {} peak bytes is more than {}'.format(
+                    name,
+                    result['peak_bytes'],
+                    base['peak_bytes']
+                )
+            )
+    return regressions
+
+
+def _max_rss_bytes():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quick', action='store_true',
+                        help='one ant count and grid size per case')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='seconds to time each case for')
+    parser.add_argument('-k', dest='pattern',
+                        help='only run cases whose name contains this')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store the results as the baseline')
+    args = parser.parse_args(argv)
+
+    results = run(
+        quick=args.quick,
+        min_time=args.min_time,
+        pattern=args.pattern,
+        log=print
+    )
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('No baseline at {}, nothing to compare'.format(args.baseline))
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print('REGRESSION', regression)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
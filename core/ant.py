@@ -1,9 +1,20 @@
 import logging
-import random
+import os
 from collections import namedtuple
 
 import numpy as np
 
+from core.coverage import Coverage
+from core.deposits import DepositBuffer, DEPOSIT_MODES, IMMEDIATE, \
+    SYNCHRONOUS
+from core.diffusion import Diffusion
+from core.food import FoodSources
+from core.history import TimeSeries
+from core.nests import HOME_RADIUS, NestMap
+from core.trails import TrackedLattice
+from core import streams
+from core.lattice import PeriodicLattice, HaloLattice, LazyDecayLattice, \
+    TiledLattice, MappedLattice, PERIODIC
 
 logging.basicConfig()
 logger = logging.getLogger(__name__)
@@ -11,6 +22,8 @@ logger = logging.getLogger(__name__)
 
 class Location(object):
 
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
@@ -50,8 +63,13 @@ class Location(object):
         self.x = location.x
         self.y = location.y
 
+    def step(self, direction):
+        """Moves one cell in place along a direction code"""
+        self.x += DIRECTION_X[direction]
+        self.y += DIRECTION_Y[direction]
+
     def __hash__(self):
-        return hash('{}_{}'.format(self.x, self.y))
+        return hash((self.x, self.y))
 
 
 
@@ -92,6 +110,36 @@ OBOSITE_DIRECTIONS = {
     NW: SE,
 }
 
+# Directions are also encoded as codes 0..7, their index in DIRECTIONS.
+# The tuples are for per-ant code and the arrays for vectorised code.
+DIRECTION_CODES = {(d.x, d.y): code for code, d in enumerate(DIRECTIONS)}
+
+DIRECTION_X = tuple(d.x for d in DIRECTIONS)
+DIRECTION_Y = tuple(d.y for d in DIRECTIONS)
+FORWARD_DIRECTIONS = tuple(
+    tuple(DIRECTIONS.index(p) for p in POSIBLE_DIRECTIONS[d])
+    for d in DIRECTIONS
+)
+OPPOSITE_DIRECTIONS = tuple(
+    DIRECTIONS.index(OBOSITE_DIRECTIONS[d]) for d in DIRECTIONS
+)
+
+DIRECTION_DX = np.array(DIRECTION_X)
+DIRECTION_DY = np.array(DIRECTION_Y)
+FORWARD_CONES = np.array(FORWARD_DIRECTIONS)
+OPPOSITES = np.array(OPPOSITE_DIRECTIONS)
+
+# Offsets of the three forward cells for every direction code
+CONE_DX = DIRECTION_DX[FORWARD_CONES]
+CONE_DY = DIRECTION_DY[FORWARD_CONES]
+
+
+def direction_code(direction):
+    """Returns the code of a direction given as a Location or a code"""
+    if isinstance(direction, Location):
+        return DIRECTION_CODES[direction.x, direction.y]
+    return direction
+
 MAX_X = MAX_Y = 500
 
 MAX_FOOD = 1.0
@@ -101,39 +149,368 @@ MIN_CHEMICAL = 1 / MAX_CHEMICAL_TIME
 
 
 class Chemicals(object):
+    """The search, found and food fields of a world.
+
+    By default each field is a ``PeriodicLattice``. Passing a ``boundary``
+    ('periodic', 'reflecting' or 'absorbing') stores each field in a
+    ``HaloLattice`` with ``halo`` ghost cells instead, synced once per tick.
+    With ``lazy_decay`` the search and found fields are LazyDecayLattices,
+    whose decay costs O(1) rather than a pass over the whole grid. With a
+    ``tile_size`` each field is a sparse TiledLattice, whose memory grows
+    with the area the ants have visited rather than with the size.
+    With ``food_sources`` the food field is a FoodSources, a set of food
+    sources replenished by ``tick``.
+
+    With ``replicas`` each field is a stack of that many independent
+    grids, of shape ``(replicas,) + size``, for running an ensemble of
+    colonies in one ``Colony``.
+
+    With a ``memmap_dir`` each field is a MappedLattice stored in
+    ``<name>.dat`` in that directory, for worlds larger than memory, and
+    ``flush_fields`` writes a snapshot of them there. Fields already in
+    the directory, such as a snapshot, are opened rather than created.
+    It needs the default lattices, no diffusion and no trail tables.
+
+    ``nests`` is the NestMap of the home zones of every nest in the world.
+    With ``track_coverage``, ``coverage`` is a Coverage of the cells the
+    ants have visited, and None otherwise.
+
+    ``diffusion`` maps 'search' and 'found' to the coefficient each
+    chemical diffuses with on every ``tick``, after decaying. It needs the
+    default PeriodicLattices.
+
+    The chemicals named in ``trail_tables``, of 'search' and 'found', are
+    TrackedLattices, so a Colony looks up where their trails lead rather
+    than sensing them. They need the default lattices and no diffusion,
+    which changes every cell on every tick. The search chemical changes
+    under every ant on every tick, so it seldom gains from one.
+
+    Ants add their chemicals through ``deposit``. With ``deposits``
+    'immediate' every deposit is written at once, so later ants in a tick
+    sense the deposits of earlier ones. With 'end_of_tick' they are
+    collected in ``pending``, a DepositBuffer, and applied together at the
+    start of the next ``tick``, before decaying, so every ant of a tick
+    senses the chemicals as they were when it started. With
+    'synchronous' the food ants take and drop is collected as well, and
+    everything applied in an order of its own, so a tick of ants that
+    each have their own random stream gives the same results bit for bit
+    whatever the order of the ants. ``pending`` is None for immediate
+    deposits. A Colony adds the deposits of all its ants with one
+    ``scatter_add`` per tick either way.
+    """
 
     decay_rate = 0.001
+    min_chemical = 0.01
+    max_chemical = MAX_SEARCH
+
+    def __init__(
+        self,
+        size=(MAX_X, MAX_Y),
+        boundary=None,
+        halo=1,
+        lazy_decay=False,
+        replicas=None,
+        tile_size=None,
+        food_sources=False,
+        track_coverage=False,
+        diffusion=None,
+        trail_tables=(),
+        deposits=IMMEDIATE,
+        memmap_dir=None
+    ):
+        if lazy_decay and boundary is not None:
+            raise ValueError('lazy_decay does not support a boundary')
+        if replicas is not None and (lazy_decay or boundary is not None):
+            raise ValueError(
+                'replicas support neither a boundary nor lazy_decay'
+            )
+        if tile_size is not None and (
+            lazy_decay or boundary is not None or replicas is not None
+        ):
+            raise ValueError(
+                'tile_size supports no boundary, lazy_decay or replicas'
+            )
+        if deposits not in DEPOSIT_MODES:
+            raise ValueError('Unknown deposits: {}'.format(deposits))
+        if deposits != IMMEDIATE and (
+            replicas is not None or boundary not in (None, 'periodic')
+        ):
+            raise ValueError(
+                'Deferred deposits support no replicas and only a periodic '
+                'boundary'
+            )
+        if memmap_dir is not None and (
+            lazy_decay or boundary is not None or tile_size is not None
+            or diffusion or trail_tables
+        ):
+            raise ValueError(
+                'memmap_dir needs the default lattices, without diffusion '
+                'or trail_tables'
+            )
+        self.size = tuple(size)
+        self.replicas = replicas
+        self.memmap_dir = memmap_dir
+        self.pending = None
+        if deposits != IMMEDIATE:
+            self.pending = DepositBuffer(synchronous=deposits == SYNCHRONOUS)
+        self.nests = NestMap(self.size)
+        self.coverage = None
+        if track_coverage:
+            self.coverage = Coverage(self.size, replicas=replicas)
+        if replicas is not None:
+            size = (replicas,) + self.size
+        self.diffusion = {}
+        for name, coefficient in (diffusion or {}).items():
+            if name not in ('search', 'found'):
+                raise ValueError('Only search and found can diffuse')
+            if lazy_decay or boundary is not None or tile_size is not None:
+                raise ValueError('diffusion needs the default lattices')
+            self.diffusion[name] = Diffusion(size, coefficient)
+        for name in trail_tables:
+            if name not in ('search', 'found'):
+                raise ValueError('Only search and found have trail tables')
+            if lazy_decay or boundary is not None or tile_size is not None:
+                raise ValueError('trail_tables need the default lattices')
+            if self.diffusion:
+                raise ValueError('trail_tables do not support diffusion')
+        for name in ('search', 'found'):
+            if name in trail_tables:
+                lattice = TrackedLattice(np.zeros(size))
+            elif memmap_dir is not None:
+                lattice = self._mapped(name, size)
+            else:
+                lattice = self._lattice(
+                    size, boundary, halo, lazy_decay, tile_size
+                )
+            setattr(self, name, lattice)
+        if food_sources:
+            if boundary is not None:
+                raise ValueError('food_sources does not support a boundary')
+            self.food = FoodSources(size)
+        elif memmap_dir is not None:
+            self.food = self._mapped('food', size)
+        else:
+            self.food = self._lattice(
+                size, boundary, halo, tile_size=tile_size
+            )
 
-    def __init__(self, size=(MAX_X, MAX_Y)):
-        self.search = PeriodicLattice(np.zeros(size))
-        self.found = PeriodicLattice(np.zeros(size))
-        self.food = PeriodicLattice(np.zeros(size))
+    def _mapped(self, name, size):
+        os.makedirs(self.memmap_dir, exist_ok=True)
+        path = os.path.join(self.memmap_dir, '{}.dat'.format(name))
+        return MappedLattice(path, size)
+
+    @staticmethod
+    def _lattice(size, boundary, halo, lazy_decay=False, tile_size=None):
+        if tile_size is not None:
+            return TiledLattice(size, tile_size=tile_size)
+        if lazy_decay:
+            return LazyDecayLattice(np.zeros(size))
+        if boundary is None:
+            return PeriodicLattice(np.zeros(size))
+        return HaloLattice(np.zeros(size), halo=halo, boundary=boundary)
+
+    def tick(self, rows=None):
+        """Decays and diffuses the search and found chemicals, only
+        decaying the rows x in the slice rows if given, which needs the
+        default lattices and no diffusion"""
+        if rows is not None and type(self.search) is not PeriodicLattice:
+            raise ValueError('Only PeriodicLattices can decay by rows')
+        if rows is not None and self.diffusion:
+            raise ValueError('Diffusion can not be split by rows')
+        self.flush()
+        for chemical in (self.search, self.found):
+            if rows is not None:
+                chemical = chemical[rows]
+            chemical.decay(
+                1 - self.decay_rate,
+                a_min=self.min_chemical,
+                a_max=self.max_chemical
+            )
+        self.diffuse()
+        if isinstance(self.food, HaloLattice):
+            self.food.sync()
+        elif isinstance(self.food, FoodSources):
+            self.food.tick()
+        if self.coverage is not None:
+            self.coverage.tick()
+
+    def deposit(self, channel, x, y, amount):
+        """Adds amount to the chemical channel, 'search' or 'found', at
+        x, y, now or when flushed"""
+        if self.pending is None:
+            getattr(self, channel)[x, y] += amount
+        else:
+            self.pending.add(channel, x, y, amount)
 
-    def tick(self):
-        self.search *= (1 - self.decay_rate)
-        self.found *= (1 - self.decay_rate)
+    @property
+    def synchronous(self):
+        return self.pending is not None and self.pending.synchronous
+
+    def flush(self):
+        """Applies the pending deposits"""
+        if self.pending is not None:
+            self.pending.flush(self)
+
+    def flush_fields(self):
+        """Writes the fields stored in memmap_dir to their files"""
+        for name in ('search', 'found', 'food'):
+            field = getattr(self, name)
+            if isinstance(field, MappedLattice):
+                field.flush()
+
+    def diffuse(self, steps=1):
+        """Diffuses the chemicals that diffuse for steps ticks, without
+        decaying them"""
+        for name, diffusion in self.diffusion.items():
+            diffusion(getattr(self, name), steps=steps)
+
+    def sense(self, chemical, x, y, direction, replica=None):
+        """Returns the chemical at the forward cone of many ants at once
+
+        x, y and direction are scalars or arrays of positions and direction
+        codes and the result has one extra trailing axis of length 3, in
+        the order of FORWARD_DIRECTIONS. chemical is any lattice with a
+        ``gather`` method, such as ``self.search``. With replicas, replica
+        gives the replica each ant lives in. With a reflecting or absorbing
+        boundary, cones past an edge are read through the ghost cells, as
+        scalar indexes are.
+        """
+        width, height = self.size
+        if type(x) is not int:
+            x = np.asarray(x)[..., None]
+        if type(y) is not int:
+            y = np.asarray(y)[..., None]
+        x = x + CONE_DX[direction]
+        y = y + CONE_DY[direction]
+        if not self._bounded:
+            x %= width
+            y %= height
+        if replica is None:
+            return chemical.gather(x, y)
+        return chemical.gather(x, y, replica=np.asarray(replica)[..., None])
+
+    @property
+    def _bounded(self):
+        """Whether the fields are HaloLattices with a reflecting or
+        absorbing boundary, whose ``gather`` takes cells past the edges"""
+        return getattr(self.search, 'boundary', PERIODIC) != PERIODIC
+
+    def cell(self, x, y):
+        """Returns the index of cell x, y, in every replica if there are
+        replicas"""
+        width, height = self.size
+        if self.replicas is None:
+            return x % width, y % height
+        return slice(None), x % width, y % height
+
+    def channel(self, name):
+        """Returns a lazy CompositeField of one chemical"""
+        return CompositeField(self, {name: 1.0})
+
+    def combine(self, **weights):
+        """Returns a lazy weighted sum of chemicals, e.g.
+        ``combine(search=1.0, found=-1.0)`` for search - found"""
+        return CompositeField(self, weights)
+
+
+class CompositeField(object):
+    """A weighted sum of the chemicals of a Chemicals instance
+
+    Nothing is computed up front, the chemicals are only read at the cells
+    asked for by ``gather`` or indexing, so sensing a composite field costs
+    the same whatever the size of the grid. Composite fields can be added,
+    subtracted and scaled to build new ones.
+    """
+
+    def __init__(self, chemicals, weights):
+        self.chemicals = chemicals
+        self.weights = dict(weights)
+
+    @property
+    def shape(self):
+        return self.chemicals.size
+
+    def gather(self, x, y, **replica):
+        values = 0.0
+        for name, weight in self.weights.items():
+            values = values + weight * getattr(self.chemicals, name).gather(
+                x,
+                y,
+                **replica
+            )
+        return values
+
+    def __getitem__(self, index):
+        return sum(
+            weight * getattr(self.chemicals, name)[index]
+            for name, weight in self.weights.items()
+        )
+
+    def __array__(self, dtype=None, copy=None):
+        values = self[...]
+        return np.asarray(values, dtype=dtype)
 
-        self.search = np.clip(self.search, a_min=0.01, a_max=MAX_SEARCH)
-        self.found = np.clip(self.found, a_min=0.01, a_max=MAX_SEARCH)
+    def __add__(self, other):
+        weights = dict(self.weights)
+        for name, weight in other.weights.items():
+            weights[name] = weights.get(name, 0.0) + weight
+        return CompositeField(self.chemicals, weights)
+
+    def __neg__(self):
+        return self * -1.0
+
+    def __sub__(self, other):
+        return self + (-other)
+
+    def __mul__(self, factor):
+        return CompositeField(
+            self.chemicals,
+            {name: weight * factor for name, weight in self.weights.items()}
+        )
+
+    __rmul__ = __mul__
 
 
 class HistoryAttr(object):
+    """An attribute that records every value assigned to it
+
+    The values go into a TimeSeries stored on the instance as
+    ``<name>_series``, created with the keyword arguments given here, and
+    ``<name>_history`` is a read-only array view of the recorded values.
+    Assign a TimeSeries to ``<name>_series`` to record one instance
+    differently.
+    """
 
-    def __init__(self, name):
+    def __init__(self, name, **series_options):
         self.name = '_{}'.format(name)
+        self.series_name = '{}_series'.format(name)
         self.history_name = '{}_history'.format(name)
+        self.series_options = series_options
+
+    def __set_name__(self, owner, name):
+        setattr(
+            owner,
+            self.history_name,
+            property(lambda instance: self.series(instance).values)
+        )
 
     def __get__(self, instance, owner):
+        if instance is None:
+            return self
         return getattr(instance, self.name)
 
     def __set__(self, instance, value):
-        try:
-            getattr(instance, self.history_name).append(value)
-        except AttributeError:
-            setattr(instance, self.history_name, [])
-            getattr(instance, self.history_name).append(value)
+        self.series(instance).append(value)
         setattr(instance, self.name, value)
 
+    def series(self, instance):
+        try:
+            return instance.__dict__[self.series_name]
+        except KeyError:
+            series = TimeSeries(**self.series_options)
+            instance.__dict__[self.series_name] = series
+            return series
+
 
 class Nest(Location):
 
@@ -169,8 +546,8 @@ class Search(object):
         directions = self._find_highest_direction(ant, chemical)
 
         if not directions:
-            directions = ant.posible_directions
-        return random.choice(directions)
+            directions = ant.forward_directions
+        return ant.random.choice(directions)
 
         # directions = [ant.location + d for d in ant.posible_directions]
         # return max(
@@ -184,9 +561,9 @@ class Search(object):
             chemical=chemical
         )
         if search_directions:
-            return random.choice(search_directions) - ant.location
+            return ant.random.choice(search_directions)
         else:
-            return random.choice(ant.posible_directions)
+            return ant.random.choice(ant.forward_directions)
 
     def _find_lowest_exclude_zero_direction(self, ant, chemical):
         return self._find_lowest_direction(
@@ -196,94 +573,78 @@ class Search(object):
         )
 
     def _find_lowest_direction(self, ant, chemical, filter_func=None):
-        directions = [ant.location + d for d in ant.posible_directions]
-        values = [
-            chemical[d.x, d.y] for
-            d in directions
-        ]
-        if filter_func:
-            values = list(filter(filter_func, values))
-
-        if values:
-            min_value = min(values)
-            directions = [
-                d for d in directions
-                if chemical[d.x, d.y] == min_value
-            ]
-            return directions
-        else:
-            return []
+        return self._find_extreme_direction(ant, chemical, min, filter_func)
 
     def _find_highest_direction(self, ant, chemical, filter_func=None):
-        directions = [ant.location + d for d in ant.posible_directions]
-        values = [
-            chemical[d.x, d.y] for
-            d in directions
-        ]
+        return self._find_extreme_direction(ant, chemical, max, filter_func)
+
+    def _find_extreme_direction(self, ant, chemical, extreme, filter_func):
+        directions = ant.forward_directions
+        values = ant.chemicals.sense(
+            chemical,
+            ant.x,
+            ant.y,
+            ant.direction
+        ).tolist()
+        candidates = values
         if filter_func:
-            values = list(filter(filter_func, values))
+            candidates = list(filter(filter_func, values))
 
-        if values:
-            max_value = max(values)
-            directions = [
-                d for d in directions
-                if chemical[d.x, d.y] == max_value
+        if candidates:
+            extreme_value = extreme(candidates)
+            return [
+                d for d, value in zip(directions, values)
+                if value == extreme_value
             ]
-            return [d - ant.location for d in directions]
         else:
             return []
 
     def find_lowest_search_direction(self, ant):
-        directions = [ant.location + d for d in ant.posible_directions]
-        values = [
-            ant.chemicals.search[d.x, d.y] for
-            d in directions
-        ]
-        if values:
-            min_value = min(values)
-            min_directions = [
-                d for d in directions
-                if ant.chemicals.search[d.x, d.y] == min_value
-            ]
-            return random.choice(min_directions) - ant.location
-        else:
-            return random.choice(ant.posible_directions)
+        return ant.random.choice(
+            self._find_lowest_direction(ant, ant.chemicals.search)
+        )
 
     def _add_found_chemical(self, ant):
         ant.chemicals.found[
-            ant.location.x-1:ant.location.x+2,
-            ant.location.y-1:ant.location.y+2
+            ant.x-1:ant.x+2,
+            ant.y-1:ant.y+2
         ] += 1.0
 
     def _remove_chemical_area(self, ant, chemical):
         chemical[
-            ant.location.x-1:ant.location.x+2,
-            ant.location.y-1:ant.location.y+2
+            ant.x-1:ant.x+2,
+            ant.y-1:ant.y+2
         ] = 0
 
-    def _remove_chemical(self, ant, chemical):
-        chemical[
-            ant.location.x,
-            ant.location.y
-        ] -= (MIN_CHEMICAL / 1000000)
+    def _remove_chemical(self, ant, channel):
+        ant.chemicals.deposit(
+            channel,
+            ant.x,
+            ant.y,
+            -(MIN_CHEMICAL / 1000000)
+        )
 
     def _add_found_chemical(self, ant):
-        ant.chemicals.found[
-            ant.location.x,
-            ant.location.y
-        ] += self.found_chemical_amount(ant)
+        ant.chemicals.deposit(
+            'found',
+            ant.x,
+            ant.y,
+            self.found_chemical_amount(ant)
+        )
 
     def _add_search_chemical_area(self, ant):
         ant.chemicals.search[
-            ant.location.x-1:ant.location.x+2,
-            ant.location.y-1:ant.location.y+2
+            ant.x-1:ant.x+2,
+            ant.y-1:ant.y+2
         ] += self.search_chemical_amount(ant)
 
     def _add_search_chemical(self, ant):
-        ant.chemicals.search[
-            ant.location.x,
-            ant.location.y
-        ] += self.search_chemical_amount(ant)
+        ant.chemicals.deposit(
+            'search',
+            ant.x,
+            ant.y,
+            self.search_chemical_amount(ant)
+        )
 
     def search_chemical_amount(self, ant):
         if ant.time_since_nest > MAX_CHEMICAL_TIME:
@@ -307,13 +668,13 @@ class Search(object):
 class SearchWithoutAvoidance(Search):
 
     def move(self, ant):
-        return random.choice(ant.posible_directions)
+        return ant.random.choice(ant.forward_directions)
 
 
 class SearchWithAvoidanceAndJumps(Search):
 
     def move(self, ant):
-        if hasattr(ant, 'jump') and ant.jump > 1:
+        if ant.jump > 1:
             # print('performing jump')
             ant.jump -= 1
             return ant.jump_direction
@@ -326,7 +687,7 @@ class SearchWithAvoidanceAndJumps(Search):
             return dir
 
     def should_jump(self, ant, dir):
-        return ant.chemicals.search[dir.x, dir.y] >= 1
+        return ant.chemicals.search[DIRECTION_X[dir], DIRECTION_Y[dir]] >= 1
 
 
 class SearchWithAvoidance(Search):
@@ -341,7 +702,7 @@ class ReturnState(Search):
         if ant.time_since_food > 200000:
             direction = self.find_highest_direction(
                 ant,
-                ant.chemicals.search - ant.chemicals.found
+                ant.chemicals.combine(search=1.0, found=-1.0)
             )
         else:
             direction = self.find_highest_direction(
@@ -352,7 +713,7 @@ class ReturnState(Search):
 
     def chemicals(self, ant):
         if ant.time_since_food > 40:
-            self._remove_chemical(ant, ant.chemicals.search)
+            self._remove_chemical(ant, 'search')
         if ant.time_since_food < 100:
 
             self._add_found_chemical(ant)
@@ -382,25 +743,77 @@ gather_state = GatherState()
 
 
 class Ant(Location):
+    """One ant of a colony
+
+    Random moves and tie-breaks are drawn from ``random``, a RandomStream,
+    the shared ``streams.DEFAULT`` unless the ant is given its own.
+
+    The index of the nest in ``chemicals.nests`` is resolved on the first
+    ``is_at_home`` and again after ``nest`` is set, so ``is_at_home`` is
+    one lookup of the cell. Without chemicals the ant is at home within
+    HOME_RADIUS of its nest.
+    """
 
-    def __init__(self, nest, chemicals=None):
+    __slots__ = (
+        '_nest',
+        '_home',
+        'chemicals',
+        'food',
+        'search_strategy',
+        'return_strategy',
+        'gather_strategy',
+        'max_jump_distance',
+        'previous_location',
+        'direction',
+        'time_since_nest',
+        'time_since_food',
+        'jump',
+        'jump_direction',
+        'random',
+    )
+
+    def __init__(self, nest, chemicals=None, random=None):
         super().__init__(nest.x, nest.y)
         self.nest = nest
         self.chemicals = chemicals
+        self.random = streams.DEFAULT if random is None else random
         self.food = 0
         self.search_strategy = search_state_with_avoidance
         self.return_strategy = return_state
         self.gather_strategy = gather_state
         self.max_jump_distance = 5
         self.previous_location = self.location
-        self.last_direction = SE
+        self.direction = DIRECTION_CODES[SE.x, SE.y]
         self.time_since_nest = 0
         self.time_since_food = 0
+        self.jump = 0
+        self.jump_direction = self.direction
+
+    @property
+    def nest(self):
+        return self._nest
+
+    @nest.setter
+    def nest(self, nest):
+        self._nest = nest
+        self._home = None
+
+    @property
+    def last_direction(self):
+        return DIRECTIONS[self.direction]
+
+    @last_direction.setter
+    def last_direction(self, direction):
+        self.direction = direction_code(direction)
 
     @property
     def posible_directions(self):
         return POSIBLE_DIRECTIONS[self.last_direction]
 
+    @property
+    def forward_directions(self):
+        return FORWARD_DIRECTIONS[self.direction]
+
     @property
     def strategy(self):
         if self.has_food:
@@ -415,12 +828,15 @@ class Ant(Location):
 
     @property
     def any_found_signal(self):
-        result = 0
-        for direction in self.posible_directions:
-            result += self.chemicals.found[direction.x, direction.y]
-        return bool(result)
+        # The cone is sensed around the origin, not around the ant.
+        return bool(
+            self.chemicals.sense(self.chemicals.found, 0, 0, self.direction)
+            .sum()
+        )
 
     def tick(self):
+        if self.chemicals.coverage is not None:
+            self.chemicals.coverage.visit(self.x, self.y)
         # if self.is_at_home:
         #     print('{}_{}'.format(self.is_at_home, self.has_food))
         if self.is_at_home and self.has_food:
@@ -433,19 +849,27 @@ class Ant(Location):
                 self._gather_food()
         self.strategy.chemicals(self)
 
-        self.last_direction = self.strategy.move(self)
+        self.direction = self.strategy.move(self)
 
-        self.location = self.location + self.last_direction
+        self.step(self.direction)
 
     @property
     def is_at_home(self):
         # return self.location == self.nest.location
-        return self.distance_to_nest < 2
+        home = self._home
+        if home is None:
+            if self.chemicals is None:
+                return self.distance_to_nest <= HOME_RADIUS
+            home = self._home = self.chemicals.nests.index(self.nest)
+        return self.chemicals.nests.nest_at(self.x, self.y) == home
 
     def _drop_food(self):
-        self.nest.food += self.food
+        if self.chemicals.synchronous:
+            self.chemicals.pending.drop(self.nest, self.food)
+        else:
+            self.nest.food += self.food
         self.food = 0
-        self.last_direction = OBOSITE_DIRECTIONS[self.last_direction]
+        self.direction = OPPOSITE_DIRECTIONS[self.direction]
 
     @property
     def has_food(self):
@@ -455,109 +879,25 @@ class Ant(Location):
 
         food = self.chemicals.food[self.x, self.y]
         if food > 0:
-            if food < MAX_FOOD:
+            if self.chemicals.synchronous:
+                # The food stays put until the claims of every ant on the
+                # cell are settled at the end of the tick
+                self.food = min(food, MAX_FOOD)
+                self.chemicals.pending.claim(self, self.x, self.y)
+            elif food < MAX_FOOD:
                 self.food = food
                 self.chemicals.food[self.x, self.y] = 0
             else:
                 self.food = MAX_FOOD
                 self.chemicals.food[self.x, self.y] -= MAX_FOOD
-            self.last_direction = OBOSITE_DIRECTIONS[self.last_direction]
+            self.direction = OPPOSITE_DIRECTIONS[self.direction]
 
     @property
     def distance_to_nest(self):
         return (
-            abs(self.nest.x - self.location.x) +
-            abs(self.nest.y - self.location.y)
+            abs(self.nest.x - self.x) +
+            abs(self.nest.y - self.y)
         )
 
     def __repr__(self):
         return ''
-
-
-
-
-class PeriodicLattice(np.ndarray):
-    """Creates an n-dimensional ring that joins on boundaries w/ numpy
-
-    Required Inputs
-        array :: np.array :: n-dim numpy array to use wrap with
-
-    Only currently supports single point selections wrapped around the boundary
-    """
-    def __new__(cls, input_array, lattice_spacing=None):
-        """__new__ is called by numpy when and explicit constructor is used:
-        obj = MySubClass(params) otherwise we must rely on __array_finalize
-         """
-        # Input array is an already formed ndarray instance
-        # We first cast to be our class type
-        obj = np.asarray(input_array).view(cls)
-
-        # add the new attribute to the created instance
-        obj.lattice_shape = input_array.shape
-        obj.lattice_dim = len(input_array.shape)
-        obj.lattice_spacing = lattice_spacing
-
-        # Finally, we must return the newly created object:
-        return obj
-
-    def __getitem__(self, index):
-        index = self.latticeWrapIdx(index)
-        return super(PeriodicLattice, self).__getitem__(index)
-
-    def __setitem__(self, index, item):
-        index = self.latticeWrapIdx(index)
-        return super(PeriodicLattice, self).__setitem__(index, item)
-
-    def __array_finalize__(self, obj):
-        """ ndarray.__new__ passes __array_finalize__ the new object,
-        of our own class (self) as well as the object from which the view has been taken (obj).
-        See
-        http://docs.scipy.org/doc/numpy/user/basics.subclassing.html#simple-example-adding-an-extra-attribute-to-ndarray
-        for more info
-        """
-        # ``self`` is a new object resulting from
-        # ndarray.__new__(Periodic_Lattice, ...), therefore it only has
-        # attributes that the ndarray.__new__ constructor gave it -
-        # i.e. those of a standard ndarray.
-        #
-        # We could have got to the ndarray.__new__ call in 3 ways:
-        # From an explicit constructor - e.g. Periodic_Lattice():
-        #   1. obj is None
-        #       (we're in the middle of the Periodic_Lattice.__new__
-        #       constructor, and self.info will be set when we return to
-        #       Periodic_Lattice.__new__)
-        if obj is None: return
-        #   2. From view casting - e.g arr.view(Periodic_Lattice):
-        #       obj is arr
-        #       (type(obj) can be Periodic_Lattice)
-        #   3. From new-from-template - e.g lattice[:3]
-        #       type(obj) is Periodic_Lattice
-        #
-        # Note that it is here, rather than in the __new__ method,
-        # that we set the default value for 'spacing', because this
-        # method sees all creation of default objects - with the
-        # Periodic_Lattice.__new__ constructor, but also with
-        # arr.view(Periodic_Lattice).
-        #
-        # These are in effect the default values from these operations
-        self.lattice_shape = getattr(obj, 'lattice_shape', obj.shape)
-        self.lattice_dim = getattr(obj, 'lattice_dim', len(obj.shape))
-        self.lattice_spacing = getattr(obj, 'lattice_spacing', None)
-        pass
-
-    def latticeWrapIdx(self, index):
-        """returns periodic lattice index
-        for a given iterable index
-
-        Required Inputs:
-            index :: iterable :: one integer for each axis
-
-        This is NOT compatible with slicing
-        """
-        if not hasattr(index, '__iter__'): return index         # handle integer slices
-        if len(index) != len(self.lattice_shape): return index  # must reference a scalar
-        if any(type(i) == slice for i in index): return index   # slices not supported
-        if len(index) == len(self.lattice_shape):               # periodic indexing of scalars
-            mod_index = tuple(( (i%s + s)%s for i,s in zip(index, self.lattice_shape)))
-            return mod_index
-        raise ValueError('Unexpected index: {}'.format(index))
\ No newline at end of file
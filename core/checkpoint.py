@@ -0,0 +1,377 @@
+import json
+import os
+
+import numpy as np
+
+from core.ant import Ant, Chemicals, Location, Nest, \
+    search_state_no_advoidance, \
+    search_state_with_avoidance, search_with_avoidance_and_jumps, \
+    return_state, gather_state
+from core.colony import Colony
+from core.coverage import Coverage
+from core.deposits import DepositBuffer
+from core.diffusion import Diffusion
+from core.food import FoodSources
+from core.history import TimeSeries
+from core.nests import NestMap
+from core import streams
+from core.trails import TrackedLattice
+from core.lattice import PeriodicLattice, HaloLattice, LazyDecayLattice, \
+    TiledLattice
+
+VERSION = 2
+META = 'checkpoint.json'
+
+SEARCH_STRATEGIES = {
+    strategy.__class__.__name__: strategy
+    for strategy in (
+        search_state_no_advoidance,
+        search_state_with_avoidance,
+        search_with_avoidance_and_jumps
+    )
+}
+
+FIELDS = ('search', 'found', 'food')
+
+# Lattices saved through their state() rather than as one dense array
+STATEFUL_LATTICES = {
+    lattice.__name__: lattice
+    for lattice in (LazyDecayLattice, TiledLattice, FoodSources)
+}
+
+COLUMNS = (
+    'x',
+    'y',
+    'direction',
+    'food',
+    'time_since_nest',
+    'time_since_food',
+    'jump',
+    'jump_direction',
+)
+ANT_COLUMNS = COLUMNS + ('max_jump_distance', 'previous_x', 'previous_y')
+
+
+def save_checkpoint(path, ants):
+    """Saves a whole simulation to the directory path
+
+    Required Inputs
+        path :: str :: directory to write, created if needed
+        ants :: Colony or list of Ant :: the ants, all sharing one nest and
+            one Chemicals
+
+    Each chemical field and each column of ant state is one raw ``.npy``
+    file, so ``load_checkpoint`` can memory map them. The nest, its food
+    history and the state of the random streams of the ants go in
+    ``checkpoint.json`` and a few more ``.npy`` files.
+    """
+    os.makedirs(path, exist_ok=True)
+    arrays = {}
+    if isinstance(ants, Colony):
+        nest, chemicals = ants.nest, ants.chemicals
+        meta = {
+            'kind': 'colony',
+            'n_ants': ants.n_ants,
+            'max_jump_distance': ants.max_jump_distance,
+            'search_strategy': ants.search_strategy.__class__.__name__,
+            'streams': [stream.state() for stream in ants.streams],
+        }
+        for name in COLUMNS + ('delivered',):
+            arrays['ants.{}'.format(name)] = getattr(ants, name)
+    else:
+        if not ants:
+            raise ValueError('Nothing to checkpoint without ants')
+        nest, chemicals = ants[0].nest, ants[0].chemicals
+        meta = {'kind': 'ants'}
+        for name in ANT_COLUMNS:
+            arrays['ants.{}'.format(name)] = np.array(
+                [_ant_value(ant, name) for ant in ants]
+            )
+        names = sorted(SEARCH_STRATEGIES)
+        meta['search_strategies'] = names
+        arrays['ants.search_strategy'] = np.array(
+            [names.index(ant.search_strategy.__class__.__name__)
+             for ant in ants],
+            dtype=np.int8
+        )
+        # Ants may share a stream, the default one or another, so each
+        # stream is saved once with the index of its stream for every ant.
+        indexes = {}
+        saved_streams = []
+        for ant in ants:
+            if id(ant.random) not in indexes:
+                indexes[id(ant.random)] = len(saved_streams)
+                saved_streams.append(ant.random)
+        meta['streams'] = [stream.state() for stream in saved_streams]
+        meta['default_stream'] = indexes.get(id(streams.DEFAULT))
+        arrays['ants.stream'] = np.array(
+            [indexes[id(ant.random)] for ant in ants],
+            dtype=np.int64
+        )
+
+    meta['version'] = VERSION
+    meta['chemicals'] = _chemicals_meta(chemicals)
+    for name in FIELDS:
+        field = getattr(chemicals, name)
+        prefix = 'chemicals.{}'.format(name)
+        if type(field).__name__ in STATEFUL_LATTICES:
+            meta['chemicals'][name] = _save_state(
+                prefix,
+                field.state(),
+                arrays
+            )
+            meta['chemicals'][name]['lattice'] = type(field).__name__
+        else:
+            arrays[prefix] = np.asarray(field)
+    if chemicals.pending is not None:
+        meta['chemicals']['pending'] = _save_state(
+            'chemicals.pending',
+            chemicals.pending.state(),
+            arrays
+        )
+    if chemicals.coverage is not None:
+        meta['chemicals']['coverage'] = _save_state(
+            'chemicals.coverage',
+            chemicals.coverage.state(),
+            arrays
+        )
+
+    meta['nest'] = {
+        'x': nest.x,
+        'y': nest.y,
+        'food': float(nest.food),
+        'food_series': _save_state(
+            'nest.food_series',
+            Nest.food.series(nest).state(),
+            arrays
+        ),
+    }
+
+    for name, values in arrays.items():
+        np.save(os.path.join(path, '{}.npy'.format(name)), values)
+    with open(os.path.join(path, META), 'w') as f:
+        json.dump(meta, f)
+
+
+def load_checkpoint(path, seed=None):
+    """Loads a simulation saved by ``save_checkpoint``
+
+    The arrays are memory mapped copy-on-write, so loading reads next to
+    nothing up front and running the loaded simulation never changes the
+    checkpoint. One checkpoint can therefore be the warm start of any
+    number of runs, pass a seed to reseed the random streams of the ants
+    instead of restoring their saved state, so that runs from the same
+    checkpoint differ. Ants that used the default stream use it again.
+
+    Returns the Colony or the list of Ant that was saved.
+    """
+    with open(os.path.join(path, META)) as f:
+        meta = json.load(f)
+    if meta['version'] != VERSION:
+        raise ValueError(
+            'Unsupported checkpoint version: {}'.format(meta['version'])
+        )
+
+    def load(name):
+        return np.load(
+            os.path.join(path, '{}.npy'.format(name)),
+            mmap_mode='c'
+        )
+
+    chemicals = _load_chemicals(meta['chemicals'], load)
+    nest = _load_nest(meta['nest'], load)
+
+    if meta['kind'] == 'colony':
+        ants = Colony(
+            nest=nest,
+            chemicals=chemicals,
+            n_ants=meta['n_ants'],
+            search_strategy=SEARCH_STRATEGIES[meta['search_strategy']],
+            max_jump_distance=meta['max_jump_distance'],
+            seed=seed
+        )
+        for name in COLUMNS + ('delivered',):
+            setattr(ants, name, load('ants.{}'.format(name)))
+        if seed is None:
+            for stream, state in zip(ants.streams, meta['streams']):
+                stream.set_state(state)
+    else:
+        columns = [
+            load('ants.{}'.format(name)).tolist() for name in ANT_COLUMNS
+        ]
+        strategies = [
+            SEARCH_STRATEGIES[name] for name in meta['search_strategies']
+        ]
+        search_strategy = load('ants.search_strategy').tolist()
+        ant_streams = _load_streams(meta, seed)
+        stream = load('ants.stream').tolist()
+        ants = [
+            _load_ant(
+                nest,
+                chemicals,
+                values,
+                strategies[strategy],
+                ant_streams[index]
+            )
+            for strategy, index, values in zip(
+                search_strategy,
+                stream,
+                zip(*columns)
+            )
+        ]
+    return ants
+
+
+def _load_streams(meta, seed):
+    """The streams of saved ants, restored, or reseeded if seed is given"""
+    default = meta['default_stream']
+    if seed is not None:
+        loaded = streams.RandomStream(seed).spawn(len(meta['streams']))
+        if default is not None:
+            streams.seed(seed)
+            loaded[default] = streams.DEFAULT
+        return loaded
+    loaded = []
+    for index, state in enumerate(meta['streams']):
+        if index == default:
+            streams.DEFAULT.set_state(state)
+            loaded.append(streams.DEFAULT)
+        else:
+            loaded.append(streams.RandomStream.from_state(state))
+    return loaded
+
+
+def _ant_value(ant, name):
+    if name == 'previous_x':
+        return ant.previous_location.x
+    if name == 'previous_y':
+        return ant.previous_location.y
+    return getattr(ant, name)
+
+
+def _load_ant(nest, chemicals, values, search_strategy, random):
+    (
+        x, y, direction, food, time_since_nest, time_since_food, jump,
+        jump_direction, max_jump_distance, previous_x, previous_y
+    ) = values
+    ant = Ant.__new__(Ant)
+    ant.x = x
+    ant.y = y
+    ant.nest = nest
+    ant.chemicals = chemicals
+    ant.food = food
+    ant.search_strategy = search_strategy
+    ant.random = random
+    ant.return_strategy = return_state
+    ant.gather_strategy = gather_state
+    ant.max_jump_distance = max_jump_distance
+    ant.previous_location = Location(previous_x, previous_y)
+    ant.direction = direction
+    ant.time_since_nest = time_since_nest
+    ant.time_since_food = time_since_food
+    ant.jump = jump
+    ant.jump_direction = jump_direction
+    return ant
+
+
+def _chemicals_meta(chemicals):
+    meta = {
+        'size': list(chemicals.size),
+        'replicas': chemicals.replicas,
+        'boundary': None,
+        'halo': 1,
+        'decay_rate': chemicals.decay_rate,
+        'min_chemical': chemicals.min_chemical,
+        'max_chemical': chemicals.max_chemical,
+        'diffusion': {
+            name: diffusion.coefficient
+            for name, diffusion in chemicals.diffusion.items()
+        },
+        'trail_tables': [
+            name for name in FIELDS
+            if isinstance(getattr(chemicals, name), TrackedLattice)
+        ],
+    }
+    if isinstance(chemicals.food, HaloLattice):
+        meta['boundary'] = chemicals.food.boundary
+        meta['halo'] = chemicals.food.halo
+    return meta
+
+
+def _load_chemicals(meta, load):
+    chemicals = Chemicals.__new__(Chemicals)
+    chemicals.size = tuple(meta['size'])
+    chemicals.replicas = meta['replicas']
+    chemicals.decay_rate = meta['decay_rate']
+    chemicals.min_chemical = meta['min_chemical']
+    chemicals.max_chemical = meta['max_chemical']
+    chemicals.nests = NestMap(chemicals.size)
+    shape = chemicals.size
+    if chemicals.replicas is not None:
+        shape = (chemicals.replicas,) + shape
+    chemicals.diffusion = {
+        name: Diffusion(shape, coefficient)
+        for name, coefficient in meta.get('diffusion', {}).items()
+    }
+    chemicals.memmap_dir = None
+    chemicals.pending = None
+    if 'pending' in meta:
+        chemicals.pending = DepositBuffer.from_state(
+            _load_state('chemicals.pending', meta['pending'], load)
+        )
+    chemicals.coverage = None
+    if 'coverage' in meta:
+        chemicals.coverage = Coverage.from_state(
+            _load_state('chemicals.coverage', meta['coverage'], load)
+        )
+    for name in FIELDS:
+        prefix = 'chemicals.{}'.format(name)
+        if name in meta:
+            state = _load_state(prefix, meta[name], load)
+            lattice = STATEFUL_LATTICES[state.pop('lattice')]
+            setattr(chemicals, name, lattice.from_state(state))
+            continue
+        values = load(prefix)
+        if meta['boundary'] is not None:
+            field = HaloLattice(
+                values,
+                halo=meta['halo'],
+                boundary=meta['boundary']
+            )
+        elif name in meta.get('trail_tables', ()):
+            field = TrackedLattice(values)
+        else:
+            field = PeriodicLattice(values)
+        setattr(chemicals, name, field)
+    return chemicals
+
+
+def _load_nest(meta, load):
+    nest = Nest.__new__(Nest)
+    nest.x = meta['x']
+    nest.y = meta['y']
+    nest.food_series = TimeSeries.from_state(
+        _load_state('nest.food_series', meta['food_series'], load)
+    )
+    nest.__dict__[Nest.food.name] = meta['food']
+    return nest
+
+
+def _save_state(prefix, state, arrays):
+    """Adds the arrays of a state() dict to arrays, under prefix, and
+    returns the rest with the names of the arrays"""
+    saved = {'arrays': []}
+    for name, value in state.items():
+        if isinstance(value, np.ndarray):
+            arrays['{}.{}'.format(prefix, name)] = value
+            saved['arrays'].append(name)
+        else:
+            saved[name] = value
+    return saved
+
+
+def _load_state(prefix, saved, load):
+    state = {name: value for name, value in saved.items() if name != 'arrays'}
+    for name in saved['arrays']:
+        state[name] = load('{}.{}'.format(prefix, name))
+    return state
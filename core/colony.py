@@ -0,0 +1,382 @@
+import numpy as np
+
+from core.ant import DIRECTION_CODES, SE, MAX_FOOD, MAX_CHEMICAL_TIME, \
+    MIN_CHEMICAL, SearchWithAvoidance, SearchWithoutAvoidance, \
+    SearchWithAvoidanceAndJumps, search_state_with_avoidance, \
+    DIRECTION_DX, DIRECTION_DY, FORWARD_CONES, OPPOSITES
+from core.streams import RandomStream
+from core.trails import STALE, TrackedLattice, tie_slots
+
+
+class Colony(object):
+    """A whole colony of ants stored as a struct of arrays.
+
+    Every ant is one row in the ``x``, ``y``, ``direction``, ``food``,
+    ``time_since_nest``, ``time_since_food``, ``jump`` and
+    ``jump_direction`` arrays, and ``tick`` advances all of them with a
+    handful of NumPy operations instead of one ``Ant.tick`` call per ant.
+
+    Directions are stored as direction codes, indexes into ``DIRECTIONS``.
+
+    On ``Chemicals`` with ``replicas``, the colony is an ensemble of that
+    many independent colonies of n_ants each, all advanced by the same
+    ``tick``. The arrays are then replica-major, so ``x.reshape(replicas,
+    n_ants)`` is the ``(R, n_ants)`` view of them, ``replica`` gives the
+    replica of each ant and ``delivered`` the food each replica has
+    brought back to its nest.
+
+    Random moves and tie-breaks are drawn from ``streams``, one
+    RandomStream per replica spawned from seed, so a replica runs the same
+    in an ensemble of any size and a colony without replicas runs like the
+    first replica of an ensemble with the same seed. Streams made
+    elsewhere, one per replica, can be passed as ``streams`` instead.
+
+    Where a chemical is a TrackedLattice, from ``Chemicals`` with
+    ``trail_tables``, the best forward cells are looked up in its
+    TrailTables rather than sensed, only the cones that changed since they
+    were last crossed being sensed again. The moves are as likely as
+    without, but ties are broken with other draws of the streams.
+
+    The behaviour follows ``Ant.tick`` with the search strategy given,
+    ``ReturnState`` and ``GatherState``, except that all ants sense the
+    chemicals after every ant of the tick has made its deposit, rather
+    than seeing only the deposits of the ants before them in a list.
+    """
+
+    def __init__(
+        self,
+        nest,
+        chemicals,
+        n_ants,
+        search_strategy=search_state_with_avoidance,
+        max_jump_distance=5,
+        seed=None,
+        streams=None,
+    ):
+        if not isinstance(search_strategy, (
+            SearchWithoutAvoidance,
+            SearchWithAvoidance,
+            SearchWithAvoidanceAndJumps
+        )):
+            raise ValueError(
+                'Unsupported search strategy: {}'.format(search_strategy)
+            )
+        self.nest = nest
+        self.chemicals = chemicals
+        self.search_strategy = search_strategy
+        self.max_jump_distance = max_jump_distance
+        self.n_ants = n_ants
+        self.replicas = chemicals.replicas
+        if streams is None:
+            streams = RandomStream(seed).spawn(self.replicas or 1)
+        if len(streams) != (self.replicas or 1):
+            raise ValueError('Need one stream per replica')
+        self.streams = list(streams)
+        if self.replicas is None:
+            self.replica = None
+            self.delivered = np.zeros(1)
+        else:
+            self.replica = np.repeat(np.arange(self.replicas), n_ants)
+            self.delivered = np.zeros(self.replicas)
+            n_ants *= self.replicas
+
+        self.x = np.full(n_ants, nest.x, dtype=np.int64)
+        self.y = np.full(n_ants, nest.y, dtype=np.int64)
+        self.direction = np.full(
+            n_ants,
+            DIRECTION_CODES[SE.x, SE.y],
+            dtype=np.intp
+        )
+        self.food = np.zeros(n_ants)
+        self.time_since_nest = np.zeros(n_ants, dtype=np.int64)
+        self.time_since_food = np.zeros(n_ants, dtype=np.int64)
+        self.jump = np.zeros(n_ants, dtype=np.int64)
+        self.jump_direction = np.zeros(n_ants, dtype=np.intp)
+
+    def __len__(self):
+        return len(self.x)
+
+    @property
+    def has_food(self):
+        return self.food > 0
+
+    @property
+    def is_at_home(self):
+        return self._at_home(*self._cells(self.x, self.y))
+
+    def tick(self):
+        self.deposit()
+        self.move()
+
+    def deposit(self):
+        """The first phase of a tick: dropping and gathering food and
+        adding chemicals, all at the cells the ants are on"""
+        x, y = self._cells(self.x, self.y)
+        if self.chemicals.coverage is not None:
+            self.chemicals.coverage.visit(x, y, replica=self.replica)
+        dropping = self.has_food & self._at_home(x, y)
+        self._drop_food(dropping)
+        self.time_since_nest[~dropping] += 1
+        gathering = np.flatnonzero(~self.has_food & ~dropping)
+        self._gather_food(gathering, x[gathering], y[gathering])
+
+        returning = self.has_food
+        self.time_since_food[returning] += 1
+        self.time_since_food[~returning] = 0
+        self._add_chemicals(returning, x, y)
+
+    def move(self):
+        """The second phase of a tick: sensing the chemicals around the
+        ants and moving them"""
+        returning = self.has_food
+        self.time_since_food[returning] += 1
+        direction = np.empty_like(self.direction)
+        direction[returning] = self._return_directions(
+            np.flatnonzero(returning)
+        )
+        direction[~returning] = self._search_directions(
+            np.flatnonzero(~returning)
+        )
+
+        self.direction = direction
+        self.x += DIRECTION_DX[direction]
+        self.y += DIRECTION_DY[direction]
+
+    def _drop_food(self, dropping):
+        if not dropping.any():
+            return
+        food = self.food[dropping]
+        self.nest.food += food.sum()
+        if self.replica is None:
+            self.delivered += food.sum()
+        else:
+            np.add.at(self.delivered, self.replica[dropping], food)
+        self.food[dropping] = 0
+        self.direction[dropping] = OPPOSITES[self.direction[dropping]]
+        self.time_since_nest[dropping] = 0
+
+    def _gather_food(self, idx, x, y):
+        food = self.chemicals.food
+        available = food.gather(x, y, **self._replica(idx))
+        found = available > 0
+        if not found.any():
+            return
+        idx, x, y, available = idx[found], x[found], y[found], available[found]
+
+        # Ants sharing a cell take their share in list order, so the
+        # k-th ant on a cell sees what the first k ants have left.
+        width, height = self.chemicals.size
+        cells = x * height + y
+        if self.replica is not None:
+            cells += self.replica[idx] * (width * height)
+        order = np.argsort(cells, kind='stable')
+        idx, x, y, cells = idx[order], x[order], y[order], cells[order]
+        position = np.arange(len(cells))
+        first = np.r_[True, cells[1:] != cells[:-1]]
+        rank = position - np.maximum.accumulate(np.where(first, position, 0))
+        taken = np.clip(available[order] - rank * MAX_FOOD, 0, MAX_FOOD)
+
+        taking = taken > 0
+        idx, taken = idx[taking], taken[taking]
+        self.food[idx] = taken
+        self.direction[idx] = OPPOSITES[self.direction[idx]]
+        food.scatter_add(x[taking], y[taking], -taken, **self._replica(idx))
+
+    def _add_chemicals(self, returning, x, y):
+        search = self.chemicals.search
+        found = self.chemicals.found
+
+        searching = ~returning
+        search.scatter_add(
+            x[searching],
+            y[searching],
+            _chemical_amount(self.time_since_nest[searching]),
+            **self._replica(searching)
+        )
+
+        time_since_food = self.time_since_food
+        removing = returning & (time_since_food > MAX_CHEMICAL_TIME)
+        search.scatter_add(
+            x[removing],
+            y[removing],
+            -MIN_CHEMICAL / 1000000,
+            **self._replica(removing)
+        )
+        marking = returning & (time_since_food < 100)
+        found.scatter_add(
+            x[marking],
+            y[marking],
+            _chemical_amount(time_since_food[marking]),
+            **self._replica(marking)
+        )
+
+    def _return_directions(self, idx):
+        lost = self.time_since_food[idx] > 200000
+        if not lost.any():
+            return self._choose_on(self.chemicals.search, idx, highest=True)
+        values = self._sense(self.chemicals.search, idx)
+        values[lost] = self._sense(
+            self.chemicals.combine(search=1.0, found=-1.0),
+            idx[lost]
+        )
+        return self._choose(idx, values, highest=True)
+
+    def _search_directions(self, idx):
+        direction = np.empty(len(idx), dtype=np.intp)
+
+        gathering = self._any_found_signal(idx)
+        direction[gathering] = self._choose_on(
+            self.chemicals.found,
+            idx[gathering],
+            highest=True
+        )
+
+        searching = ~gathering
+        direction[searching] = self._explore_directions(idx[searching])
+        return direction
+
+    def _explore_directions(self, idx):
+        if isinstance(self.search_strategy, SearchWithoutAvoidance):
+            slot = (self._uniform(idx, 1)[:, 0] * 3).astype(np.intp)
+            return FORWARD_CONES[self.direction[idx], slot]
+
+        if not isinstance(self.search_strategy, SearchWithAvoidanceAndJumps):
+            return self._choose_on(self.chemicals.search, idx, highest=False)
+
+        direction = np.empty(len(idx), dtype=np.intp)
+        jumping = self.jump[idx] > 1
+        self.jump[idx[jumping]] -= 1
+        direction[jumping] = self.jump_direction[idx[jumping]]
+
+        walking = idx[~jumping]
+        slot = self._pick_on(self.chemicals.search, walking, highest=False)
+        lowest = FORWARD_CONES[self.direction[walking], slot]
+        direction[~jumping] = lowest
+
+        # SearchWithAvoidanceAndJumps.should_jump reads the search chemical
+        # at the direction offset, so the same cell is read here.
+        starting = self._read(
+            self.chemicals.search,
+            DIRECTION_DX[lowest],
+            DIRECTION_DY[lowest],
+            walking
+        ) >= 1
+        self.jump_direction[walking[starting]] = lowest[starting]
+        self.jump[walking[starting]] = self.max_jump_distance
+        return direction
+
+    def _any_found_signal(self, idx):
+        # Like Ant.any_found_signal, this senses the cone around the
+        # origin rather than around the ant, so the signal only depends on
+        # the direction and is sensed once for each.
+        directions = np.arange(len(FORWARD_CONES))
+        if self.replica is None:
+            found = self.chemicals.sense(
+                self.chemicals.found,
+                0,
+                0,
+                directions
+            )
+            return (found.sum(axis=-1) != 0)[self.direction[idx]]
+        found = self.chemicals.sense(
+            self.chemicals.found,
+            0,
+            0,
+            directions[None, :],
+            replica=np.arange(self.replicas)[:, None]
+        )
+        signal = found.sum(axis=-1) != 0
+        return signal[self.replica[idx], self.direction[idx]]
+
+    def _choose(self, idx, values, highest):
+        slot = self._pick(idx, values, highest)
+        return FORWARD_CONES[self.direction[idx], slot]
+
+    def _choose_on(self, lattice, idx, highest):
+        slot = self._pick_on(lattice, idx, highest)
+        return FORWARD_CONES[self.direction[idx], slot]
+
+    def _pick_on(self, lattice, idx, highest):
+        """``_pick`` on the cones of lattice around the ants idx, looked
+        up in its TrailTable if it is a TrackedLattice. Only the stale
+        entries are sensed, and stored for the next ants to cross them."""
+        if not isinstance(lattice, TrackedLattice):
+            return self._pick(idx, self._sense(lattice, idx), highest)
+        table = lattice.table(highest)
+        x, y = self._cells(self.x[idx], self.y[idx])
+        direction = self.direction[idx]
+        masks = table.lookup(direction, x, y, **self._replica(idx))
+        stale = np.flatnonzero(masks == STALE)
+        if len(stale):
+            masks[stale] = table.store(
+                direction[stale],
+                x[stale],
+                y[stale],
+                self._sense(lattice, idx[stale]),
+                **self._replica(idx[stale])
+            )
+        return tie_slots(masks, self._uniform(idx, 1)[:, 0])
+
+    def _pick(self, idx, values, highest):
+        """Index of the highest (or lowest) value in each row, with ties
+        broken uniformly at random, for the ants idx."""
+        if highest:
+            extreme = values.max(axis=1, initial=-np.inf)
+        else:
+            extreme = values.min(axis=1, initial=np.inf)
+        keys = self._uniform(idx, values.shape[1])
+        keys[values != extreme[:, None]] = -1
+        return keys.argmax(axis=1)
+
+    def _uniform(self, idx, columns):
+        """Uniform variates, a row of columns for each ant idx, each row
+        drawn from the stream of the ant's replica"""
+        if self.replica is None:
+            return self.streams[0].random((len(idx), columns))
+        keys = np.empty((len(idx), columns))
+        # idx is in ascending order, so the ants of a replica are together
+        bounds = np.searchsorted(
+            self.replica[idx],
+            np.arange(self.replicas + 1)
+        )
+        for stream, start, end in zip(self.streams, bounds, bounds[1:]):
+            if end > start:
+                keys[start:end] = stream.random((end - start, columns))
+        return keys
+
+    def _sense(self, lattice, idx):
+        return self.chemicals.sense(
+            lattice,
+            self.x[idx],
+            self.y[idx],
+            self.direction[idx],
+            **self._replica(idx)
+        )
+
+    def _read(self, lattice, x, y, idx):
+        return lattice.gather(*self._cells(x, y), **self._replica(idx))
+
+    def _at_home(self, x, y):
+        """Whether the ants at x, y, already on the lattice, are in the
+        home zone of the nest"""
+        nests = self.chemicals.nests
+        index = nests.index(self.nest)
+        return nests.gather(x, y) == index
+
+    def _cells(self, x, y):
+        width, height = self.chemicals.size
+        return x % width, y % height
+
+    def _replica(self, idx):
+        """The replica keyword for reading the chemicals of ants idx"""
+        if self.replica is None:
+            return {}
+        return {'replica': self.replica[idx]}
+
+
+def _chemical_amount(time_since):
+    return np.where(
+        time_since > MAX_CHEMICAL_TIME,
+        MIN_CHEMICAL,
+        1 - time_since / MAX_CHEMICAL_TIME
+    )
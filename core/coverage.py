@@ -0,0 +1,102 @@
+import numpy as np
+
+from core.history import TimeSeries
+
+
+class Coverage(object):
+    """The cells of a world the ants have visited, counted as they go
+
+    Required Inputs
+        size :: tuple :: size of the world
+
+    Optional Inputs
+        replicas :: int :: number of replicas, each with its own cells
+
+    ``visited`` marks every cell an ant has stood on when making its
+    deposits and ``count`` (one per replica with replicas) is updated with
+    the cells newly visited, so ``fraction`` costs O(1) at any tick rather
+    than a pass over the grid. ``tick`` appends the fraction, the mean
+    over replicas with replicas, to ``series``, the coverage curve.
+    """
+
+    def __init__(self, size, replicas=None):
+        self.size = tuple(size)
+        self.replicas = replicas
+        if replicas is None:
+            self.visited = np.zeros(self.size, dtype=bool)
+            self.count = 0
+        else:
+            self.visited = np.zeros((replicas,) + self.size, dtype=bool)
+            self.count = np.zeros(replicas, dtype=np.int64)
+        self.series = TimeSeries()
+
+    @property
+    def fraction(self):
+        return self.count / (self.size[0] * self.size[1])
+
+    @property
+    def curve(self):
+        return self.series.values
+
+    def visit(self, x, y, replica=None):
+        """Marks the cells at x, y as visited
+
+        x and y are scalars, wrapped onto the world, or arrays of cells
+        already on the lattice. With replicas, replica gives the replica of
+        each cell.
+        """
+        width, height = self.size
+        if type(x) is int and type(y) is int:
+            x, y = x % width, y % height
+            if not self.visited[x, y]:
+                self.visited[x, y] = True
+                self.count += 1
+            return
+
+        index = (x, y) if replica is None else (replica, x, y)
+        new = ~self.visited[index]
+        if not new.any():
+            return
+        cells = np.ravel_multi_index(
+            tuple(np.asarray(i)[new] for i in index),
+            self.visited.shape
+        )
+        cells = np.unique(cells)
+        self.visited.reshape(-1)[cells] = True
+        if replica is None:
+            self.count += len(cells)
+        else:
+            self.count += np.bincount(
+                cells // (width * height),
+                minlength=self.replicas
+            )
+
+    def tick(self):
+        self.series.append(np.mean(self.fraction))
+
+    def state(self):
+        """Returns everything needed to rebuild the coverage, as a dict of
+        NumPy arrays and plain numbers"""
+        state = {
+            'size': list(self.size),
+            'replicas': self.replicas,
+            'visited': self.visited,
+            'count': np.asarray(self.count),
+        }
+        for name, value in self.series.state().items():
+            state['series.{}'.format(name)] = value
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuilds the coverage from ``state()``"""
+        coverage = cls(state['size'], replicas=state['replicas'])
+        coverage.visited = np.array(state['visited'])
+        count = np.array(state['count'])
+        coverage.count = int(count) if count.ndim == 0 else count
+        coverage.series = TimeSeries.from_state({
+            name[len('series.'):]: value
+            for name, value in state.items()
+            if name.startswith('series.')
+        })
+        return coverage
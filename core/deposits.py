@@ -0,0 +1,149 @@
+import math
+
+import numpy as np
+
+# When the deposits of ants reach the chemicals
+IMMEDIATE = 'immediate'
+END_OF_TICK = 'end_of_tick'
+# Deposits, food taken and food dropped all applied at the end of the
+# tick, in an order that does not depend on the order of the ants
+SYNCHRONOUS = 'synchronous'
+
+DEPOSIT_MODES = (IMMEDIATE, END_OF_TICK, SYNCHRONOUS)
+
+CHANNELS = ('search', 'found')
+
+
+class DepositBuffer(object):
+    """Deposits of ants collected during a tick and applied at its end
+
+    Optional Inputs
+        synchronous :: bool :: whether food taken and dropped is also
+            collected, and everything applied in a canonical order
+
+    ``add`` appends a deposit to plain lists, costing no lattice access,
+    and ``flush`` applies every deposit collected since the last flush
+    with one ``scatter_add`` per chemical, deposits at the same cell
+    adding up.
+
+    Synchronous buffers make a tick independent of the order of the
+    ants. The chemicals and food stay frozen while the ants read them and
+    the buffer is the write side, applied at the end of the tick:
+    deposits sorted by cell and amount, food dropped summed exactly with
+    ``math.fsum``, and food taken by ``claim`` settled per cell, each of
+    the ants sharing a cell with too little food for all their claims
+    keeping the same fraction of its claim.
+    """
+
+    def __init__(self, synchronous=False):
+        self.synchronous = synchronous
+        self._x = {channel: [] for channel in CHANNELS}
+        self._y = {channel: [] for channel in CHANNELS}
+        self._amounts = {channel: [] for channel in CHANNELS}
+        self._claims = []
+        self._drops = {}
+
+    def __len__(self):
+        return (
+            sum(len(amounts) for amounts in self._amounts.values())
+            + len(self._claims)
+            + sum(len(amounts) for _, amounts in self._drops.values())
+        )
+
+    def add(self, channel, x, y, amount):
+        """Collects amount to add to the chemical channel at x, y"""
+        self._x[channel].append(x)
+        self._y[channel].append(y)
+        self._amounts[channel].append(amount)
+
+    def claim(self, ant, x, y):
+        """Collects the food ant took at x, y, kept in ``ant.food`` until
+        the claims are settled"""
+        self._claims.append((ant, x, y))
+
+    def drop(self, nest, amount):
+        """Collects amount of food dropped at nest"""
+        self._drops.setdefault(id(nest), (nest, []))[1].append(amount)
+
+    def flush(self, chemicals):
+        """Adds every collected deposit to the chemicals and clears them"""
+        width, height = chemicals.size
+        self._settle_claims(chemicals)
+        for nest, amounts in self._drops.values():
+            nest.food += math.fsum(amounts)
+        self._drops = {}
+        for channel in CHANNELS:
+            amounts = self._amounts[channel]
+            if not amounts:
+                continue
+            x = np.array(self._x[channel], dtype=np.int64) % width
+            y = np.array(self._y[channel], dtype=np.int64) % height
+            amounts = np.array(amounts, dtype=float)
+            if self.synchronous:
+                order = np.lexsort((amounts, x * height + y))
+                x, y, amounts = x[order], y[order], amounts[order]
+            getattr(chemicals, channel).scatter_add(x, y, amounts)
+            self._x[channel] = []
+            self._y[channel] = []
+            self._amounts[channel] = []
+
+    def _settle_claims(self, chemicals):
+        if not self._claims:
+            return
+        width, height = chemicals.size
+        ants, x, y = zip(*self._claims)
+        self._claims = []
+        x = np.array(x, dtype=np.int64) % width
+        y = np.array(y, dtype=np.int64) % height
+        claimed = np.array([ant.food for ant in ants], dtype=float)
+
+        order = np.lexsort((claimed, x * height + y))
+        cells, inverse = np.unique(x * height + y, return_inverse=True)
+        totals = np.zeros(len(cells))
+        np.add.at(totals, inverse[order], claimed[order])
+        cell_x, cell_y = cells // height, cells % height
+        available = chemicals.food.gather(cell_x, cell_y)
+        short = totals > available
+        fraction = np.ones(len(cells))
+        fraction[short] = available[short] / totals[short]
+        for ant, share in zip(ants, (claimed * fraction[inverse]).tolist()):
+            ant.food = share
+        chemicals.food.scatter_add(
+            cell_x,
+            cell_y,
+            -np.minimum(totals, available)
+        )
+
+    def state(self):
+        """Returns the deposits not flushed yet, as a dict of NumPy
+        arrays. Food claimed or dropped must be flushed first."""
+        if self._claims or self._drops:
+            raise ValueError('Flush the food taken and dropped first')
+        state = {'synchronous': self.synchronous}
+        for channel in CHANNELS:
+            state['{}.x'.format(channel)] = np.array(
+                self._x[channel], dtype=np.int64
+            )
+            state['{}.y'.format(channel)] = np.array(
+                self._y[channel], dtype=np.int64
+            )
+            state['{}.amounts'.format(channel)] = np.array(
+                self._amounts[channel], dtype=float
+            )
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuilds the buffer from ``state()``"""
+        buffer = cls(synchronous=state.get('synchronous', False))
+        for channel in CHANNELS:
+            buffer._x[channel] = np.asarray(
+                state['{}.x'.format(channel)]
+            ).tolist()
+            buffer._y[channel] = np.asarray(
+                state['{}.y'.format(channel)]
+            ).tolist()
+            buffer._amounts[channel] = np.asarray(
+                state['{}.amounts'.format(channel)]
+            ).tolist()
+        return buffer
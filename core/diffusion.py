@@ -0,0 +1,82 @@
+import numpy as np
+
+# Largest coefficient for which the explicit stencil is stable
+MAX_COEFFICIENT = 0.25
+
+# Number of steps from which diffusing by FFT beats repeating the stencil
+FFT_STEPS = 8
+
+
+class Diffusion(object):
+    """Diffuses a periodic field in place, one tick at a time or many
+
+    Required Inputs
+        shape :: tuple :: shape of the fields, (replicas,) + size for stacks
+        coefficient :: float :: fraction of a cell passed to each of its
+            four neighbours per tick, at most MAX_COEFFICIENT
+
+    One step is the explicit five-point stencil ``u + D * laplacian(u)``
+    with periodic wrap on the last two axes, computed with slices of two
+    preallocated buffers and added to the field in place. It conserves the
+    total amount and keeps every cell between the minimum and maximum of
+    its neighbourhood. Calling
+    with FFT_STEPS steps or more applies the same stencil ``steps`` times
+    at once as one multiplication in Fourier space instead.
+    """
+
+    def __init__(self, shape, coefficient):
+        if not 0 < coefficient <= MAX_COEFFICIENT:
+            raise ValueError(
+                'coefficient must be in (0, {}]'.format(MAX_COEFFICIENT)
+            )
+        if shape[-2] < 2 or shape[-1] < 2:
+            raise ValueError('Diffusion needs at least 2 cells a side')
+        self.shape = tuple(shape)
+        self.coefficient = coefficient
+        self._scaled = np.empty(self.shape)
+        self._out = np.empty(self.shape)
+        self._multipliers = {}
+
+    def __call__(self, field, steps=1):
+        """Diffuses field, an array or PeriodicLattice, for steps ticks"""
+        array = np.asarray(field)
+        if steps >= FFT_STEPS:
+            self._fft(array, steps)
+            return
+        for _ in range(steps):
+            self._stencil(array)
+
+    def _stencil(self, u):
+        scaled, out = self._scaled, self._out
+        np.multiply(u, self.coefficient, out=scaled)
+        # Neighbours along y, added on the flattened buffers as that is
+        # much faster than slicing the last axis. Only the first and last
+        # column pick up a wrong neighbour, so they are redone.
+        flat_scaled, flat_out = scaled.reshape(-1), out.reshape(-1)
+        np.add(flat_scaled[:-2], flat_scaled[2:], out=flat_out[1:-1])
+        np.add(scaled[..., :, -1], scaled[..., :, 1], out=out[..., :, 0])
+        np.add(scaled[..., :, -2], scaled[..., :, 0], out=out[..., :, -1])
+        # Neighbours along x, wrapping at the edges
+        out[..., 1:, :] += scaled[..., :-1, :]
+        out[..., :1, :] += scaled[..., -1:, :]
+        out[..., :-1, :] += scaled[..., 1:, :]
+        out[..., -1:, :] += scaled[..., :1, :]
+        u *= 1 - 4 * self.coefficient
+        u += out
+
+    def _fft(self, u, steps):
+        size = u.shape[-2:]
+        u[...] = np.fft.irfft2(
+            np.fft.rfft2(u) * self._multiplier(size, steps),
+            s=size
+        )
+
+    def _multiplier(self, size, steps):
+        """The Fourier transform of the stencil, to the power steps"""
+        if steps not in self._multipliers:
+            width, height = size
+            cx = np.cos(2 * np.pi * np.fft.fftfreq(width))[:, None]
+            cy = np.cos(2 * np.pi * np.fft.rfftfreq(height))[None, :]
+            step = 1 - 2 * self.coefficient * ((1 - cx) + (1 - cy))
+            self._multipliers[steps] = step ** steps
+        return self._multipliers[steps]
@@ -0,0 +1,228 @@
+import numpy as np
+
+from core.lattice import LatticeBase
+
+COLUMNS = ('cells', 'amount', 'refill', 'every', 'regrow', 'capacity')
+
+
+class FoodSources(LatticeBase):
+    """The food of a world as an explicit set of sources
+
+    Required Inputs
+        shape :: tuple :: size of the world, or (replicas,) + size
+
+    Each source is a cell with an ``amount`` of food and a replenishment
+    rule, all stored as one array per property. Every ``every`` ticks
+    ``tick`` sets the amount of a source to its ``refill`` level, if it has
+    one, and adds ``regrow`` up to ``capacity``. Sources are added with
+    ``add`` and written cells without a source get one with no rule, so
+    FoodSources can stand in for the food lattice of Chemicals: scalar
+    reads go through a dict of cells, ``gather`` through a sorted array of
+    cells, cells without a source read as 0 and a tick costs O(sources).
+
+    Every time the amount of a source drops to 0, ``(tick, *cell)`` is
+    appended to ``depletions``.
+    """
+
+    def __init__(self, shape):
+        self.lattice_shape = tuple(shape)
+        self.ticks = 0
+        self.depletions = []
+        self.cells = np.empty(0, dtype=np.intp)
+        self.amount = np.empty(0)
+        self.refill = np.empty(0)
+        self.every = np.empty(0, dtype=np.int64)
+        self.regrow = np.empty(0)
+        self.capacity = np.empty(0)
+        self._index()
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __array__(self, dtype=None, copy=None):
+        dense = np.zeros(self.lattice_shape, dtype=dtype or self.dtype)
+        dense.reshape(-1)[self.cells] = self.amount
+        return dense
+
+    def add(
+        self,
+        x,
+        y,
+        amount,
+        refill=None,
+        every=1,
+        regrow=0.0,
+        capacity=np.inf,
+        replica=None,
+    ):
+        """Adds a source at x, y, or replaces the one there
+
+        With replicas the source is added to every replica unless replica
+        says which one.
+        """
+        if self.ndim == 3 and replica is None:
+            replicas = range(self.lattice_shape[0])
+        else:
+            replicas = [replica]
+        width, height = self.lattice_shape[-2:]
+        cells = np.array([
+            self._flat((x % width, y % height), r) for r in replicas
+        ])
+        self._remove(cells)
+        self._append(
+            cells,
+            amount,
+            np.nan if refill is None else refill,
+            every,
+            regrow,
+            capacity
+        )
+
+    def tick(self):
+        """Replenishes the sources that are due this tick"""
+        self.ticks += 1
+        due = self.ticks % self.every == 0
+        refilling = due & ~np.isnan(self.refill)
+        self.amount[refilling] = self.refill[refilling]
+        regrowing = due & (self.regrow != 0)
+        self.amount[regrowing] = np.minimum(
+            self.amount[regrowing] + self.regrow[regrowing],
+            self.capacity[regrowing]
+        )
+
+    def __getitem__(self, index):
+        cell = self._cell(index)
+        if cell is None:
+            return np.asarray(self)[index]
+        slot = self._slots.get(self._flat(cell[-2:], *cell[:-2]))
+        if slot is None:
+            return 0.0
+        return self.amount[slot]
+
+    def __setitem__(self, index, item):
+        cell = self._cell(index)
+        if cell is None:
+            dense = np.asarray(self)
+            before = dense.reshape(-1).copy()
+            dense[index] = item
+            after = dense.reshape(-1)
+            changed = np.flatnonzero(after != before)
+            self._set(changed, after[changed])
+            return
+        cell = self._flat(cell[-2:], *cell[:-2])
+        self._set(np.array([cell]), np.array([item], dtype=float))
+
+    def gather(self, x, y, replica=None):
+        """Returns the food at arrays of x and y already on the lattice"""
+        return self._values(self._flat((x, y), replica))
+
+    def scatter_add(self, x, y, amounts, replica=None):
+        """Adds amounts at arrays of x and y already on the lattice"""
+        cells = np.asarray(self._flat((x, y), replica)).reshape(-1)
+        amounts = np.broadcast_to(amounts, cells.shape)
+        unique, inverse = np.unique(cells, return_inverse=True)
+        totals = np.zeros(len(unique))
+        np.add.at(totals, inverse, amounts)
+        self._set(unique, self._values(unique) + totals)
+
+    def state(self):
+        """Returns everything needed to rebuild the sources, as a dict of
+        NumPy arrays and plain numbers"""
+        return {
+            'shape': list(self.lattice_shape),
+            'ticks': self.ticks,
+            'cells': self.cells,
+            'amount': self.amount,
+            'refill': self.refill,
+            'every': self.every,
+            'regrow': self.regrow,
+            'capacity': self.capacity,
+            'depletions': np.array(
+                self.depletions,
+                dtype=np.int64
+            ).reshape(-1, 1 + len(self.lattice_shape)),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuilds the sources from ``state()``"""
+        sources = cls(state['shape'])
+        sources.ticks = state['ticks']
+        for name in COLUMNS:
+            setattr(sources, name, np.array(state[name]))
+        sources.depletions = [tuple(d) for d in state['depletions'].tolist()]
+        sources._index()
+        return sources
+
+    def _set(self, cells, values):
+        """Sets the food at flat cells, adding sources for new cells"""
+        slots = self._lookup(cells)
+        new = (slots < 0) & (values != 0)
+        if new.any():
+            self._append(cells[new], 0.0, np.nan, 1, 0.0, np.inf)
+            slots = self._lookup(cells)
+        known = slots >= 0
+        slots, values, cells = slots[known], values[known], cells[known]
+        depleted = (self.amount[slots] > 0) & (values <= 0)
+        self.amount[slots] = values
+        for cell in cells[depleted]:
+            self.depletions.append((self.ticks,) + tuple(
+                int(i) for i in np.unravel_index(cell, self.lattice_shape)
+            ))
+
+    def _append(self, cells, amount, refill, every, regrow, capacity):
+        n = len(cells)
+        self.cells = np.concatenate([self.cells, cells])
+        for name, value in (
+            ('amount', amount),
+            ('refill', refill),
+            ('every', every),
+            ('regrow', regrow),
+            ('capacity', capacity),
+        ):
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate([
+                column,
+                np.full(n, value, dtype=column.dtype)
+            ]))
+        self._index()
+
+    def _values(self, cells):
+        slots = self._lookup(cells)
+        if not len(self):
+            return np.zeros(slots.shape)
+        return np.where(slots >= 0, self.amount[np.maximum(slots, 0)], 0.0)
+
+    def _remove(self, cells):
+        keep = ~np.isin(self.cells, cells)
+        if keep.all():
+            return
+        for name in COLUMNS:
+            setattr(self, name, getattr(self, name)[keep])
+
+    def _index(self):
+        """Rebuilds the dict and the sorted array mapping cells to slots"""
+        self._slots = {int(c): slot for slot, c in enumerate(self.cells)}
+        self._order = np.argsort(self.cells)
+        self._sorted = self.cells[self._order]
+
+    def _lookup(self, cells):
+        """Slots of flat cells, -1 for cells without a source"""
+        cells = np.asarray(cells)
+        if not len(self._sorted):
+            return np.full(cells.shape, -1, dtype=np.intp)
+        position = np.searchsorted(self._sorted, cells)
+        position = np.minimum(position, len(self._sorted) - 1)
+        return np.where(
+            self._sorted[position] == cells,
+            self._order[position],
+            -1
+        )
+
+    def _flat(self, cell, replica=None):
+        x, y = cell
+        width, height = self.lattice_shape[-2:]
+        flat = x * height + y
+        if replica is not None:
+            flat = flat + replica * (width * height)
+        return flat
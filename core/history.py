@@ -0,0 +1,178 @@
+import numpy as np
+
+
+class TimeSeries(object):
+    """A typed record of one value over time, stored in NumPy arrays
+
+    Optional Inputs
+        dtype :: numpy dtype :: type of the recorded values
+        capacity :: int :: number of samples to preallocate
+        ring :: bool :: keep only the last ``capacity`` samples
+        every :: int :: keep only every k-th appended value
+        window :: int :: reduce each window of k appended values to its
+            mean, minimum and maximum
+
+    Storage grows by doubling unless ``ring`` is set. ``values`` (and
+    ``minimum`` and ``maximum`` with a ``window``) are views of the
+    storage in time order, so plotting them copies nothing. ``ticks``
+    gives the append index each sample stands for.
+    """
+
+    def __init__(
+        self,
+        dtype=float,
+        capacity=1024,
+        ring=False,
+        every=1,
+        window=None
+    ):
+        if capacity < 1 or every < 1 or (window is not None and window < 1):
+            raise ValueError('capacity, every and window must be positive')
+        if window is not None and every != 1:
+            raise ValueError('Use either every or window, not both')
+        self.dtype = np.dtype(dtype)
+        self.ring = ring
+        self.every = every
+        self.window = window
+        self.appended = 0
+        self._samples = _Buffer(self.dtype, capacity, ring)
+        if window is not None:
+            self._minimum = _Buffer(self.dtype, capacity, ring)
+            self._maximum = _Buffer(self.dtype, capacity, ring)
+            self._window_values = np.empty(window, dtype=float)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def append(self, value):
+        position = self.appended
+        self.appended += 1
+        if self.window is None:
+            if position % self.every == 0:
+                self._samples.append(value)
+            return
+
+        self._window_values[position % self.window] = value
+        if self.appended % self.window == 0:
+            self._samples.append(self._window_values.mean())
+            self._minimum.append(self._window_values.min())
+            self._maximum.append(self._window_values.max())
+
+    @property
+    def values(self):
+        return self._samples.view()
+
+    @property
+    def minimum(self):
+        return self._minimum.view()
+
+    @property
+    def maximum(self):
+        return self._maximum.view()
+
+    @property
+    def ticks(self):
+        step = self.every if self.window is None else self.window
+        first = self._samples.dropped
+        return np.arange(first, first + len(self)) * step
+
+    def state(self):
+        """Returns everything needed to rebuild the series, as a dict of
+        NumPy arrays and plain numbers"""
+        state = {
+            'dtype': self.dtype.str,
+            'capacity': self._samples.capacity,
+            'ring': self.ring,
+            'every': self.every,
+            'window': self.window,
+            'appended': self.appended,
+            'size': self._samples.size,
+            'dropped': self._samples.dropped,
+            'samples': self._samples.data,
+        }
+        if self.window is not None:
+            state['minimum'] = self._minimum.data
+            state['maximum'] = self._maximum.data
+            state['window_values'] = self._window_values
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuilds a series from ``state()``, using its arrays as storage"""
+        series = cls(
+            dtype=state['dtype'],
+            capacity=state['capacity'],
+            ring=state['ring'],
+            every=state['every'],
+            window=state['window']
+        )
+        series.appended = state['appended']
+        buffers = [('samples', series._samples)]
+        if series.window is not None:
+            buffers += [
+                ('minimum', series._minimum),
+                ('maximum', series._maximum),
+            ]
+            series._window_values = state['window_values']
+        for name, buffer in buffers:
+            buffer.data = state[name]
+            buffer.size = state['size']
+            buffer.dropped = state['dropped']
+        return series
+
+    def clear(self):
+        self.appended = 0
+        self._samples.clear()
+        if self.window is not None:
+            self._minimum.clear()
+            self._maximum.clear()
+
+
+class _Buffer(object):
+    """A growable array, or a ring buffer of fixed capacity
+
+    The ring buffer writes every sample twice, ``capacity`` apart, so the
+    last ``capacity`` samples are always one contiguous slice.
+    """
+
+    def __init__(self, dtype, capacity, ring):
+        self.capacity = capacity
+        self.ring = ring
+        self.size = 0
+        self.dropped = 0
+        self.data = np.empty(2 * capacity if ring else capacity, dtype=dtype)
+
+    def __len__(self):
+        return self.size
+
+    def append(self, value):
+        if self.ring:
+            position = (self.size + self.dropped) % self.capacity
+            self.data[position] = value
+            self.data[position + self.capacity] = value
+            if self.size == self.capacity:
+                self.dropped += 1
+            else:
+                self.size += 1
+            return
+
+        if self.size == len(self.data):
+            data = np.empty(2 * len(self.data), dtype=self.data.dtype)
+            data[:self.size] = self.data
+            self.data = data
+        self.data[self.size] = value
+        self.size += 1
+
+    def view(self):
+        if self.ring:
+            start = self.dropped % self.capacity
+            view = self.data[start:start + self.size]
+        else:
+            view = self.data[:self.size]
+        view = view.view()
+        view.flags.writeable = False
+        return view
+
+    def clear(self):
+        self.size = 0
+        self.dropped = 0
@@ -0,0 +1,847 @@
+import os
+
+import numpy as np
+
+
+class PeriodicLattice(np.ndarray):
+    """Creates an n-dimensional ring that joins on boundaries w/ numpy
+
+    Required Inputs
+        array :: np.array :: n-dim numpy array to use wrap with
+
+    Only currently supports single point selections wrapped around the boundary
+    """
+    def __new__(cls, input_array, lattice_spacing=None):
+        """__new__ is called by numpy when and explicit constructor is used:
+        obj = MySubClass(params) otherwise we must rely on __array_finalize
+         """
+        # Input array is an already formed ndarray instance
+        # We first cast to be our class type
+        obj = np.asarray(input_array).view(cls)
+
+        # add the new attribute to the created instance
+        obj.lattice_shape = input_array.shape
+        obj.lattice_dim = len(input_array.shape)
+        obj.lattice_spacing = lattice_spacing
+
+        # Finally, we must return the newly created object:
+        return obj
+
+    def __getitem__(self, index):
+        index = self.latticeWrapIdx(index)
+        return super(PeriodicLattice, self).__getitem__(index)
+
+    def __setitem__(self, index, item):
+        index = self.latticeWrapIdx(index)
+        return super(PeriodicLattice, self).__setitem__(index, item)
+
+    def decay(self, factor, a_min=None, a_max=None):
+        """Multiplies the lattice by factor and clips it, in place"""
+        self *= factor
+        np.clip(self, a_min, a_max, out=self)
+
+    def gather(self, x, y, replica=None):
+        """Returns the values at arrays of x and y already on the lattice
+
+        For a stack of lattices, replica picks the lattice of each value.
+        """
+        if replica is None:
+            return self.view(np.ndarray)[x, y]
+        return self.view(np.ndarray)[replica, x, y]
+
+    def scatter_add(self, x, y, amounts, replica=None):
+        """Adds amounts at arrays of x and y already on the lattice"""
+        index = (x, y) if replica is None else (replica, x, y)
+        np.add.at(self.view(np.ndarray), index, amounts)
+
+    def __array_finalize__(self, obj):
+        """ ndarray.__new__ passes __array_finalize__ the new object,
+        of our own class (self) as well as the object from which the view has been taken (obj).
+        See
+        http://docs.scipy.org/doc/numpy/user/basics.subclassing.html#simple-example-adding-an-extra-attribute-to-ndarray
+        for more info
+        """
+        # ``self`` is a new object resulting from
+        # ndarray.__new__(Periodic_Lattice, ...), therefore it only has
+        # attributes that the ndarray.__new__ constructor gave it -
+        # i.e. those of a standard ndarray.
+        #
+        # We could have got to the ndarray.__new__ call in 3 ways:
+        # From an explicit constructor - e.g. Periodic_Lattice():
+        #   1. obj is None
+        #       (we're in the middle of the Periodic_Lattice.__new__
+        #       constructor, and self.info will be set when we return to
+        #       Periodic_Lattice.__new__)
+        if obj is None: return
+        #   2. From view casting - e.g arr.view(Periodic_Lattice):
+        #       obj is arr
+        #       (type(obj) can be Periodic_Lattice)
+        #   3. From new-from-template - e.g lattice[:3]
+        #       type(obj) is Periodic_Lattice
+        #
+        # Note that it is here, rather than in the __new__ method,
+        # that we set the default value for 'spacing', because this
+        # method sees all creation of default objects - with the
+        # Periodic_Lattice.__new__ constructor, but also with
+        # arr.view(Periodic_Lattice).
+        #
+        # These are in effect the default values from these operations
+        self.lattice_shape = getattr(obj, 'lattice_shape', obj.shape)
+        self.lattice_dim = getattr(obj, 'lattice_dim', len(obj.shape))
+        self.lattice_spacing = getattr(obj, 'lattice_spacing', None)
+        pass
+
+    def latticeWrapIdx(self, index):
+        """returns periodic lattice index
+        for a given iterable index
+
+        Required Inputs:
+            index :: iterable :: one integer for each axis
+
+        This is NOT compatible with slicing
+        """
+        if not hasattr(index, '__iter__'): return index         # handle integer slices
+        if len(index) != len(self.lattice_shape): return index  # must reference a scalar
+        if any(type(i) == slice for i in index): return index   # slices not supported
+        if len(index) == len(self.lattice_shape):               # periodic indexing of scalars
+            mod_index = tuple(( (i%s + s)%s for i,s in zip(index, self.lattice_shape)))
+            return mod_index
+        raise ValueError('Unexpected index: {}'.format(index))
+
+
+PERIODIC = 'periodic'
+REFLECTING = 'reflecting'
+ABSORBING = 'absorbing'
+
+BOUNDARIES = (PERIODIC, REFLECTING, ABSORBING)
+
+_INTEGERS = (int, np.int64, np.int32, np.intp)
+
+
+class HaloLattice(PeriodicLattice):
+    """A 2-d lattice stored inside a buffer padded with ghost cells
+
+    Required Inputs
+        array :: np.array :: 2-dim numpy array with the initial values
+
+    Optional Inputs
+        halo :: int :: number of ghost cells on every side
+        boundary :: str :: 'periodic', 'reflecting' or 'absorbing'
+        fill :: float :: value of the ghost cells of an absorbing boundary
+
+    The lattice itself is a view of the interior of ``padded``. Scalar and
+    slice indexes up to ``halo`` cells past an edge address the ghost cells
+    directly, so neighbourhood reads and 3x3 writes need no modulo. Scalar
+    indexes further out are wrapped for a periodic boundary, mirrored onto
+    the interior for a reflecting one, as the ghost cells are, and moved
+    to the nearest ghost cell for an absorbing one, so they read ``fill``
+    and what is written to them is dropped. Nothing confines the ants:
+    their coordinates go on past the edges, only their reads and writes
+    follow the boundary.
+
+    Ghost cells are only made consistent by ``sync``: writes made to ghost
+    cells are first folded back onto the interior cells they stand for
+    (or dropped for an absorbing boundary) and the ghost cells are then
+    refreshed from the interior.
+    """
+    def __new__(cls, input_array, halo=1, boundary=PERIODIC, fill=0.0):
+        input_array = np.asarray(input_array)
+        if input_array.ndim != 2:
+            raise ValueError('HaloLattice only supports 2-d arrays')
+        if boundary not in BOUNDARIES:
+            raise ValueError('Unknown boundary: {}'.format(boundary))
+        if halo < 1 or halo > min(input_array.shape):
+            raise ValueError('Unsupported halo: {}'.format(halo))
+
+        padded = np.full(
+            tuple(s + 2 * halo for s in input_array.shape),
+            fill,
+            dtype=input_array.dtype
+        )
+        interior = padded[halo:-halo, halo:-halo]
+        interior[...] = input_array
+
+        obj = super(HaloLattice, cls).__new__(cls, interior)
+        obj.padded = padded
+        obj.halo = halo
+        obj.boundary = boundary
+        obj.fill = fill
+        obj._ghosts = None
+        obj.refresh()
+        return obj
+
+    def __array_finalize__(self, obj):
+        super(HaloLattice, self).__array_finalize__(obj)
+        # Only the lattice built by __new__ owns the padded buffer, views
+        # and results of arithmetic are plain periodic lattices.
+        self.padded = None
+
+    def __getitem__(self, index):
+        padded_index = self._padded_index(index)
+        if padded_index is None:
+            return super(HaloLattice, self).__getitem__(index)
+        return self.padded[padded_index]
+
+    def __setitem__(self, index, item):
+        padded_index = self._padded_index(index)
+        if padded_index is None:
+            return super(HaloLattice, self).__setitem__(index, item)
+        self.padded[padded_index] = item
+
+    def _padded_index(self, index):
+        if self.padded is None or type(index) is not tuple or len(index) != 2:
+            return None
+        x, y = index
+        width, height = self.lattice_shape
+        halo = self.halo
+        if type(x) in _INTEGERS and type(y) in _INTEGERS:
+            if -halo <= x < width + halo and -halo <= y < height + halo:
+                return x + halo, y + halo
+            return self._outer(x, width) + halo, self._outer(y, height) + halo
+        x = _shift(x, width, halo)
+        y = _shift(y, height, halo)
+        if x is None or y is None:
+            return None
+        return x, y
+
+    def gather(self, x, y, replica=None):
+        """Returns the values at arrays of x and y already on the lattice
+
+        For a reflecting or absorbing boundary x and y may be anywhere and
+        are read as scalar indexes are, through the ghost cells.
+        """
+        if self.padded is None or self.boundary == PERIODIC:
+            return super(HaloLattice, self).gather(x, y, replica=replica)
+        return self.padded[self._padded_cells(x, 0), self._padded_cells(y, 1)]
+
+    def _padded_cells(self, index, axis):
+        """Moves an array of indexes along axis into padded coordinates,
+        like ``_outer`` for a reflecting or absorbing boundary"""
+        halo = self.halo
+        size = self.lattice_shape[axis]
+        inside = (index >= -halo) & (index < size + halo)
+        if self.boundary == REFLECTING:
+            outer = _reflect(index, size)
+        else:
+            outer = np.clip(index, -halo, size + halo - 1)
+        return np.where(inside, index, outer) + halo
+
+    def _outer(self, index, size):
+        """Moves a scalar index more than halo cells past an edge to the
+        cell it stands for"""
+        halo = self.halo
+        if -halo <= index < size + halo:
+            return index
+        if self.boundary == PERIODIC:
+            return index % size
+        if self.boundary == REFLECTING:
+            return _reflect(index, size)
+        return min(max(index, -halo), size + halo - 1)
+
+    def neighbourhood(self, x, y, radius=1):
+        """Returns a view of the cells within radius of an interior cell"""
+        x = x + self.halo
+        y = y + self.halo
+        return self.padded[
+            x - radius:x + radius + 1,
+            y - radius:y + radius + 1
+        ]
+
+    def decay(self, factor, a_min=None, a_max=None):
+        self.fold()
+        super(HaloLattice, self).decay(factor, a_min, a_max)
+        self.refresh()
+
+    def sync(self):
+        self.fold()
+        self.refresh()
+
+    def fold(self):
+        """Moves what was written to the ghost cells onto the interior"""
+        if self._ghosts is None:
+            return
+        for axis in range(2):
+            low_ghosts, high_ghosts = self._ghost_slabs(axis)
+            low_delta = self.padded[low_ghosts] - self._ghosts[axis][0]
+            high_delta = self.padded[high_ghosts] - self._ghosts[axis][1]
+            low_image, high_image = self._ghost_images(axis)
+            if self.boundary == PERIODIC:
+                self.padded[low_image] += low_delta
+                self.padded[high_image] += high_delta
+            elif self.boundary == REFLECTING:
+                self.padded[low_image] += np.flip(low_delta, axis)
+                self.padded[high_image] += np.flip(high_delta, axis)
+
+    def refresh(self):
+        """Overwrites the ghost cells from the interior"""
+        for axis in range(2):
+            low_ghosts, high_ghosts = self._ghost_slabs(axis)
+            low_image, high_image = self._ghost_images(axis)
+            if self.boundary == PERIODIC:
+                self.padded[low_ghosts] = self.padded[low_image]
+                self.padded[high_ghosts] = self.padded[high_image]
+            elif self.boundary == REFLECTING:
+                self.padded[low_ghosts] = np.flip(self.padded[low_image], axis)
+                self.padded[high_ghosts] = np.flip(
+                    self.padded[high_image],
+                    axis
+                )
+            else:
+                self.padded[low_ghosts] = self.fill
+                self.padded[high_ghosts] = self.fill
+        # The corners are only right once both axes are done, so the
+        # ghost cells are remembered afterwards to spot later writes.
+        self._ghosts = [
+            tuple(self.padded[slab].copy() for slab in self._ghost_slabs(axis))
+            for axis in range(2)
+        ]
+
+    def _ghost_slabs(self, axis):
+        halo = self.halo
+        size = self.lattice_shape[axis]
+        return (
+            _along(axis, slice(0, halo)),
+            _along(axis, slice(size + halo, size + 2 * halo))
+        )
+
+    def _ghost_images(self, axis):
+        """The interior slabs the low and high ghost cells stand for"""
+        halo = self.halo
+        size = self.lattice_shape[axis]
+        if self.boundary == PERIODIC:
+            return (
+                _along(axis, slice(size, size + halo)),
+                _along(axis, slice(halo, 2 * halo))
+            )
+        return (
+            _along(axis, slice(halo, 2 * halo)),
+            _along(axis, slice(size, size + halo))
+        )
+
+
+def _along(axis, index):
+    if axis == 0:
+        return index, slice(None)
+    return slice(None), index
+
+
+def _reflect(index, size):
+    """The cell index stands for when the lattice is mirrored at its
+    edges, -1 standing for 0 and size for size - 1"""
+    index = index % (2 * size)
+    return np.where(index < size, index, 2 * size - 1 - index)
+
+
+def _shift(index, size, halo):
+    """Moves a lattice slice into padded coordinates, or returns None"""
+    if type(index) is not slice or index.step not in (None, 1):
+        return None
+    start = 0 if index.start is None else index.start
+    stop = size if index.stop is None else index.stop
+    if type(start) not in _INTEGERS or type(stop) not in _INTEGERS:
+        return None
+    if not -halo <= start <= stop <= size + halo:
+        return None
+    return slice(start + halo, stop + halo)
+
+
+class LatticeBase(object):
+    """Base of the lattices that are not ndarrays
+
+    Subclasses keep the shape of the lattice in ``lattice_shape`` and hold
+    floats. Scalar indexes wrap around every axis, ``_cell`` turning them
+    into the cell they address, and adding or subtracting gives a plain
+    PeriodicLattice.
+    """
+
+    dtype = np.dtype(float)
+
+    @property
+    def shape(self):
+        return self.lattice_shape
+
+    @property
+    def size(self):
+        return int(np.prod(self.lattice_shape))
+
+    @property
+    def ndim(self):
+        return len(self.lattice_shape)
+
+    def __add__(self, other):
+        return PeriodicLattice(np.asarray(self) + np.asarray(other))
+
+    def __sub__(self, other):
+        return PeriodicLattice(np.asarray(self) - np.asarray(other))
+
+    def _cell(self, index):
+        """The wrapped cell of a scalar index, or None for other indexes"""
+        if type(index) is not tuple or len(index) != len(self.lattice_shape):
+            return None
+        if len(index) == 2:
+            x, y = index
+            if type(x) not in _INTEGERS or type(y) not in _INTEGERS:
+                return None
+            width, height = self.lattice_shape
+            return x % width, y % height
+        for i in index:
+            if type(i) not in _INTEGERS:
+                return None
+        return tuple(i % size for i, size in zip(index, self.lattice_shape))
+
+
+class LazyDecayLattice(LatticeBase):
+    """A 2-d lattice that decays in O(1) through a global scale factor
+
+    Required Inputs
+        array :: np.array :: 2-dim numpy array with the initial values
+
+    Optional Inputs
+        renormalise_below :: float :: scale at which ``raw`` is rescaled
+
+    Values are stored in ``raw`` relative to ``scale``, so the observed
+    value of a cell is ``raw * scale`` and ``decay`` only has to multiply
+    the scale. Writes are divided by the current scale.
+
+    The clipping done by ``decay`` is applied on read instead: once the
+    lattice has decayed, a cell reads as at least ``a_min`` and at most
+    ``a_max`` unless it was written since the last decay, exactly as a
+    PeriodicLattice clipped once per tick. Cells written since the last
+    decay are clipped by the next one, so a decay costs O(cells written).
+    """
+    def __init__(self, input_array, renormalise_below=1e-12):
+        self.raw = np.array(input_array, dtype=float)
+        if self.raw.ndim != 2:
+            raise ValueError('LazyDecayLattice only supports 2-d arrays')
+        self.lattice_shape = self.raw.shape
+        self.scale = 1.0
+        self.renormalise_below = renormalise_below
+        self.clipping = False
+        self.a_min = None
+        self.a_max = None
+        self._written = np.zeros(self.raw.shape, dtype=bool)
+        self._cells_written = []
+        self._arrays_written = []
+        self._mark(np.flatnonzero(self.raw))
+
+    def __array__(self, dtype=None, copy=None):
+        values = self._values(Ellipsis)
+        if dtype is not None:
+            values = values.astype(dtype)
+        return values
+
+    def __getitem__(self, index):
+        cell = self._cell(index)
+        if cell is None:
+            return self._values(index)
+        value = self.raw[cell] * self.scale
+        if self.clipping and not self._written[cell]:
+            value = min(max(value, self.a_min), self.a_max)
+        return value
+
+    def __setitem__(self, index, item):
+        cell = self._cell(index)
+        if cell is None:
+            self.raw[index] = np.asarray(item) / self.scale
+            self._mark(self._flat(index))
+            return
+        self.raw[cell] = item / self.scale
+        if not self._written[cell]:
+            self._written[cell] = True
+            self._cells_written.append(
+                cell[0] * self.lattice_shape[1] + cell[1]
+            )
+
+    def __iadd__(self, other):
+        self[...] = self._values(Ellipsis) + np.asarray(other)
+        return self
+
+    def __isub__(self, other):
+        self[...] = self._values(Ellipsis) - np.asarray(other)
+        return self
+
+    def __imul__(self, other):
+        self[...] = self._values(Ellipsis) * np.asarray(other)
+        return self
+
+    def gather(self, x, y):
+        """Returns the values at arrays of x and y already on the lattice"""
+        values = self.raw[x, y] * self.scale
+        if self.clipping:
+            values = np.where(
+                self._written[x, y],
+                values,
+                np.clip(values, self.a_min, self.a_max)
+            )
+        return values
+
+    def scatter_add(self, x, y, amounts):
+        """Adds amounts at arrays of x and y already on the lattice"""
+        values = self.gather(x, y)
+        self.raw[x, y] = values / self.scale
+        np.add.at(self.raw, (x, y), np.asarray(amounts) / self.scale)
+        self._mark(np.ravel_multi_index((x, y), self.lattice_shape))
+
+    def decay(self, factor, a_min=None, a_max=None):
+        self.scale *= factor
+        self.clipping = True
+        self.a_min = -np.inf if a_min is None else a_min
+        self.a_max = np.inf if a_max is None else a_max
+
+        if self._cells_written or self._arrays_written:
+            written = np.unique(np.concatenate(
+                [np.array(self._cells_written, dtype=np.intp)] +
+                self._arrays_written
+            ))
+            raw = self.raw.reshape(-1)
+            raw[written] = np.clip(
+                raw[written] * self.scale,
+                self.a_min,
+                self.a_max
+            ) / self.scale
+            self._written.reshape(-1)[written] = False
+            self._cells_written = []
+            self._arrays_written = []
+
+        if self.scale < self.renormalise_below:
+            self.raw *= self.scale
+            np.clip(self.raw, self.a_min, self.a_max, out=self.raw)
+            self.scale = 1.0
+
+    def state(self):
+        """Returns everything needed to rebuild the lattice, as a dict of
+        NumPy arrays and plain numbers"""
+        return {
+            'raw': self.raw,
+            'written': self._written,
+            'scale': self.scale,
+            'renormalise_below': self.renormalise_below,
+            'clipping': self.clipping,
+            'a_min': self.a_min,
+            'a_max': self.a_max,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuilds a lattice from ``state()``, using its arrays as storage"""
+        lattice = cls.__new__(cls)
+        lattice.raw = state['raw']
+        lattice.lattice_shape = lattice.raw.shape
+        lattice.scale = state['scale']
+        lattice.renormalise_below = state['renormalise_below']
+        lattice.clipping = state['clipping']
+        lattice.a_min = state['a_min']
+        lattice.a_max = state['a_max']
+        lattice._written = state['written']
+        lattice._cells_written = []
+        lattice._arrays_written = [np.flatnonzero(lattice._written)]
+        return lattice
+
+    def _values(self, index):
+        values = self.raw[index] * self.scale
+        if self.clipping:
+            values = np.where(
+                self._written[index],
+                values,
+                np.clip(values, self.a_min, self.a_max)
+            )
+        return values
+
+    def _mark(self, flat):
+        flat = np.asarray(flat).reshape(-1)
+        written = self._written.reshape(-1)
+        flat = flat[~written[flat]]
+        if flat.size:
+            written[flat] = True
+            self._arrays_written.append(flat)
+
+    def _flat(self, index):
+        """Flat indexes of the cells selected by a numpy index"""
+        rows, columns = self.lattice_shape
+        if type(index) is tuple and len(index) == 2 and all(
+            type(i) is slice or type(i) in _INTEGERS for i in index
+        ):
+            try:
+                x = np.arange(rows)[index[0]]
+                y = np.arange(columns)[index[1]]
+                return np.add.outer(x * columns, y)
+            except IndexError:
+                pass
+        selected = np.zeros(self.lattice_shape, dtype=bool)
+        selected[index] = True
+        return np.flatnonzero(selected)
+
+
+class TiledLattice(LatticeBase):
+    """A sparse 2-d periodic lattice of square tiles allocated on first write
+
+    Required Inputs
+        shape :: tuple :: size of the lattice
+
+    Optional Inputs
+        tile_size :: int :: width and height of a tile
+        fill :: float :: value of every cell that has never been written
+
+    Only tiles that have been written hold memory, stacked in ``tiles``
+    with ``index`` mapping each tile position to its slot, or -1. Cells of
+    unallocated tiles read as ``fill``. ``decay`` scales and clips the live
+    tiles and ``fill`` alike, so the lattice holds the same values as a
+    PeriodicLattice of its shape would, with memory growing with the area
+    written rather than with the shape. Reading or writing through slices
+    builds a dense copy, so is only meant for small lattices and plots.
+    """
+    def __init__(self, shape, tile_size=64, fill=0.0):
+        if len(shape) != 2:
+            raise ValueError('TiledLattice only supports 2-d lattices')
+        self.lattice_shape = tuple(shape)
+        self.tile_size = tile_size
+        self.fill = fill
+        self.index = np.full(
+            (-(-shape[0] // tile_size), -(-shape[1] // tile_size)),
+            -1,
+            dtype=np.intp
+        )
+        self.n_tiles = 0
+        self._storage = np.empty((1, tile_size, tile_size))
+
+    @property
+    def tiles(self):
+        return self._storage[:self.n_tiles]
+
+    @property
+    def nbytes(self):
+        return self._storage.nbytes + self.index.nbytes
+
+    def __array__(self, dtype=None, copy=None):
+        tile_size = self.tile_size
+        rows, columns = self.index.shape
+        dense = np.full(
+            (rows, tile_size, columns, tile_size),
+            self.fill,
+            dtype=dtype or self.dtype
+        )
+        x, y = np.nonzero(self.index >= 0)
+        dense[x, :, y, :] = self.tiles[self.index[x, y]]
+        dense = dense.reshape(rows * tile_size, columns * tile_size)
+        return dense[:self.lattice_shape[0], :self.lattice_shape[1]]
+
+    def __getitem__(self, index):
+        cell = self._cell(index)
+        if cell is None:
+            return np.asarray(self)[index]
+        x, y = cell
+        slot = self.index[x // self.tile_size, y // self.tile_size]
+        if slot < 0:
+            return self.fill
+        return self._storage[slot, x % self.tile_size, y % self.tile_size]
+
+    def __setitem__(self, index, item):
+        cell = self._cell(index)
+        if cell is None:
+            dense = np.asarray(self)
+            dense[index] = item
+            self._assign(dense)
+            return
+        x, y = cell
+        tile = x // self.tile_size, y // self.tile_size
+        slot = self.index[tile]
+        if slot < 0:
+            slot = self._allocate(np.array([tile[0]]), np.array([tile[1]]))
+            slot = slot[0]
+        self._storage[slot, x % self.tile_size, y % self.tile_size] = item
+
+    def __iadd__(self, other):
+        if np.ndim(other) == 0:
+            self.fill += other
+            self.tiles[...] += other
+        else:
+            self._assign(np.asarray(self) + other)
+        return self
+
+    def __isub__(self, other):
+        return self.__iadd__(-np.asarray(other))
+
+    def __imul__(self, other):
+        if np.ndim(other) == 0:
+            self.fill *= other
+            self.tiles[...] *= other
+        else:
+            self._assign(np.asarray(self) * other)
+        return self
+
+    def gather(self, x, y):
+        """Returns the values at arrays of x and y already on the lattice"""
+        tile_size = self.tile_size
+        slot = self.index[x // tile_size, y // tile_size]
+        values = self._storage[slot, x % tile_size, y % tile_size]
+        return np.where(slot >= 0, values, self.fill)
+
+    def scatter_add(self, x, y, amounts):
+        """Adds amounts at arrays of x and y already on the lattice"""
+        tile_size = self.tile_size
+        tile_x, tile_y = x // tile_size, y // tile_size
+        slot = self.index[tile_x, tile_y]
+        missing = slot < 0
+        if missing.any():
+            self._allocate(tile_x[missing], tile_y[missing])
+            slot = self.index[tile_x, tile_y]
+        np.add.at(self._storage, (slot, x % tile_size, y % tile_size), amounts)
+
+    def decay(self, factor, a_min=None, a_max=None):
+        """Multiplies the lattice by factor and clips it, in place, in
+        O(live tiles)"""
+        tiles = self.tiles
+        tiles *= factor
+        np.clip(tiles, a_min, a_max, out=tiles)
+        self.fill = float(np.clip(self.fill * factor, a_min, a_max))
+
+    def state(self):
+        """Returns everything needed to rebuild the lattice, as a dict of
+        NumPy arrays and plain numbers"""
+        return {
+            'shape': list(self.lattice_shape),
+            'tile_size': self.tile_size,
+            'fill': self.fill,
+            'index': self.index,
+            'tiles': self.tiles,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuilds a lattice from ``state()``, using its arrays as storage"""
+        lattice = cls.__new__(cls)
+        lattice.lattice_shape = tuple(state['shape'])
+        lattice.tile_size = state['tile_size']
+        lattice.fill = state['fill']
+        lattice.index = state['index']
+        lattice.n_tiles = len(state['tiles'])
+        lattice._storage = state['tiles']
+        if lattice.n_tiles == 0:
+            lattice._storage = np.empty((1,) + lattice._storage.shape[1:])
+        return lattice
+
+    def _allocate(self, tile_x, tile_y):
+        """Gives every unallocated tile of tile_x, tile_y a slot filled with
+        ``fill`` and returns the slots"""
+        tiles = np.unique(np.ravel_multi_index(
+            (tile_x, tile_y),
+            self.index.shape
+        ))
+        index = self.index.reshape(-1)
+        tiles = tiles[index[tiles] < 0]
+        needed = self.n_tiles + len(tiles)
+        if needed > len(self._storage):
+            storage = np.empty(
+                (max(needed, 2 * len(self._storage)),) +
+                self._storage.shape[1:],
+                dtype=self._storage.dtype
+            )
+            storage[:self.n_tiles] = self.tiles
+            self._storage = storage
+        slots = np.arange(self.n_tiles, needed)
+        self._storage[slots] = self.fill
+        index[tiles] = slots
+        self.n_tiles = needed
+        return self.index[tile_x, tile_y]
+
+    def _assign(self, dense):
+        """Sets the lattice to a dense array, allocating only the tiles that
+        differ from ``fill``"""
+        tile_size = self.tile_size
+        rows, columns = self.index.shape
+        padded = np.full(
+            (rows * tile_size, columns * tile_size),
+            self.fill,
+            dtype=self.dtype
+        )
+        padded[:self.lattice_shape[0], :self.lattice_shape[1]] = dense
+        blocks = padded.reshape(rows, tile_size, columns, tile_size)
+        blocks = blocks.transpose(0, 2, 1, 3)
+        x, y = np.nonzero(
+            (blocks != self.fill).any(axis=(2, 3)) | (self.index >= 0)
+        )
+        slots = self._allocate(x, y)
+        self._storage[slots] = blocks[x, y]
+
+
+# Bytes of a MappedLattice decayed at once
+TILE_BYTES = 64 * 2 ** 20
+
+
+class MappedLattice(PeriodicLattice):
+    """A PeriodicLattice stored in a file, through np.memmap
+
+    Required Inputs
+        path :: str :: file of the values, created if it does not exist
+        shape :: tuple :: shape of the lattice
+
+    Optional Inputs
+        fill :: float :: value of every cell of a new file
+        tile_bytes :: int :: bytes decayed at once
+
+    The values live in the file and are paged in as the cells are read,
+    so a lattice larger than memory only holds the pages the ants work
+    on. ``decay`` runs through the lattice a tile of rows at a time, each
+    mapped on its own and written back before the next, so the whole
+    lattice is never in memory at once, though every decay reads and
+    writes the whole file. ``flush`` writes every change to the file, which
+    is then a snapshot that ``MappedLattice(path, shape)`` opens again.
+    Views and results of arithmetic are plain in-memory lattices.
+    """
+    def __new__(cls, path, shape, fill=0.0, tile_bytes=TILE_BYTES):
+        shape = tuple(shape)
+        exists = os.path.exists(path)
+        if exists and os.path.getsize(path) != np.prod(shape) * 8:
+            raise ValueError(
+                '{} does not hold a lattice of shape {}'.format(path, shape)
+            )
+        memmap = np.memmap(
+            path,
+            dtype=np.float64,
+            mode='r+' if exists else 'w+',
+            shape=shape
+        )
+        obj = super(MappedLattice, cls).__new__(cls, memmap)
+        obj.path = path
+        obj.memmap = memmap
+        obj.tile_rows = max(1, tile_bytes // (shape[-1] * 8))
+        if not exists and fill != 0:
+            for tile in obj._tiles():
+                tile[...] = fill
+        return obj
+
+    def __array_finalize__(self, obj):
+        super(MappedLattice, self).__array_finalize__(obj)
+        # Only the lattice built by __new__ owns the map
+        self.memmap = None
+
+    def decay(self, factor, a_min=None, a_max=None):
+        """Multiplies the lattice by factor and clips it, in place, one
+        tile at a time"""
+        if self.memmap is None:
+            return super(MappedLattice, self).decay(factor, a_min, a_max)
+        for tile in self._tiles():
+            tile *= factor
+            np.clip(tile, a_min, a_max, out=tile)
+
+    def flush(self):
+        """Writes the lattice to its file"""
+        self.memmap.flush()
+
+    def _tiles(self):
+        """The lattice as maps of tile_rows rows each, each written back
+        and unmapped once the next is asked for, so that its pages can
+        leave memory"""
+        height = self.shape[-1]
+        n_rows = int(np.prod(self.shape[:-1]))
+        for start in range(0, n_rows, self.tile_rows):
+            tile = np.memmap(
+                self.path,
+                dtype=np.float64,
+                mode='r+',
+                offset=start * height * 8,
+                shape=(min(self.tile_rows, n_rows - start), height)
+            )
+            yield tile
+            tile.flush()
+            del tile
@@ -0,0 +1,88 @@
+import numpy as np
+
+# Cells within this Manhattan distance of a nest are its home zone
+HOME_RADIUS = 1
+
+NO_NEST = -1
+
+
+class NestMap(object):
+    """The home zones of every nest of a world, rasterised into one map
+
+    Required Inputs
+        size :: tuple :: size of the world
+
+    ``ids`` holds, for every cell, one more than the index in ``nests`` of
+    the nest whose home zone it is in, or 0. Being zeros where there is
+    no nest, its pages only take memory where nests are, however large
+    the world. A nest is rasterised once when it is
+    added, explicitly or on the first ``is_home`` for it, so testing
+    whether ants are at home is one lookup per ant however many nests
+    share the world: a dict of home cells for single positions, one
+    ``gather`` from ``ids`` for arrays of them. The map wraps like the
+    chemicals and is shared by all replicas.
+    """
+
+    def __init__(self, size):
+        self.size = tuple(size)
+        self.ids = np.zeros(self.size, dtype=np.int16)
+        self.nests = []
+        self._index = {}
+        self._homes = {}
+
+    def __len__(self):
+        return len(self.nests)
+
+    def add(self, nest, radius=HOME_RADIUS):
+        """Rasterises the home zone of nest and returns its index
+
+        A nest at the same cell as one already added shares its index.
+        Home zones of different nests must not overlap.
+        """
+        width, height = self.size
+        key = (nest.x % width, nest.y % height)
+        if key in self._index:
+            return self._index[key]
+        dx, dy = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+        inside = np.abs(dx) + np.abs(dy) <= radius
+        x = (key[0] + dx[inside]) % width
+        y = (key[1] + dy[inside]) % height
+        if np.any(self.ids[x, y] != 0):
+            raise ValueError(
+                'The home zone of {} overlaps another nest'.format(nest)
+            )
+        index = len(self.nests)
+        self.ids[x, y] = index + 1
+        self.nests.append(nest)
+        self._index[key] = index
+        for cell in zip(x.tolist(), y.tolist()):
+            self._homes[cell] = index
+        return index
+
+    def index(self, nest):
+        """Returns the index of nest, adding it if it was never added"""
+        width, height = self.size
+        index = self._index.get((nest.x % width, nest.y % height))
+        if index is None:
+            index = self.add(nest)
+        return index
+
+    def nest_at(self, x, y):
+        """Returns the index of the nest whose home zone x, y is in, or
+        NO_NEST"""
+        width, height = self.size
+        return self._homes.get((x % width, y % height), NO_NEST)
+
+    def gather(self, x, y):
+        """Returns the nest indexes at arrays of x and y already on the
+        lattice"""
+        return self.ids[x, y] - 1
+
+    def is_home(self, nest, x, y):
+        """Whether x, y is in the home zone of nest, for scalars or arrays
+        of positions"""
+        index = self.index(nest)
+        if type(x) is int and type(y) is int:
+            return self.nest_at(x, y) == index
+        width, height = self.size
+        return self.gather(x % width, y % height) == index
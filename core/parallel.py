@@ -0,0 +1,276 @@
+import multiprocessing
+import os
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from core.ant import Chemicals, Nest, search_state_with_avoidance
+from core.colony import Colony
+from core.lattice import PeriodicLattice
+from core.nests import NestMap
+from core.streams import RandomStream
+
+FIELDS = ('search', 'found', 'food')
+
+COLUMNS = (
+    'x',
+    'y',
+    'direction',
+    'food',
+    'time_since_nest',
+    'time_since_food',
+    'jump',
+    'jump_direction',
+)
+
+
+class ParallelColony(object):
+    """A Colony split over worker processes by strips of the world
+
+    Required Inputs
+        nest :: Nest :: nest of the colony
+        n_ants :: int :: number of ants
+        size :: tuple :: size of the world
+
+    Optional Inputs
+        workers :: int :: worker processes, one per core by default
+        search_strategy, max_jump_distance :: as for Colony
+        seed :: int :: seed every worker's stream is derived from
+
+    The search, found and food fields live in shared memory, and
+    ``chemicals`` is a Chemicals of PeriodicLattices on that memory. The
+    rows x of the world are split into one strip per worker, and each
+    worker runs a Colony of the ants on its strip. A tick runs in lock
+    step: every worker deposits on its own strip, waits for the others,
+    senses and moves its ants, reading across strip edges straight from the
+    shared fields, waits again, decays its own strip and hands the ants
+    that left its strip to the neighbouring worker.
+
+    Worker k draws from the k-th RandomStream spawned from seed, which is
+    the stream of a serial Colony with the same seed for k = 0, so with
+    one worker a run is the same as a serial one. With more workers each
+    worker draws for the ants of its own strip and ants crossing into a
+    strip join the end of its arrays, so the draws and the order in which
+    ants sharing a cell take food differ from a serial run. Runs are still
+    the same for the same seed and number of workers.
+
+    ``tick`` also ticks the chemicals, so don't call ``chemicals.tick`` as
+    well. Write to ``chemicals`` only between ticks. Call ``close`` (or use
+    the colony as a context manager) to stop the workers and free the
+    shared memory.
+    """
+
+    def __init__(
+        self,
+        nest,
+        n_ants,
+        size,
+        workers=None,
+        search_strategy=search_state_with_avoidance,
+        max_jump_distance=5,
+        seed=None,
+    ):
+        workers = workers or os.cpu_count()
+        if size[0] < workers:
+            raise ValueError('Need at least one row of the world per worker')
+        self.nest = nest
+        self.n_ants = n_ants
+        self.size = tuple(size)
+        self.workers = workers
+        self.bounds = np.linspace(0, size[0], workers + 1).astype(int)
+
+        self._memory = [
+            shared_memory.SharedMemory(
+                create=True,
+                size=int(np.prod(size)) * np.dtype(float).itemsize
+            )
+            for _ in FIELDS
+        ]
+        self.chemicals = _shared_chemicals(self._memory, self.size)
+        for name in FIELDS:
+            getattr(self.chemicals, name)[...] = 0.0
+
+        context = multiprocessing.get_context()
+        self._barrier = context.Barrier(workers)
+        self._commands = [context.Queue() for _ in range(workers)]
+        self._inboxes = [context.Queue() for _ in range(workers)]
+        self._results = context.Queue()
+        streams = RandomStream(seed).spawn(workers)
+        owner = _owner(self.bounds, nest.x % size[0])
+        self._processes = []
+        for worker in range(workers):
+            process = context.Process(
+                target=_work,
+                args=(
+                    worker,
+                    [memory.name for memory in self._memory],
+                    self.size,
+                    self.bounds,
+                    (nest.x, nest.y),
+                    n_ants if worker == owner else 0,
+                    search_strategy,
+                    max_jump_distance,
+                    streams[worker],
+                    (
+                        Chemicals.decay_rate,
+                        Chemicals.min_chemical,
+                        Chemicals.max_chemical,
+                    ),
+                    self._barrier,
+                    self._commands[worker],
+                    self._inboxes,
+                    self._results,
+                ),
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+
+    def __len__(self):
+        return self.n_ants
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def tick(self):
+        """Advances every ant and the chemicals by one tick"""
+        delivered = sum(self._ask('tick'))
+        if delivered:
+            self.nest.food += delivered
+
+    def collect(self):
+        """Returns the state of every ant as a dict of arrays, by strip"""
+        columns = self._ask('collect')
+        return {
+            name: np.concatenate([c[name] for c in columns])
+            for name in COLUMNS
+        }
+
+    def close(self):
+        for commands in self._commands:
+            commands.put(None)
+        for process in self._processes:
+            process.join()
+        self._processes = []
+        for name in FIELDS:
+            setattr(self.chemicals, name, None)
+        for memory in self._memory:
+            memory.close()
+            memory.unlink()
+        self._memory = []
+
+    def _ask(self, command):
+        for commands in self._commands:
+            commands.put(command)
+        answers = [None] * self.workers
+        for _ in range(self.workers):
+            worker, answer = self._results.get()
+            if worker is None:
+                raise RuntimeError('Worker failed:\n{}'.format(answer))
+            answers[worker] = answer
+        return answers
+
+
+def _shared_chemicals(memory, size):
+    """A Chemicals of PeriodicLattices on blocks of shared memory"""
+    chemicals = Chemicals(size=(1, 1))
+    chemicals.size = size
+    chemicals.nests = NestMap(size)
+    for name, block in zip(FIELDS, memory):
+        setattr(chemicals, name, PeriodicLattice(
+            np.ndarray(size, dtype=float, buffer=block.buf)
+        ))
+    return chemicals
+
+
+def _owner(bounds, x):
+    """Worker whose strip holds the rows x"""
+    return np.searchsorted(bounds, x, side='right') - 1
+
+
+def _work(
+    worker,
+    names,
+    size,
+    bounds,
+    nest,
+    n_ants,
+    search_strategy,
+    max_jump_distance,
+    stream,
+    decay,
+    barrier,
+    commands,
+    inboxes,
+    results,
+):
+    memory = [shared_memory.SharedMemory(name=name) for name in names]
+    try:
+        chemicals = _shared_chemicals(memory, size)
+        (
+            chemicals.decay_rate,
+            chemicals.min_chemical,
+            chemicals.max_chemical
+        ) = decay
+        colony = Colony(
+            nest=Nest(*nest),
+            chemicals=chemicals,
+            n_ants=n_ants,
+            search_strategy=search_strategy,
+            max_jump_distance=max_jump_distance,
+            streams=[stream]
+        )
+        rows = slice(bounds[worker], bounds[worker + 1])
+        neighbours = (
+            (worker - 1) % len(inboxes),
+            (worker + 1) % len(inboxes),
+        )
+
+        while True:
+            command = commands.get()
+            if command is None:
+                return
+            if command == 'collect':
+                results.put((worker, {
+                    name: getattr(colony, name) for name in COLUMNS
+                }))
+                continue
+
+            delivered = colony.delivered.sum()
+            colony.deposit()
+            barrier.wait()
+            colony.move()
+            barrier.wait()
+            chemicals.tick(rows=rows)
+            _migrate(colony, worker, bounds, neighbours, inboxes, size)
+            results.put((worker, colony.delivered.sum() - delivered))
+    except Exception:
+        barrier.abort()
+        results.put((None, traceback.format_exc()))
+
+
+def _migrate(colony, worker, bounds, neighbours, inboxes, size):
+    """Sends the ants that left the strip to the neighbouring workers and
+    takes in the ants they send"""
+    owner = _owner(bounds, colony.x % size[0])
+    leaving = owner != worker
+    for neighbour in neighbours:
+        # Every worker sends one, maybe empty, message to each neighbour
+        # every tick, so it knows how many messages to wait for.
+        sending = leaving & (owner == neighbour)
+        inboxes[neighbour].put({
+            name: getattr(colony, name)[sending] for name in COLUMNS
+        })
+        leaving &= ~sending
+    if leaving.any():
+        raise RuntimeError('Ants moved past the neighbouring strips')
+    staying = owner == worker
+    arrived = [inboxes[worker].get() for _ in neighbours]
+    for name in COLUMNS:
+        setattr(colony, name, np.concatenate(
+            [getattr(colony, name)[staying]] + [a[name] for a in arrived]
+        ))
@@ -0,0 +1,134 @@
+import time
+
+from core.ant import Ant, Chemicals, SearchWithoutAvoidance, \
+    SearchWithAvoidance, SearchWithAvoidanceAndJumps, ReturnState, GatherState
+from core.colony import Colony
+
+STRATEGIES = (
+    SearchWithoutAvoidance,
+    SearchWithAvoidance,
+    SearchWithAvoidanceAndJumps,
+    ReturnState,
+    GatherState,
+)
+
+# The (class, attribute) pairs timed by a Profiler. Methods inherited from
+# a base class are timed on each class listed, so strategies are split.
+PHASES = (
+    [
+        (Ant, 'tick'),
+        (Ant, '_drop_food'),
+        (Ant, '_gather_food'),
+        (Ant, 'strategy'),
+        (Ant, 'step'),
+    ] +
+    [(strategy, 'chemicals') for strategy in STRATEGIES] +
+    [(strategy, 'move') for strategy in STRATEGIES] +
+    [
+        (Chemicals, 'tick'),
+        (Colony, 'tick'),
+        (Colony, '_drop_food'),
+        (Colony, '_gather_food'),
+        (Colony, '_add_chemicals'),
+        (Colony, '_return_directions'),
+        (Colony, '_search_directions'),
+    ]
+)
+
+
+class Profiler(object):
+    """Cumulative time and call counts per phase of a tick
+
+    Optional Inputs
+        phases :: list :: (class, attribute) pairs to time, PHASES by default
+
+    While enabled, either with ``enable`` or as a context manager, each
+    phase method (or property, like ``Ant.strategy``) is replaced on its
+    class by a timed wrapper. Disabling puts the originals back, so a
+    disabled profiler costs nothing at all. Phases nest, so the time of
+    ``Ant.tick`` includes that of ``Ant._gather_food``. Only one profiler
+    can be enabled at a time.
+    """
+
+    _enabled = None
+
+    def __init__(self, phases=PHASES):
+        self.phases = list(phases)
+        self.calls = {}
+        self.seconds = {}
+        self._originals = []
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    def enable(self):
+        if Profiler._enabled is not None:
+            raise RuntimeError('Another Profiler is already enabled')
+        Profiler._enabled = self
+        for cls, attribute in self.phases:
+            name = '{}.{}'.format(cls.__name__, attribute)
+            self.calls.setdefault(name, 0)
+            self.seconds.setdefault(name, 0.0)
+            own = attribute in cls.__dict__
+            original = cls.__dict__[attribute] if own else None
+            self._originals.append((cls, attribute, own, original))
+            setattr(cls, attribute, self._timed(cls, attribute, name))
+
+    def disable(self):
+        for cls, attribute, own, original in reversed(self._originals):
+            if own:
+                setattr(cls, attribute, original)
+            else:
+                delattr(cls, attribute)
+        self._originals = []
+        if Profiler._enabled is self:
+            Profiler._enabled = None
+
+    def reset(self):
+        for name in self.calls:
+            self.calls[name] = 0
+            self.seconds[name] = 0.0
+
+    def summary(self):
+        """Returns a table of the phases that were called, slowest first"""
+        rows = sorted(
+            (name for name, calls in self.calls.items() if calls),
+            key=lambda name: -self.seconds[name]
+        )
+        lines = ['{:<40} {:>10} {:>12} {:>12}'.format(
+            'phase', 'calls', 'total s', 'per call us'
+        )]
+        for name in rows:
+            lines.append('{:<40} {:>10} {:>12.4f} {:>12.2f}'.format(
+                name,
+                self.calls[name],
+                self.seconds[name],
+                1e6 * self.seconds[name] / self.calls[name]
+            ))
+        return '\n'.join(lines)
+
+    def _timed(self, cls, attribute, name):
+        calls = self.calls
+        seconds = self.seconds
+        perf_counter = time.perf_counter
+        original = getattr(cls, attribute)
+        if isinstance(original, property):
+            function = original.fget
+        else:
+            function = original
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                seconds[name] += perf_counter() - start
+                calls[name] += 1
+
+        if isinstance(original, property):
+            return property(timed, original.fset, original.fdel)
+        return timed
@@ -0,0 +1,126 @@
+import numpy as np
+
+# Uniform variates drawn at once by a stream
+BLOCK = 4096
+# Smaller blocks for the streams of single ants, as there may be many
+ANT_BLOCK = 64
+
+
+class RandomStream(object):
+    """Uniform variates from a NumPy Generator, drawn in blocks
+
+    Optional Inputs
+        seed :: int or np.random.SeedSequence :: seed of the stream, fresh
+            entropy by default
+        block :: int :: variates drawn from the generator at once
+
+    ``random()`` reads the next variate of the current block, drawing a
+    new block only when it runs out, so a random move costs a list read
+    rather than a call into the generator. ``spawn`` derives independent
+    child streams, the k-th child being the same however many are spawned,
+    and ``state``/``set_state`` capture and restore a stream exactly.
+    """
+
+    def __init__(self, seed=None, block=BLOCK):
+        if block < 1:
+            raise ValueError('block must be positive')
+        self.block = block
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        """Restarts the stream from seed"""
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.seed_sequence = seed
+        self.generator = np.random.Generator(np.random.PCG64(seed))
+        self._draw()
+
+    def spawn(self, n, block=None):
+        """Returns n independent streams derived from this one's seed"""
+        return [
+            RandomStream(child, block=block or self.block)
+            for child in self.seed_sequence.spawn(n)
+        ]
+
+    def random(self, size=None):
+        """Returns one uniform variate in [0, 1), or an array of them"""
+        if size is None:
+            position = self._position
+            if position == self.block:
+                self._draw()
+                position = 0
+            if self._values is None:
+                self._values = self._block.tolist()
+            self._position = position + 1
+            return self._values[position]
+
+        values = np.empty(size)
+        flat = values.reshape(-1)
+        filled = 0
+        while filled < len(flat):
+            if self._position == self.block:
+                self._draw()
+            n = min(len(flat) - filled, self.block - self._position)
+            flat[filled:filled + n] = self._block[
+                self._position:self._position + n
+            ]
+            self._position += n
+            filled += n
+        return values
+
+    def choice(self, sequence):
+        """Returns a uniformly chosen item of a non-empty sequence"""
+        return sequence[int(self.random() * len(sequence))]
+
+    def integers(self, high, size=None):
+        """Returns uniform integers in [0, high)"""
+        if size is None:
+            return int(self.random() * high)
+        return (self.random(size) * high).astype(np.intp)
+
+    def state(self):
+        """Returns the state of the stream as a JSON-serialisable dict"""
+        sequence = self.seed_sequence
+        return {
+            'block': self.block,
+            'entropy': sequence.entropy,
+            'spawn_key': list(sequence.spawn_key),
+            'children': sequence.n_children_spawned,
+            'bit_generator': self._block_state,
+            'position': self._position,
+        }
+
+    def set_state(self, state):
+        """Restores a state returned by ``state``"""
+        self.block = state['block']
+        self.seed_sequence = np.random.SeedSequence(
+            state['entropy'],
+            spawn_key=tuple(state['spawn_key']),
+            n_children_spawned=state['children']
+        )
+        self.generator.bit_generator.state = state['bit_generator']
+        self._draw()
+        self._position = state['position']
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuilds a stream from ``state()``"""
+        stream = cls.__new__(cls)
+        stream.generator = np.random.Generator(np.random.PCG64())
+        stream.set_state(state)
+        return stream
+
+    def _draw(self):
+        self._block_state = self.generator.bit_generator.state
+        self._block = self.generator.random(self.block)
+        self._values = None
+        self._position = 0
+
+
+# The stream of ants not given one of their own
+DEFAULT = RandomStream()
+
+
+def seed(seed=None):
+    """Restarts the default stream from seed"""
+    DEFAULT.seed(seed)
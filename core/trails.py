@@ -0,0 +1,174 @@
+import numpy as np
+
+from core.lattice import PeriodicLattice
+
+N_DIRECTIONS = 8
+
+# An entry of a TrailTable is a tie mask, bit k set when slot k of the
+# forward cone holds its extreme value. No cone has no extreme slot, so 0
+# marks an entry not computed since its cells last changed.
+STALE = 0
+SLOT_BITS = np.array([1, 2, 4], dtype=np.uint8)
+
+# The slots of every tie mask, in order and padded, and how many there are
+TIE_COUNTS = np.array([bin(mask).count('1') for mask in range(8)])
+TIE_SLOTS = np.array([
+    [slot for slot in range(3) if mask >> slot & 1] + [0] * (3 - count)
+    for mask, count in enumerate(TIE_COUNTS)
+], dtype=np.intp)
+
+# Offsets of the cells whose forward cones contain a cell, which are the
+# cell's neighbours and the cell itself
+_NEIGHBOURS_DX, _NEIGHBOURS_DY = (
+    offsets.ravel() for offsets in np.mgrid[-1:2, -1:2]
+)
+
+
+class TrailTable(object):
+    """The best forward slots of a lattice, per cell and incoming direction
+
+    Required Inputs
+        shape :: tuple :: shape of the lattice, (replicas,) + size for
+            stacks
+        highest :: bool :: whether the best slots hold the highest values
+            of the cone, or the lowest
+
+    ``masks[direction, x, y]`` (``masks[direction, replica, x, y]`` for
+    stacks) is the tie mask of the extreme slots of the cone of an ant at
+    x, y heading in direction, or STALE until it is stored. ``invalidate``
+    marks stale every entry whose cone holds a changed cell, so an entry
+    is computed once and then looked up on every tick until the trail
+    under it changes.
+    """
+
+    def __init__(self, shape, highest):
+        self.shape = tuple(shape)
+        self.highest = highest
+        self.masks = np.zeros((N_DIRECTIONS,) + self.shape, dtype=np.uint8)
+
+    def lookup(self, direction, x, y, replica=None):
+        """Returns the tie masks of ants in direction at arrays of x and y
+        already on the lattice"""
+        if replica is None:
+            return self.masks[direction, x, y]
+        return self.masks[direction, replica, x, y]
+
+    def store(self, direction, x, y, values, replica=None):
+        """Stores and returns the tie masks of cones holding values, as
+        returned by ``Chemicals.sense``"""
+        if self.highest:
+            extreme = values.max(axis=1, initial=-np.inf)
+        else:
+            extreme = values.min(axis=1, initial=np.inf)
+        masks = (values == extreme[:, None]) @ SLOT_BITS
+        if replica is None:
+            self.masks[direction, x, y] = masks
+        else:
+            self.masks[direction, replica, x, y] = masks
+        return masks
+
+    def invalidate(self, x=None, y=None, replica=None):
+        """Marks stale the entries reading the cells at x, y, every entry
+        if no cells are given
+
+        x and y are scalars or arrays of cells already on the lattice. For
+        stacks, replica gives the replica of each cell, a slice or None
+        for the cell in every replica.
+        """
+        if x is None:
+            self.masks[...] = STALE
+            return
+        width, height = self.shape[-2:]
+        x = (np.asarray(x)[..., None] + _NEIGHBOURS_DX) % width
+        y = (np.asarray(y)[..., None] + _NEIGHBOURS_DY) % height
+        if replica is None:
+            self.masks[..., x, y] = STALE
+        elif isinstance(replica, slice):
+            self.masks[:, replica, x, y] = STALE
+        else:
+            self.masks[:, np.asarray(replica)[..., None], x, y] = STALE
+
+
+def tie_slots(masks, uniforms):
+    """Picks one slot of each tie mask, uniformly with uniforms in [0, 1)"""
+    return TIE_SLOTS[masks, (uniforms * TIE_COUNTS[masks]).astype(np.intp)]
+
+
+class TrackedLattice(PeriodicLattice):
+    """A PeriodicLattice that keeps TrailTables of itself up to date
+
+    Required Inputs
+        input_array :: np.array :: values of the lattice
+
+    ``table(highest)`` returns the lattice's TrailTable for the highest
+    or lowest values, created empty on first use. Every write by indexing
+    or ``scatter_add`` invalidates the entries reading the cells written,
+    and ``decay`` invalidates those reading cells it clips: decaying
+    scales every other cell alike, which keeps the order of any cone. A
+    write of a slice invalidates every entry. Arrays derived from the
+    lattice, views included, keep no tables.
+    """
+
+    def __new__(cls, input_array):
+        obj = super().__new__(cls, input_array)
+        obj.tables = {}
+        return obj
+
+    def __array_finalize__(self, obj):
+        super().__array_finalize__(obj)
+        self.tables = {}
+
+    def table(self, highest):
+        if highest not in self.tables:
+            self.tables[highest] = TrailTable(self.shape, highest)
+        return self.tables[highest]
+
+    def invalidate(self, x=None, y=None, replica=None):
+        """Marks stale the entries of every table reading x, y"""
+        for table in self.tables.values():
+            table.invalidate(x, y, replica=replica)
+
+    def __setitem__(self, index, item):
+        super().__setitem__(index, item)
+        if not self.tables:
+            return
+        index = self.latticeWrapIdx(index)
+        if (
+            isinstance(index, tuple)
+            and len(index) == self.ndim
+            and all(isinstance(i, (int, np.integer)) for i in index[-2:])
+        ):
+            replica = index[0] if self.ndim == 3 else None
+            self.invalidate(*index[-2:], replica=replica)
+        else:
+            self.invalidate()
+
+    def scatter_add(self, x, y, amounts, replica=None):
+        super().scatter_add(x, y, amounts, replica=replica)
+        if self.tables:
+            self.invalidate(x, y, replica=replica)
+
+    def decay(self, factor, a_min=None, a_max=None):
+        if not self.tables:
+            super().decay(factor, a_min=a_min, a_max=a_max)
+            return
+        array = self.view(np.ndarray)
+        array *= factor
+        # Cells the clip changes relative to the others: the ones raised
+        # to the minimum, bar those already at it, and the ones over the
+        # maximum
+        clipped = np.zeros(self.shape, dtype=bool)
+        if a_min is not None:
+            np.logical_and(
+                array <= a_min,
+                array != a_min * factor,
+                out=clipped
+            )
+        if a_max is not None:
+            clipped |= array > a_max
+        np.clip(array, a_min, a_max, out=array)
+        cells = np.flatnonzero(clipped)
+        if len(cells):
+            cells = np.unravel_index(cells, self.shape)
+            replica = cells[0] if self.ndim == 3 else None
+            self.invalidate(*cells[-2:], replica=replica)
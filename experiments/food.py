@@ -1,23 +1,21 @@
-import random
-
 import matplotlib.pyplot as plt
 
+from core import streams
 from core.ant import Chemicals, Nest
 from experiments.image_search_strategies import build_ants, run, plot_chemicals
 
 
 
 if __name__ == '__main__':
-    random.seed = 1
+    streams.seed(1)
     n_ants = 1000
     n_ticks = 1000
     size = (40, 40)
 
-    chemicals = Chemicals(size=size)
+    chemicals = Chemicals(size=size, food_sources=True)
     nest = Nest(3, 3)
     # chemicals.search[nest.x, nest.y] = 1
-    # chemicals.food[6:16, 6:16] = 1
-    chemicals.food[16, 16] = 1
+    chemicals.food.add(16, 16, 100, refill=100)
     ants = build_ants(
         n_ants=n_ants,
         size=size,
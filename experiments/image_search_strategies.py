@@ -1,7 +1,11 @@
-import random
-
 from core.ant import Ant, Chemicals, search_state_no_advoidance, \
     search_state_with_avoidance, search_with_avoidance_and_jumps, Nest
+from core.colony import Colony
+from core.food import FoodSources
+from core.parallel import ParallelColony
+from core.streams import ANT_BLOCK, RandomStream
+from experiments.observers import RunState
+from experiments.recorder import Recorder, render
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -26,6 +30,12 @@ SIZE = (WIDTH, WIDTH)
 n_ants = 20
 n_ticks = 500
 
+# The food sources of a world built here, as arguments to FoodSources.add.
+# The source is refilled to 100 every tick.
+FOOD = (
+    {'x': 16, 'y': 16, 'amount': 100, 'refill': 100},
+)
+
 
 def build_ants(
     n_ants,
@@ -34,19 +44,26 @@ def build_ants(
     jump_distance=None,
     chemicals=None,
     nest=None,
+    food=FOOD,
+    seed=None,
 ):
-    random.seed = 1
+    """Builds n_ants ants, each with its own random stream spawned from
+    seed if given, sharing the default stream otherwise"""
     ants = []
     if nest is None:
         nest = Nest(int(size[0]/2), int(size[1]/2))
 
     if chemicals is None:
-        chemicals = Chemicals(size=size)
+        chemicals = build_chemicals(size, food)
 
-    for _ in range(n_ants):
+    ant_streams = [None] * n_ants
+    if seed is not None:
+        ant_streams = RandomStream(seed).spawn(n_ants, block=ANT_BLOCK)
+    for stream in ant_streams:
         ant = Ant(
             nest=nest,
-            chemicals=chemicals
+            chemicals=chemicals,
+            random=stream
         )
         if search_strategy:
             ant.search_strategy = search_strategy
@@ -57,51 +74,184 @@ def build_ants(
     return ants
 
 
-def run(n_ticks, ants):
-    nest = ants[0].nest
+def build_colony(
+    n_ants,
+    size=SIZE,
+    search_strategy=None,
+    jump_distance=None,
+    chemicals=None,
+    nest=None,
+    seed=None,
+    replicas=None,
+    food=FOOD,
+):
+    if nest is None:
+        nest = Nest(int(size[0]/2), int(size[1]/2))
+
+    if chemicals is None:
+        chemicals = build_chemicals(size, food, replicas=replicas)
+
+    colony = Colony(
+        nest=nest,
+        chemicals=chemicals,
+        n_ants=n_ants,
+        seed=seed
+    )
+    if search_strategy:
+        colony.search_strategy = search_strategy
+    if jump_distance:
+        colony.max_jump_distance = jump_distance
+
+    return colony
+
+
+def build_chemicals(size=SIZE, food=FOOD, replicas=None):
+    """Chemicals whose food is the declared food sources, tracking
+    coverage"""
+    chemicals = Chemicals(
+        size=size,
+        replicas=replicas,
+        food_sources=True,
+        track_coverage=True
+    )
+    for source in food:
+        chemicals.food.add(**source)
+    return chemicals
+
+
+def run(
+    n_ticks,
+    ants,
+    recorder=None,
+    profiler=None,
+    observers=(),
+    food=FOOD,
+):
+    """Runs a list of ``Ant``, a ``Colony`` or a ``ParallelColony`` for
+    n_ticks.
+
+    The chemicals of a ``ParallelColony`` have a plain food field, so the
+    food sources, as arguments to ``FoodSources.add``, are written into it
+    and replenished after every tick. Other ants get theirs from their
+    chemicals.
+
+    A ``Recorder`` snapshots the chemicals and the nest after every tick it
+    records, render them with ``experiments.recorder.render``. A
+    ``Profiler`` is enabled for the run and its summary printed at the end.
+    Each ``Observer`` is handed a ``RunState`` after the ticks it is due,
+    counting from 1 in every run, and costs nothing on the other ticks.
+    """
+    if profiler is None:
+        _run(n_ticks, ants, recorder, observers, food)
+        return
+    with profiler:
+        _run(n_ticks, ants, recorder, observers, food)
+    print(profiler.summary())
+
+
+def _run(n_ticks, ants, recorder, observers, food):
+    chemicals = get_chemicals(ants)
+    nest = get_nest(ants)
+    home = chemicals.cell(nest.x, nest.y)
+    sources = None
+    if isinstance(ants, ParallelColony):
+        sources = _lay_food(chemicals, food)
+    for observer in observers:
+        observer.start()
+    due = _next_due(observers)
     for t in range(n_ticks):
 
-        ants[0].chemicals.search[nest.x, nest.y] = 20
-        ants[0].chemicals.found[nest.x, nest.y] = 0
-        for ant in ants:
-            ant.tick()
-            ant.chemicals.food[16, 16] = 100
-        ant.chemicals.tick()
+        chemicals.search[home] = 20
+        chemicals.found[home] = 0
+        if isinstance(ants, (Colony, ParallelColony)):
+            ants.tick()
+        else:
+            for ant in ants:
+                ant.tick()
+        if sources is None:
+            chemicals.tick()
+        else:
+            # A ParallelColony ticks the chemicals itself
+            _replenish(sources, chemicals.food)
         nest.tick()
 
-        if t % 10 == 0:
-            fig, axes = plt.subplots(2, 2)
-            plot_chemicals(ants, axes)
-            axes[1, 1].plot(nest.food_history)
-            plt.savefig('images/{}'.format(t))
+        if recorder is not None:
+            recorder.record(t, chemicals, nest)
+        if t + 1 == due:
+            state = RunState(t + 1, ants, chemicals, nest)
+            for observer in observers:
+                if observer.next == due:
+                    observer.notify(state)
+            due = _next_due(observers)
+
+
+def _lay_food(chemicals, food):
+    """Writes the food sources into the food field of chemicals, returning
+    them as FoodSources"""
+    sources = FoodSources(chemicals.food.shape)
+    for source in food:
+        sources.add(**source)
+    np.asarray(chemicals.food).reshape(-1)[sources.cells] = sources.amount
+    return sources
+
+
+def _replenish(sources, food):
+    """Ticks the sources on what is left of them in the food field"""
+    field = np.asarray(food).reshape(-1)
+    sources.amount[:] = field[sources.cells]
+    sources.tick()
+    field[sources.cells] = sources.amount
+
+
+def _next_due(observers):
+    ticks = [o.next for o in observers if o.next is not None]
+    return min(ticks) if ticks else None
+
+
+def get_chemicals(ants):
+    if isinstance(ants, (Colony, ParallelColony)):
+        return ants.chemicals
+    return ants[0].chemicals
+
+
+def get_nest(ants):
+    if isinstance(ants, (Colony, ParallelColony)):
+        return ants.nest
+    return ants[0].nest
+
+
+def coverage(chemicals):
+    """Fraction of the grid the ants have visited, one value per replica
+    if the chemicals have replicas, for chemicals tracking coverage"""
+    return chemicals.coverage.fraction
 
 
 def plot_search(ants, ax):
-    coverage = plot_chemical(ants, ax, chemical='search')
+    plot_chemical(ants, ax, chemical='search')
 
-    first_ant = ants[0]
+    if isinstance(ants, Colony):
+        search_state = ants.search_strategy
+    else:
+        search_state = ants[0].strategy
     ax.set_title(
         '{search_state} '
         'ants={n_ants}, '
         'ticks={n_ticks} '
         'coverage={coverage}'.format(
-            search_state=first_ant.strategy.__class__.__name__,
+            search_state=search_state.__class__.__name__,
             n_ants=n_ants,
             n_ticks=n_ticks,
-            coverage=coverage
+            coverage=coverage(get_chemicals(ants))
     ))
 
 
 def plot_chemical(ants, ax, chemical='search'):
-    first_ant = ants[0]
-    chemical_array = getattr(first_ant.chemicals, chemical)
+    chemical_array = getattr(get_chemicals(ants), chemical)
     # chemical_array[first_ant.nest.x, first_ant.nest.y] = 0
     image = ax.imshow(np.log10(chemical_array))
     # image = ax.imshow(chemical_array)
-    coverage = np.count_nonzero(chemical_array) / chemical_array.size
     plt.colorbar(image, ax=ax)
     ax.set_title(chemical)
-    return coverage
 
 
 def plot_chemicals(ants, axes):
@@ -114,7 +264,14 @@ if __name__ == '__main__':
     fig, axes = plt.subplots(len(search_strategies))
 
     for strategy, ax in zip(search_strategies, axes):
-        ants = build_ants(n_ants, strategy)
-        run(n_ticks, ants)
+        ants = build_ants(n_ants, search_strategy=strategy)
+        frames = 'frames/{}'.format(strategy.__class__.__name__)
+        recorder = Recorder(frames, get_chemicals(ants), n_ticks // 10 + 1)
+        with recorder:
+            run(n_ticks, ants, recorder=recorder)
+        render(
+            frames,
+            out_dir='images/{}'.format(strategy.__class__.__name__)
+        )
         plot_search(ants, ax)
     plt.show()
\ No newline at end of file
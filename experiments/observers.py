@@ -0,0 +1,136 @@
+import numpy as np
+
+
+class RunState(object):
+    """A read-only view of a run after its t-th tick, handed to observers
+
+    The fields are read-only arrays, so observers can measure them without
+    copying and without changing the run.
+    """
+
+    def __init__(self, t, ants, chemicals, nest):
+        self.t = t
+        self.ants = ants
+        self._chemicals = chemicals
+        self._nest = nest
+
+    def field(self, name):
+        """Returns a read-only array of the chemical called name"""
+        view = np.asarray(getattr(self._chemicals, name)).view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def search(self):
+        return self.field('search')
+
+    @property
+    def found(self):
+        return self.field('found')
+
+    @property
+    def food(self):
+        return self.field('food')
+
+    @property
+    def coverage(self):
+        """Fraction of the world visited, one value per replica with
+        replicas, for chemicals tracking coverage"""
+        return self._chemicals.coverage.fraction
+
+    @property
+    def nest_food(self):
+        return float(self._nest.food)
+
+
+class Observer(object):
+    """Calls a function with the state of a run at chosen ticks
+
+    Optional Inputs
+        function :: callable :: called with a RunState when due
+        every :: int :: observe after every k-th tick
+        ticks :: iterable :: the ticks to observe after, such as
+            ``log_ticks(1000, 100)``
+
+    Ticks count from 1, the state after the first tick of a run. Pass
+    either every or ticks, every tick is observed by default. Subclasses
+    override ``observe`` instead of passing a function.
+    """
+
+    def __init__(self, function=None, every=None, ticks=None):
+        if every is not None and ticks is not None:
+            raise ValueError('Use either every or ticks, not both')
+        if every is not None and every < 1:
+            raise ValueError('every must be positive')
+        self.function = function
+        self.every = every if ticks is None else None
+        if self.every is None and ticks is None:
+            self.every = 1
+        if ticks is not None:
+            ticks = np.unique(ticks)
+            ticks = ticks[ticks >= 1].tolist()
+        self._ticks = ticks
+        self.next = None
+        self.start()
+
+    def start(self):
+        """Starts again from the first tick, called at the start of a run"""
+        if self.every is not None:
+            self.next = self.every
+        else:
+            self._position = 0
+            self.next = self._ticks[0] if self._ticks else None
+
+    def notify(self, state):
+        """Observes state and moves on to the next tick due"""
+        self.observe(state)
+        if self.every is not None:
+            self.next += self.every
+            return
+        self._position += 1
+        if self._position < len(self._ticks):
+            self.next = self._ticks[self._position]
+        else:
+            self.next = None
+
+    def observe(self, state):
+        self.function(state)
+
+
+class Curve(Observer):
+    """Records a metric of the state at chosen ticks
+
+    Required Inputs
+        metric :: callable :: returns the value to record from a RunState,
+            for example ``lambda state: state.nest_food``
+
+    Optional Inputs
+        every, ticks :: as for Observer
+
+    ``ticks`` and ``values`` are arrays of the ticks observed and of the
+    metric at each of them.
+    """
+
+    def __init__(self, metric, every=None, ticks=None):
+        super().__init__(every=every, ticks=ticks)
+        self.metric = metric
+        self._observed = []
+        self._values = []
+
+    @property
+    def ticks(self):
+        return np.array(self._observed, dtype=np.int64)
+
+    @property
+    def values(self):
+        return np.array(self._values)
+
+    def observe(self, state):
+        self._observed.append(state.t)
+        self._values.append(self.metric(state))
+
+
+def log_ticks(n_ticks, n=100):
+    """Up to n ticks, log-spaced from 1 to n_ticks"""
+    ticks = np.rint(np.logspace(0, np.log10(n_ticks), n))
+    return np.unique(ticks.astype(int))
@@ -1,33 +1,43 @@
-from collections import defaultdict
-
 from core.ant import search_with_avoidance_and_jumps
-from experiments.image_search_strategies import build_ants, run
+from experiments.image_search_strategies import build_colony, coverage, run
+from experiments.sweep import sweep
 import matplotlib.pyplot as plt
 import numpy as np
 
 
-def calc_coverage(jump_distance, size):
-    ants = build_ants(
+def calc_coverage(
+    jump_distance,
+    size,
+    n_ants=20,
+    n_ticks=20,
+    seed=None,
+    replicas=1000,
+):
+    """Runs an ensemble of replicas independent colonies and returns the
+    mean and standard deviation of their search coverage"""
+    colony = build_colony(
         n_ants=n_ants,
         size=size,
         search_strategy=search_with_avoidance_and_jumps,
-        jump_distance=jump_distance
+        jump_distance=jump_distance,
+        seed=seed,
+        replicas=replicas
     )
-    run(n_ticks, ants)
-    search = ants[0].chemicals.search
-    coverage = np.count_nonzero(search) / search.size
-    return coverage
+    run(n_ticks, colony)
+    coverages = coverage(colony.chemicals)
+    return {
+        'result': coverages.mean(),
+        'std': coverages.std(),
+        'replicas': replicas,
+    }
 
 
-def plot_averages(jump_results, coverage_results):
-    averages = defaultdict(int)
-    for j, c in zip(jump_results, coverage_results):
-        averages[j] += c
-    jump_results = []
-    coverage_results = []
-    for j, c in averages.items():
-        jump_results.append(j)
-        coverage_results.append(c / repeats)
+def plot_averages(results, ax):
+    jump_results = np.unique(results['jump_distance'])
+    coverage_results = [
+        results['result'][results['jump_distance'] == j].mean()
+        for j in jump_results
+    ]
     ax.plot(
         jump_results,
         coverage_results
@@ -36,30 +46,32 @@ def plot_averages(jump_results, coverage_results):
 
 if __name__ == '__main__':
 
-    n_ants = 20
     jump_distances = range(1, 6, 1)
     fig, ax = plt.subplots(1)
-    n_ticks = 20
-    repeats = 10000
-    size = (20, 20)
+    repeats = 10
 
-    coverage_results = []
-    jump_results = []
-    for jump_distance in jump_distances:
-        for _ in range(repeats):
-            coverage = calc_coverage(jump_distance, size=size)
-            coverage_results.append(coverage)
-            jump_results.append(jump_distance)
+    # Each run is an ensemble of 1000 replicas, so this is 10000
+    # simulations per jump distance.
+    results = sweep(
+        calc_coverage,
+        grid={
+            'jump_distance': list(jump_distances),
+            'size': [(20, 20)],
+        },
+        replicates=repeats,
+        seed=1,
+        path='jump_distance_coverage.npz'
+    )
 
-    # results = defaultdict(list)
-    # for j, c in zip(jump_results, coverage_results):
-    #     results[j].append(c)
-    # ax.boxplot(list(results.values()))
+    # ax.boxplot([
+    #     results['result'][results['jump_distance'] == j]
+    #     for j in jump_distances
+    # ])
 
     # ax.plot(
-    #     jump_results,
-    #     coverage_results,
+    #     results['jump_distance'],
+    #     results['result'],
     #     '*'
     # )
-    plot_averages(jump_results, coverage_results)
-    plt.show()
\ No newline at end of file
+    plot_averages(results, ax)
+    plt.show()
@@ -1,4 +1,6 @@
-from experiments.image_search_strategies import search_strategies, build_ants, run
+from experiments.image_search_strategies import search_strategies, \
+    build_colony, run
+from experiments.observers import Curve
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -6,23 +8,29 @@ import numpy as np
 if __name__ == '__main__':
 
     n_ants = 2
-    n_ticks_list = np.logspace(1, 3, 100)
-    fig, ax = plt.subplots(1)
+    size = (100, 100)
+    replicas = 100
+    n_ticks_list = np.unique(np.logspace(1, 3, 100).astype(int))
+    fig, (ax, food_ax) = plt.subplots(2)
 
     for strategy in search_strategies:
-        coverage_results = []
-        for n_ticks in n_ticks_list:
-            n_ticks = int(n_ticks)
-            ants = build_ants(n_ants, strategy)
-            run(n_ticks, ants)
-
-            search = ants[0].chemicals.search
-            coverage = np.count_nonzero(search) / search.size
-            coverage_results.append(coverage)
-        ax.loglog(
-            n_ticks_list,
-            coverage_results,
-            label=strategy.__class__.__name__
+        # One ensemble run to the longest time, observing the mean
+        # coverage and the food brought home on the way, instead of one
+        # run per time.
+        colony = build_colony(
+            n_ants,
+            size=size,
+            search_strategy=strategy,
+            replicas=replicas
+        )
+        coverage = Curve(
+            lambda state: state.coverage.mean(),
+            ticks=n_ticks_list
         )
-    plt.legend()
-    plt.show()
\ No newline at end of file
+        food = Curve(lambda state: state.nest_food, ticks=n_ticks_list)
+        run(n_ticks_list[-1], colony, observers=[coverage, food])
+        label = strategy.__class__.__name__
+        ax.loglog(coverage.ticks, coverage.values, label=label)
+        food_ax.plot(food.ticks, food.values / replicas, label=label)
+    ax.legend()
+    plt.show()
@@ -0,0 +1,198 @@
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+FIELDS = ('search', 'found', 'food')
+
+
+class Recorder(object):
+    """Records snapshots of the chemicals and the nest to memory-mapped files
+
+    Required Inputs
+        path :: str :: directory the frames are written to
+        chemicals :: Chemicals :: the fields to record
+        n_frames :: int :: number of snapshots to preallocate
+
+    Optional Inputs
+        every :: int :: record every k-th tick
+        fields :: tuple :: names of the chemicals to record
+        dtype :: numpy dtype :: type the fields are stored as
+        buffers :: int :: snapshots that can wait to be written at once
+
+    ``record`` copies the fields into one of ``buffers`` preallocated
+    staging arrays and hands it to a background thread, which writes it to
+    one ``<field>.npy`` file per field of shape ``(n_frames,) + shape``.
+    ``ticks.npy`` and ``nest_food.npy`` hold the tick and the nest food of
+    each frame. The simulation only waits when every staging array is
+    still queued. Use ``render`` to turn the frames into images afterwards.
+    """
+
+    def __init__(
+        self,
+        path,
+        chemicals,
+        n_frames,
+        every=10,
+        fields=FIELDS,
+        dtype=np.float32,
+        buffers=4,
+    ):
+        if n_frames < 1 or every < 1 or buffers < 1:
+            raise ValueError('n_frames, every and buffers must be positive')
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.every = every
+        self.fields = tuple(fields)
+        self.n_frames = n_frames
+        self.frames = 0
+
+        shape = np.shape(getattr(chemicals, self.fields[0]))
+        self._stores = {
+            name: np.lib.format.open_memmap(
+                os.path.join(path, '{}.npy'.format(name)),
+                mode='w+',
+                dtype=dtype,
+                shape=(n_frames,) + shape
+            )
+            for name in self.fields
+        }
+        self._ticks = np.lib.format.open_memmap(
+            os.path.join(path, 'ticks.npy'),
+            mode='w+',
+            dtype=np.int64,
+            shape=(n_frames,)
+        )
+        self._ticks[:] = -1
+        self._nest_food = np.lib.format.open_memmap(
+            os.path.join(path, 'nest_food.npy'),
+            mode='w+',
+            dtype=np.float64,
+            shape=(n_frames,)
+        )
+
+        self._free = queue.Queue()
+        for _ in range(buffers):
+            self._free.put({
+                name: np.empty(shape, dtype=dtype) for name in self.fields
+            })
+        self._pending = queue.Queue()
+        self._error = None
+        self._writer = threading.Thread(target=self._write, daemon=True)
+        self._writer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def record(self, t, chemicals, nest):
+        """Snapshots the chemicals and the nest if t is a recorded tick"""
+        if t % self.every:
+            return
+        if self._error is not None:
+            raise self._error
+        if self.frames == self.n_frames:
+            raise IndexError(
+                'Recorder is full after {} frames'.format(self.n_frames)
+            )
+        buffer = self._free.get()
+        for name in self.fields:
+            np.copyto(buffer[name], getattr(chemicals, name), casting='unsafe')
+        self._ticks[self.frames] = t
+        self._nest_food[self.frames] = nest.food
+        self._pending.put((self.frames, buffer))
+        self.frames += 1
+
+    def close(self):
+        """Waits for every snapshot to be written and flushes the files"""
+        if self._writer.is_alive():
+            self._pending.put(None)
+            self._writer.join()
+        for store in self._stores.values():
+            store.flush()
+        self._ticks.flush()
+        self._nest_food.flush()
+        if self._error is not None:
+            raise self._error
+
+    def _write(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            frame, buffer = item
+            try:
+                for name in self.fields:
+                    self._stores[name][frame] = buffer[name]
+            except Exception as error:
+                self._error = error
+            self._free.put(buffer)
+
+
+def load_frames(path):
+    """Returns the recorded frames as read-only memory maps, by name,
+    cut to the frames actually recorded"""
+    frames = {}
+    for name in os.listdir(path):
+        root, extension = os.path.splitext(name)
+        if extension == '.npy':
+            frames[root] = np.load(os.path.join(path, name), mmap_mode='r')
+    recorded = np.count_nonzero(frames['ticks'] >= 0)
+    return {name: values[:recorded] for name, values in frames.items()}
+
+
+def render(
+    path,
+    out_dir='images',
+    fields=FIELDS,
+    replica=0,
+    processes=None
+):
+    """Renders every recorded frame to a PNG in out_dir, in worker processes
+
+    Each image shows log10 of the recorded fields and the nest food up to
+    the frame, like the figures ``run`` used to save. For chemicals with
+    replicas only the given replica is shown.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    n_frames = len(load_frames(path)['ticks'])
+    tasks = [
+        (path, out_dir, fields, replica, frame) for frame in range(n_frames)
+    ]
+    if processes == 1:
+        return list(map(_render_frame, tasks))
+    with ProcessPoolExecutor(processes or os.cpu_count()) as pool:
+        return list(pool.map(_render_frame, tasks))
+
+
+def _render_frame(task):
+    # A bare Figure renders without pyplot, so workers need no GUI backend
+    # and nothing is left open between frames.
+    from matplotlib.figure import Figure
+
+    path, out_dir, fields, replica, frame = task
+    frames = load_frames(path)
+    fig = Figure()
+    axes = fig.subplots(2, 2)
+    for name, ax in zip(fields, axes.flatten()):
+        field = frames[name][frame]
+        if field.ndim == 3:
+            field = field[replica]
+        with np.errstate(divide='ignore'):
+            image = ax.imshow(np.log10(field))
+        fig.colorbar(image, ax=ax)
+        ax.set_title(name)
+    axes[1, 1].plot(
+        frames['ticks'][:frame + 1],
+        frames['nest_food'][:frame + 1]
+    )
+    image_path = os.path.join(
+        out_dir,
+        '{}.png'.format(frames['ticks'][frame])
+    )
+    fig.savefig(image_path)
+    return image_path
@@ -0,0 +1,111 @@
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from core import streams
+
+
+def sweep(
+    func,
+    grid,
+    replicates=1,
+    seed=0,
+    processes=None,
+    path=None,
+    chunksize=16,
+):
+    """Runs func for every combination of parameters, on all cores
+
+    Required Inputs
+        func :: callable :: module level function called as
+            ``func(seed=run_seed, **params)`` that returns a number or a
+            dict of numbers
+        grid :: dict :: parameter name to the list of values to sweep
+
+    Optional Inputs
+        replicates :: int :: runs per combination of parameters
+        seed :: int :: seed the per-run seeds are derived from
+        processes :: int :: worker processes, all cores by default and no
+            pool at all for 1
+        path :: str :: .npz file the results table is saved to
+
+    Every run gets its own seed, derived from ``seed`` and the run number
+    only, and the workers seed ``random``, ``np.random`` and the default
+    random stream of the ants with it before calling func. Results are
+    the same whatever the number of processes.
+
+    Returns a dict of equal length columns: ``run``, ``replicate``,
+    ``seed``, one column per parameter and one per result.
+    """
+    names = list(grid)
+    combinations = list(itertools.product(*(grid[n] for n in names)))
+    n_runs = len(combinations) * replicates
+    run_seeds = [
+        int(s.generate_state(1, np.uint64)[0])
+        for s in np.random.SeedSequence(seed).spawn(n_runs)
+    ]
+
+    columns = {
+        'run': np.arange(n_runs),
+        'replicate': np.tile(np.arange(replicates), len(combinations)),
+        'seed': np.array(run_seeds, dtype=np.uint64),
+    }
+    for i, name in enumerate(names):
+        columns[name] = np.repeat(
+            np.array([c[i] for c in combinations]),
+            replicates,
+            axis=0
+        )
+
+    tasks = (
+        (
+            func,
+            run,
+            dict(zip(names, combinations[run // replicates])),
+            run_seeds[run]
+        )
+        for run in range(n_runs)
+    )
+    if processes == 1:
+        results = map(_run, tasks)
+        _collect(columns, results, n_runs)
+    else:
+        with ProcessPoolExecutor(processes or os.cpu_count()) as pool:
+            results = pool.map(_run, tasks, chunksize=chunksize)
+            _collect(columns, results, n_runs)
+
+    if path is not None:
+        np.savez(path, **columns)
+    return columns
+
+
+def load_sweep(path):
+    with np.load(path) as table:
+        return {name: table[name] for name in table.files}
+
+
+def _run(task):
+    func, run, params, run_seed = task
+    random.seed(run_seed)
+    np.random.seed(run_seed % 2 ** 32)
+    streams.seed(run_seed)
+    result = func(seed=run_seed, **params)
+    if not isinstance(result, dict):
+        result = {'result': result}
+    return run, result
+
+
+def _collect(columns, results, n_runs):
+    """Streams results into one preallocated column per result name"""
+    for run, result in results:
+        for name, value in result.items():
+            if name not in columns:
+                columns[name] = np.full(
+                    n_runs,
+                    np.nan,
+                    dtype=np.result_type(value, np.float32)
+                )
+            columns[name][run] = value
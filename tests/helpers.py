@@ -0,0 +1,29 @@
+from core.ant import Chemicals, Nest, search_with_avoidance_and_jumps
+from core.colony import Colony
+
+
+def build_colony(**chemicals_options):
+    chemicals = Chemicals(size=(20, 20), **chemicals_options)
+    chemicals.food[chemicals.cell(16, 16)] = 10
+    return Colony(
+        nest=Nest(10, 10),
+        chemicals=chemicals,
+        n_ants=30,
+        search_strategy=search_with_avoidance_and_jumps,
+        seed=1
+    )
+
+
+def tick_colony(colony, n_ticks):
+    for _ in range(n_ticks):
+        colony.tick()
+        colony.chemicals.tick()
+        colony.nest.tick()
+
+
+def tick_ants(ants, n_ticks):
+    for _ in range(n_ticks):
+        for ant in ants:
+            ant.tick()
+        ants[0].chemicals.tick()
+        ants[0].nest.tick()
@@ -1,10 +1,13 @@
 from unittest import TestCase
 import unittest
 
+import numpy as np
 from matplotlib import pyplot as plt
 
 from core.ant import Ant, Location, Chemicals, DIRECTIONS, N, \
-    SearchWithAvoidance, Nest, NW, return_state, gather_state
+    SearchWithAvoidance, Nest, NW, SE, W, return_state, gather_state, \
+    direction_code, FORWARD_DIRECTIONS, OPPOSITE_DIRECTIONS, \
+    POSIBLE_DIRECTIONS, OBOSITE_DIRECTIONS
 from experiments.image_search_strategies import plot_chemicals
 
 
@@ -180,6 +183,24 @@ class TestAnt(TestCase):
             Location(9, 9),
             ant.location)
 
+    def test_lost_ants_move_away_from_found(self):
+        chemicals = Chemicals(size=(20, 20))
+        ant = Ant(
+            nest=Nest(0, 0),
+            chemicals=chemicals
+        )
+        ant.food = 1
+        ant.time_since_food = 300000
+        ant.last_direction = NW
+        ant.location = Location(10, 10)
+        chemicals.search[9, 10] = 1.0
+        chemicals.search[9, 9] = 1.0
+        chemicals.found[9, 9] = 1.0
+
+        ant.tick()
+
+        self.assertEqual(Location(9, 10), ant.location)
+
     def test_ants_can_all_get_home(self):
         chemicals = Chemicals(size=(10, 10))
         nest = Nest(0, 0)
@@ -301,3 +322,112 @@ class TestChemicals(TestCase):
             1.0
         )
 
+    def test_sense_the_forward_cone(self):
+        chemicals = Chemicals(size=(10, 10))
+        chemicals.search[9, 0] = 1.0
+        chemicals.search[1, 0] = 2.0
+
+        values = chemicals.sense(
+            chemicals.search,
+            0,
+            1,
+            direction_code(N)
+        )
+
+        self.assertEqual(list(values), [1.0, 0.0, 2.0])
+
+    def test_sense_many_ants_at_once(self):
+        chemicals = Chemicals(size=(10, 10))
+        chemicals.found[5, 4] = 1.0
+
+        values = chemicals.sense(
+            chemicals.found,
+            np.array([5, 5]),
+            np.array([5, 3]),
+            np.array([direction_code(N), direction_code(SE)])
+        )
+
+        self.assertEqual(values.shape, (2, 3))
+        self.assertEqual(values[0].tolist(), [0.0, 1.0, 0.0])
+        self.assertEqual(values[1].tolist(), [0.0, 0.0, 1.0])
+
+    def test_sense_across_a_boundary(self):
+        for boundary, expected in (('reflecting', 3.0), ('absorbing', 0.0)):
+            chemicals = Chemicals(size=(10, 10), boundary=boundary)
+            chemicals.search[9, 5] = 7.0
+            chemicals.search[0, 5] = 3.0
+            chemicals.tick()
+
+            for x in (0, -4):
+                values = chemicals.sense(
+                    chemicals.search,
+                    x,
+                    5,
+                    direction_code(W)
+                )
+                self.assertEqual(
+                    values.tolist(),
+                    [chemicals.search[x - 1, y] for y in (4, 5, 6)]
+                )
+                if x == 0:
+                    self.assertAlmostEqual(values.max(), expected * 0.999)
+
+    def test_combined_chemicals_are_read_only_where_sensed(self):
+        chemicals = Chemicals(size=(10, 10))
+        chemicals.search[5, 4] = 3.0
+        chemicals.found[5, 4] = 1.0
+        difference = chemicals.combine(search=1.0, found=-1.0)
+
+        self.assertEqual(difference[5, 4], 2.0)
+        self.assertEqual(
+            chemicals.sense(difference, 5, 5, direction_code(N)).tolist(),
+            [0.0, 2.0, 0.0]
+        )
+
+    def test_composite_field_arithmetic(self):
+        chemicals = Chemicals(size=(10, 10))
+        chemicals.search[1, 1] = 3.0
+        chemicals.found[1, 1] = 1.0
+
+        field = 2 * chemicals.channel('search') - chemicals.channel('found')
+
+        self.assertEqual(field.weights, {'search': 2.0, 'found': -1.0})
+        self.assertEqual(field[1, 1], 5.0)
+        self.assertEqual(np.asarray(field).shape, (10, 10))
+
+
+
+class TestDirections(TestCase):
+
+    def test_direction_codes_match_the_location_tables(self):
+        for code, direction in enumerate(DIRECTIONS):
+            self.assertEqual(direction_code(direction), code)
+            self.assertEqual(
+                [DIRECTIONS[c] for c in FORWARD_DIRECTIONS[code]],
+                POSIBLE_DIRECTIONS[direction]
+            )
+            self.assertEqual(
+                DIRECTIONS[OPPOSITE_DIRECTIONS[code]],
+                OBOSITE_DIRECTIONS[direction]
+            )
+
+    def test_step_moves_in_place(self):
+        location = Location(3, 3)
+        location.step(direction_code(NW))
+
+        self.assertEqual(location, Location(2, 2))
+
+    def test_equal_locations_hash_equal(self):
+        self.assertEqual(hash(Location(1, 2)), hash(Location(1, 2)))
+
+    def test_ants_have_no_instance_dict(self):
+        ant = Ant(nest=Nest(0, 0))
+
+        self.assertFalse(hasattr(ant, '__dict__'))
+
+    def test_last_direction_is_a_location(self):
+        ant = Ant(nest=Nest(0, 0))
+        ant.last_direction = NW
+
+        self.assertEqual(ant.last_direction, NW)
+        self.assertEqual(ant.direction, DIRECTIONS.index(NW))
@@ -0,0 +1,43 @@
+from unittest import TestCase
+
+from benchmarks.suite import compare, measure, run
+
+
+def results(rate, peak_bytes):
+    return {'results': {
+        'case': {'rate': rate, 'unit': 'ant-ticks/s', 'peak_bytes': peak_bytes}
+    }}
+
+
+class TestBenchmarks(TestCase):
+
+    def test_changes_within_the_tolerance_pass(self):
+        baseline = results(100.0, 1000)
+
+        self.assertEqual(compare(results(85.0, 1100), baseline, 0.2), [])
+
+    def test_slowdowns_and_memory_growth_are_regressions(self):
+        baseline = results(100.0, 1000)
+
+        self.assertEqual(len(compare(results(70.0, 1000), baseline, 0.2)), 1)
+        self.assertEqual(len(compare(results(100.0, 1300), baseline, 0.2)), 1)
+        self.assertEqual(len(compare(results(70.0, 1300), baseline, 0.2)), 2)
+
+    def test_new_cases_are_skipped(self):
+        self.assertEqual(compare(results(1.0, 1), {'results': {}}), [])
+
+    def test_measure_counts_units_per_second(self):
+        allocated = []
+
+        def setup():
+            return lambda: allocated.append(bytearray(10000)), 5
+
+        rate, peak_bytes = measure(setup, min_time=0.01)
+
+        self.assertGreater(rate, 0)
+        self.assertGreaterEqual(peak_bytes, 10000)
+
+    def test_run_selects_cases_by_name(self):
+        measured = run(quick=True, min_time=0.001, pattern='lattice/')
+
+        self.assertEqual(list(measured['results']), ['lattice/indexing'])
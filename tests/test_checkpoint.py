@@ -0,0 +1,156 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from core import streams
+from core.ant import Ant, Chemicals, Nest, search_with_avoidance_and_jumps
+from core.checkpoint import save_checkpoint, load_checkpoint
+from experiments.image_search_strategies import build_ants
+from tests.helpers import build_colony, tick_ants, tick_colony
+
+
+class TestCheckpoint(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'checkpoint')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assertSameColony(self, first, second):
+        for name in ('x', 'y', 'direction', 'food', 'time_since_food'):
+            np.testing.assert_array_equal(
+                getattr(first, name),
+                getattr(second, name)
+            )
+        for name in ('search', 'found', 'food'):
+            np.testing.assert_array_equal(
+                np.asarray(getattr(first.chemicals, name)),
+                np.asarray(getattr(second.chemicals, name))
+            )
+        np.testing.assert_array_equal(
+            first.nest.food_history,
+            second.nest.food_history
+        )
+        if first.chemicals.coverage is not None:
+            np.testing.assert_array_equal(
+                first.chemicals.coverage.curve,
+                second.chemicals.coverage.curve
+            )
+
+    def test_restored_colony_continues_the_same_run(self):
+        for options in (
+            {},
+            {'boundary': 'reflecting'},
+            {'lazy_decay': True},
+            {'tile_size': 8},
+            {'food_sources': True},
+            {'track_coverage': True},
+            {'diffusion': {'search': 0.05}},
+            {'trail_tables': ('search', 'found')},
+        ):
+            colony = build_colony(**options)
+            tick_colony(colony, 20)
+            save_checkpoint(self.path, colony)
+            tick_colony(colony, 20)
+
+            restored = load_checkpoint(self.path)
+            tick_colony(restored, 20)
+
+            self.assertSameColony(colony, restored)
+            for name in ('search', 'found', 'food'):
+                self.assertEqual(
+                    type(getattr(colony.chemicals, name)),
+                    type(getattr(restored.chemicals, name))
+                )
+
+    def test_running_a_restored_colony_leaves_the_checkpoint_unchanged(self):
+        colony = build_colony()
+        tick_colony(colony, 10)
+        save_checkpoint(self.path, colony)
+
+        tick_colony(load_checkpoint(self.path), 10)
+
+        self.assertSameColony(colony, load_checkpoint(self.path))
+
+    def test_seeded_loads_are_warm_starts(self):
+        colony = build_colony(replicas=3)
+        tick_colony(colony, 10)
+        save_checkpoint(self.path, colony)
+
+        first = load_checkpoint(self.path, seed=5)
+        second = load_checkpoint(self.path, seed=5)
+        tick_colony(first, 10)
+        tick_colony(second, 10)
+
+        self.assertSameColony(first, second)
+        self.assertEqual(first.replicas, 3)
+
+    def test_restored_ants_continue_the_same_run(self):
+        nest = Nest(5, 5)
+        chemicals = Chemicals(size=(10, 10))
+        ants = [Ant(nest=nest, chemicals=chemicals) for _ in range(5)]
+        ants[0].food = 1
+        ants[1].search_strategy = search_with_avoidance_and_jumps
+        streams.seed(3)
+        tick_ants(ants, 5)
+        save_checkpoint(self.path, ants)
+        tick_ants(ants, 5)
+
+        restored = load_checkpoint(self.path)
+        tick_ants(restored, 5)
+
+        self.assertEqual(
+            [(a.x, a.y, a.direction, a.food) for a in ants],
+            [(a.x, a.y, a.direction, a.food) for a in restored]
+        )
+        self.assertIs(
+            restored[1].search_strategy,
+            search_with_avoidance_and_jumps
+        )
+        self.assertIs(restored[0].nest, restored[1].nest)
+        np.testing.assert_array_equal(
+            np.asarray(chemicals.search),
+            np.asarray(restored[0].chemicals.search)
+        )
+        self.assertEqual(
+            nest.food_history.tolist(),
+            restored[0].nest.food_history.tolist()
+        )
+
+    def test_ants_with_their_own_streams_continue_the_same_run(self):
+        ants = build_ants(4, size=(12, 12), seed=2)
+        tick_ants(ants, 5)
+        save_checkpoint(self.path, ants)
+        tick_ants(ants, 5)
+
+        restored = load_checkpoint(self.path)
+        streams.seed(9)
+        tick_ants(restored, 5)
+
+        self.assertEqual(
+            [(a.x, a.y, a.direction) for a in ants],
+            [(a.x, a.y, a.direction) for a in restored]
+        )
+        self.assertEqual(len({id(a.random) for a in restored}), 4)
+
+    def test_pending_deposits_are_restored(self):
+        nest = Nest(5, 5)
+        chemicals = Chemicals(size=(10, 10), deposits='end_of_tick')
+        ants = [Ant(nest=nest, chemicals=chemicals) for _ in range(3)]
+        tick_ants(ants, 3)
+        for ant in ants:
+            ant.tick()
+        save_checkpoint(self.path, ants)
+
+        restored = load_checkpoint(self.path)[0].chemicals
+        self.assertEqual(len(restored.pending), 3)
+        chemicals.tick()
+        restored.tick()
+        np.testing.assert_array_equal(
+            np.asarray(chemicals.search),
+            np.asarray(restored.search)
+        )
@@ -0,0 +1,250 @@
+from unittest import TestCase
+
+import numpy as np
+
+from core.ant import Ant, Chemicals, Nest, DIRECTIONS, N, NW, SE, \
+    search_state_no_advoidance, search_with_avoidance_and_jumps
+from core.colony import Colony
+
+
+class TestColony(TestCase):
+
+    def test_new_colony_starts_at_the_nest(self):
+        colony = Colony(
+            nest=Nest(3, 4),
+            chemicals=Chemicals(size=(10, 10)),
+            n_ants=5
+        )
+
+        self.assertEqual(len(colony), 5)
+        self.assertTrue(np.all(colony.x == 3))
+        self.assertTrue(np.all(colony.y == 4))
+        self.assertTrue(np.all(colony.direction == DIRECTIONS.index(SE)))
+
+    def test_ants_leave_behind_search_chemical(self):
+        colony = Colony(
+            nest=Nest(0, 0),
+            chemicals=Chemicals(size=(10, 10)),
+            n_ants=1
+        )
+
+        colony.tick()
+
+        self.assertAlmostEqual(
+            0.975,
+            colony.chemicals.search[0, 0],
+            3
+        )
+        self.assertIn(
+            abs(colony.x[0]) + abs(colony.y[0]),
+            (1, 2)
+        )
+
+    def test_ant_leaves_behind_found_chemical(self):
+        colony = Colony(
+            nest=Nest(0, 0),
+            chemicals=Chemicals(size=(20, 20)),
+            n_ants=1
+        )
+        colony.x[:] = 10
+        colony.y[:] = 10
+        colony.food[:] = 1
+
+        colony.tick()
+
+        self.assertEqual(colony.chemicals.search[10, 10], 0.0)
+        self.assertAlmostEqual(
+            0.975,
+            colony.chemicals.found[10, 10],
+            3
+        )
+
+    def test_ants_dropping_food_do_not_gather_in_the_same_tick(self):
+        ant_chemicals = Chemicals(size=(10, 10))
+        ant_chemicals.food[5, 5] = 5.0
+        ant = Ant(nest=Nest(5, 5), chemicals=ant_chemicals)
+        ant.food = 1.0
+        colony = Colony(
+            nest=Nest(5, 5),
+            chemicals=Chemicals(size=(10, 10)),
+            n_ants=1
+        )
+        colony.chemicals.food[5, 5] = 5.0
+        colony.food[:] = 1.0
+
+        ant.tick()
+        colony.tick()
+
+        self.assertEqual(ant.food, 0)
+        self.assertEqual(ant_chemicals.food[5, 5], 5.0)
+        self.assertEqual(colony.food[0], ant.food)
+        self.assertEqual(colony.chemicals.food[5, 5], 5.0)
+        self.assertEqual(colony.nest.food, ant.nest.food)
+
+    def test_ants_should_avoid_existing_search_traces(self):
+        chemicals = Chemicals(size=(10, 10))
+        chemicals.search += 1.0
+        chemicals.search[5 + N.x, 5 + N.y] = 0.0
+        colony = Colony(nest=Nest(0, 0), chemicals=chemicals, n_ants=3)
+        colony.x[:] = 5
+        colony.y[:] = 5
+        colony.direction[:] = DIRECTIONS.index(N)
+
+        colony.tick()
+
+        self.assertTrue(np.all(colony.x == 5 + N.x))
+        self.assertTrue(np.all(colony.y == 5 + N.y))
+
+    def test_ants_without_avoidance_stay_in_the_forward_cone(self):
+        colony = Colony(
+            nest=Nest(5, 5),
+            chemicals=Chemicals(size=(10, 10)),
+            n_ants=100,
+            search_strategy=search_state_no_advoidance,
+            seed=1
+        )
+        colony.direction[:] = DIRECTIONS.index(N)
+
+        colony.tick()
+
+        self.assertTrue(np.all(colony.y == 4))
+        self.assertEqual(set(colony.x), {4, 5, 6})
+
+    def test_ants_sharing_food_take_at_most_1_food_each(self):
+        chemicals = Chemicals(size=(10, 10))
+        chemicals.food[1, 1] = 1.5
+        colony = Colony(nest=Nest(5, 5), chemicals=chemicals, n_ants=3)
+        colony.x[:] = 1
+        colony.y[:] = 1
+
+        colony.tick()
+
+        self.assertEqual(list(colony.food), [1.0, 0.5, 0.0])
+        self.assertEqual(chemicals.food[1, 1], 0.0)
+
+    def test_ants_drop_off_food_in_the_nest(self):
+        nest = Nest(0, 0)
+        colony = Colony(
+            nest=nest,
+            chemicals=Chemicals(size=(10, 10)),
+            n_ants=2
+        )
+        colony.food[:] = 1
+
+        colony.tick()
+
+        self.assertEqual(nest.food, 2.0)
+        self.assertFalse(colony.has_food.any())
+
+    def test_ants_can_all_get_home(self):
+        chemicals = Chemicals(size=(10, 10))
+        chemicals.search[0, 0] = 3
+        chemicals.search[1, 1] = 2
+        chemicals.search[2, 2] = 1
+        colony = Colony(nest=Nest(0, 0), chemicals=chemicals, n_ants=3)
+        colony.x[:] = 3
+        colony.y[:] = 3
+        colony.food[:] = 1
+        colony.direction[:] = DIRECTIONS.index(NW)
+
+        for _ in range(3):
+            colony.tick()
+
+        self.assertTrue(np.all(colony.x == 0))
+        self.assertTrue(np.all(colony.y == 0))
+        self.assertTrue(np.all(colony.time_since_food == 6))
+
+    def test_jumping_ants_keep_their_direction(self):
+        chemicals = Chemicals(size=(10, 10))
+        colony = Colony(
+            nest=Nest(0, 0),
+            chemicals=chemicals,
+            n_ants=1,
+            search_strategy=search_with_avoidance_and_jumps,
+            max_jump_distance=3
+        )
+        colony.x[:] = 5
+        colony.y[:] = 5
+        colony.jump[:] = 3
+        colony.jump_direction[:] = DIRECTIONS.index(N)
+
+        colony.tick()
+        colony.tick()
+
+        self.assertEqual((colony.x[0], colony.y[0]), (5, 3))
+        self.assertEqual(colony.jump[0], 1)
+
+    def test_colony_on_lazily_decaying_chemicals(self):
+        chemicals = Chemicals(size=(10, 10), lazy_decay=True)
+        colony = Colony(nest=Nest(0, 0), chemicals=chemicals, n_ants=2)
+
+        colony.tick()
+        chemicals.tick()
+
+        self.assertAlmostEqual(
+            2 * 0.975 * (1 - Chemicals.decay_rate),
+            chemicals.search[0, 0]
+        )
+
+
+class TestEnsemble(TestCase):
+
+    def test_ensemble_has_n_ants_per_replica(self):
+        colony = Colony(
+            nest=Nest(3, 4),
+            chemicals=Chemicals(size=(10, 10), replicas=4),
+            n_ants=5
+        )
+
+        self.assertEqual(len(colony), 20)
+        self.assertEqual(colony.x.reshape(4, 5).shape, (4, 5))
+        self.assertEqual(list(colony.replica.reshape(4, 5)[:, 0]), [0, 1, 2, 3])
+        self.assertEqual(colony.chemicals.search.shape, (4, 10, 10))
+
+    def test_replicas_deposit_in_their_own_grid(self):
+        chemicals = Chemicals(size=(10, 10), replicas=2)
+        colony = Colony(nest=Nest(0, 0), chemicals=chemicals, n_ants=1)
+        colony.x[:] = [2, 5]
+        colony.y[:] = [2, 5]
+
+        colony.tick()
+
+        search = np.asarray(chemicals.search)
+        self.assertEqual(np.count_nonzero(search[0]), 1)
+        self.assertEqual(np.count_nonzero(search[1]), 1)
+        self.assertGreater(search[0, 2, 2], 0)
+        self.assertGreater(search[1, 5, 5], 0)
+
+    def test_replicas_gather_and_deliver_separately(self):
+        chemicals = Chemicals(size=(10, 10), replicas=3)
+        chemicals.food[1, 1, 1] = 1
+        colony = Colony(nest=Nest(5, 5), chemicals=chemicals, n_ants=2)
+        colony.x[:] = 1
+        colony.y[:] = 1
+
+        colony.tick()
+
+        self.assertEqual(list(colony.food), [0, 0, 1, 0, 0, 0])
+        self.assertEqual(chemicals.food[1, 1, 1], 0.0)
+
+        colony.x[:] = 5
+        colony.y[:] = 5
+        colony.tick()
+
+        self.assertEqual(list(colony.delivered), [0, 1, 0])
+        self.assertEqual(colony.nest.food, 1)
+
+    def test_ensemble_senses_its_own_replica(self):
+        chemicals = Chemicals(size=(10, 10), replicas=2)
+        chemicals.search += 1.0
+        chemicals.search[0, 5 + N.x, 5 + N.y] = 0.0
+        chemicals.search[1, 5 + NW.x, 5 + NW.y] = 0.0
+        colony = Colony(nest=Nest(0, 0), chemicals=chemicals, n_ants=3)
+        colony.x[:] = 5
+        colony.y[:] = 5
+        colony.direction[:] = DIRECTIONS.index(N)
+
+        colony.tick()
+
+        self.assertTrue(np.all(colony.direction[:3] == DIRECTIONS.index(N)))
+        self.assertTrue(np.all(colony.direction[3:] == DIRECTIONS.index(NW)))
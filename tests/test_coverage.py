@@ -0,0 +1,80 @@
+from unittest import TestCase
+
+import numpy as np
+
+from core.ant import Ant, Chemicals, Nest
+from core.colony import Colony
+from core.coverage import Coverage
+
+
+class TestCoverage(TestCase):
+
+    def test_cells_are_counted_once(self):
+        coverage = Coverage((4, 5))
+        coverage.visit(np.array([0, 0, 1]), np.array([0, 0, 2]))
+        coverage.visit(np.array([1, 3]), np.array([2, 4]))
+        coverage.visit(-1, 9)
+
+        self.assertEqual(coverage.count, 3)
+        self.assertEqual(coverage.fraction, 3 / 20)
+
+    def test_replicas_are_counted_apart(self):
+        coverage = Coverage((4, 5), replicas=3)
+        coverage.visit(
+            np.array([0, 0, 1, 0]),
+            np.array([0, 0, 2, 0]),
+            replica=np.array([0, 0, 0, 2])
+        )
+
+        np.testing.assert_array_equal(coverage.count, [2, 0, 1])
+
+    def test_tick_records_the_curve(self):
+        coverage = Coverage((2, 5))
+        coverage.tick()
+        coverage.visit(1, 1)
+        coverage.tick()
+
+        np.testing.assert_array_equal(coverage.curve, [0.0, 0.1])
+
+    def test_state_round_trip(self):
+        coverage = Coverage((4, 5), replicas=2)
+        coverage.visit(np.array([1]), np.array([1]), replica=np.array([1]))
+        coverage.tick()
+
+        restored = Coverage.from_state(coverage.state())
+
+        np.testing.assert_array_equal(restored.visited, coverage.visited)
+        np.testing.assert_array_equal(restored.count, coverage.count)
+        np.testing.assert_array_equal(restored.curve, coverage.curve)
+
+
+class TestTrackedChemicals(TestCase):
+
+    def test_colony_and_ants_count_the_same_cells(self):
+        chemicals = Chemicals(size=(10, 10), track_coverage=True)
+        colony = Colony(Nest(5, 5), chemicals, n_ants=3, seed=1)
+        colony.x[:] = [1, 1, 12]
+        colony.y[:] = [1, 1, 5]
+        colony.deposit()
+
+        ant = Ant(nest=Nest(5, 5), chemicals=chemicals)
+        ant.x, ant.y = 2, 5
+        ant.tick()
+
+        self.assertEqual(chemicals.coverage.count, 2)
+        self.assertTrue(chemicals.coverage.visited[1, 1])
+
+    def test_coverage_is_no_longer_always_full(self):
+        chemicals = Chemicals(size=(20, 20), track_coverage=True)
+        colony = Colony(Nest(10, 10), chemicals, n_ants=5, seed=1)
+        for _ in range(5):
+            colony.tick()
+            chemicals.tick()
+
+        self.assertEqual(np.count_nonzero(chemicals.search), 400)
+        self.assertEqual(
+            chemicals.coverage.count,
+            np.count_nonzero(chemicals.coverage.visited)
+        )
+        self.assertLess(chemicals.coverage.fraction, 0.2)
+        self.assertEqual(len(chemicals.coverage.curve), 5)
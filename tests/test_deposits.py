@@ -0,0 +1,162 @@
+from unittest import TestCase
+
+import numpy as np
+
+from core import streams
+from core.ant import Ant, Chemicals, Nest
+from core.deposits import DepositBuffer
+from core.streams import RandomStream, ANT_BLOCK
+
+
+def run_ants(deposits, n_ticks=30):
+    chemicals = Chemicals(size=(10, 10), deposits=deposits)
+    nest = Nest(5, 5)
+    ant = Ant(nest=nest, chemicals=chemicals)
+    chemicals.food[8, 8] = 1
+    streams.seed(4)
+    for _ in range(n_ticks):
+        ant.tick()
+        chemicals.tick()
+    return ant, chemicals
+
+
+def run_synchronous(order, n_ticks=80):
+    chemicals = Chemicals(size=(12, 12), deposits='synchronous')
+    # Food under the nest, which every ant claims on the first tick
+    chemicals.food[6, 6] = 2.5
+    chemicals.food[3, 9] = 0.7
+    nest = Nest(6, 6)
+    ant_streams = RandomStream(7).spawn(len(order), block=ANT_BLOCK)
+    ants = [
+        Ant(nest=nest, chemicals=chemicals, random=stream)
+        for stream in ant_streams
+    ]
+    for _ in range(n_ticks):
+        for i in order:
+            ants[i].tick()
+        chemicals.tick()
+        nest.tick()
+    return ants, chemicals, nest
+
+
+class TestDeposits(TestCase):
+
+    def test_immediate_deposits_are_written_at_once(self):
+        chemicals = Chemicals(size=(10, 10))
+
+        chemicals.deposit('search', 12, -1, 0.5)
+
+        self.assertIsNone(chemicals.pending)
+        self.assertEqual(chemicals.search[2, 9], 0.5)
+
+    def test_end_of_tick_deposits_wait_for_the_tick(self):
+        chemicals = Chemicals(size=(10, 10), deposits='end_of_tick')
+
+        chemicals.deposit('search', 12, -1, 0.5)
+        chemicals.deposit('search', 2, 9, 0.25)
+        chemicals.deposit('found', 3, 3, 1.0)
+
+        self.assertEqual(len(chemicals.pending), 3)
+        self.assertEqual(np.asarray(chemicals.search).sum(), 0)
+        chemicals.tick()
+        self.assertEqual(len(chemicals.pending), 0)
+        self.assertAlmostEqual(
+            chemicals.search[2, 9],
+            0.75 * (1 - chemicals.decay_rate)
+        )
+        self.assertAlmostEqual(
+            chemicals.found[3, 3],
+            1 - chemicals.decay_rate
+        )
+
+    def test_a_lone_ant_runs_the_same_in_either_mode(self):
+        immediate, immediate_chemicals = run_ants('immediate')
+        deferred, deferred_chemicals = run_ants('end_of_tick')
+
+        self.assertEqual(
+            (immediate.x, immediate.y, immediate.direction),
+            (deferred.x, deferred.y, deferred.direction)
+        )
+        for name in ('search', 'found'):
+            np.testing.assert_array_equal(
+                np.asarray(getattr(immediate_chemicals, name)),
+                np.asarray(getattr(deferred_chemicals, name))
+            )
+
+    def test_later_ants_do_not_see_deposits_of_the_tick(self):
+        chemicals = Chemicals(size=(10, 10), deposits='end_of_tick')
+        nest = Nest(5, 5)
+        ants = [Ant(nest=nest, chemicals=chemicals) for _ in range(2)]
+
+        ants[0].tick()
+
+        self.assertEqual(chemicals.search[5, 5], 0)
+        ants[1].tick()
+        chemicals.flush()
+        self.assertEqual(chemicals.search[5, 5], 2.0 - 2 / 40)
+
+    def test_synchronous_ticks_do_not_depend_on_the_order_of_ants(self):
+        order = list(range(20))
+        shuffled = list(np.random.default_rng(3).permutation(20))
+        ants, chemicals, nest = run_synchronous(order)
+        other_ants, other_chemicals, other_nest = run_synchronous(shuffled)
+
+        self.assertGreater(nest.food, 0)
+        self.assertEqual(nest.food, other_nest.food)
+        self.assertEqual(
+            [(a.x, a.y, a.direction, a.food) for a in ants],
+            [(a.x, a.y, a.direction, a.food) for a in other_ants]
+        )
+        for name in ('search', 'found', 'food'):
+            np.testing.assert_array_equal(
+                np.asarray(getattr(chemicals, name)),
+                np.asarray(getattr(other_chemicals, name))
+            )
+
+    def test_ants_short_of_food_share_it(self):
+        chemicals = Chemicals(size=(10, 10), deposits='synchronous')
+        nest = Nest(2, 2)
+        chemicals.food[5, 5] = 1.5
+        ants = [Ant(nest=nest, chemicals=chemicals) for _ in range(3)]
+        for ant in ants:
+            ant.x, ant.y = 5, 5
+            ant.tick()
+
+        self.assertEqual(chemicals.food[5, 5], 1.5)
+        chemicals.flush()
+
+        self.assertEqual([ant.food for ant in ants], [0.5, 0.5, 0.5])
+        self.assertEqual(chemicals.food[5, 5], 0)
+
+    def test_synchronous_drops_reach_the_nest_at_the_end_of_the_tick(self):
+        chemicals = Chemicals(size=(10, 10), deposits='synchronous')
+        nest = Nest(5, 5)
+        ants = [Ant(nest=nest, chemicals=chemicals) for _ in range(2)]
+        for ant in ants:
+            ant.food = 0.25
+            ant.tick()
+
+        self.assertEqual(nest.food, 0)
+        chemicals.tick()
+        self.assertEqual(nest.food, 0.5)
+
+    def test_unsupported_options(self):
+        with self.assertRaises(ValueError):
+            Chemicals(size=(10, 10), deposits='later')
+        with self.assertRaises(ValueError):
+            Chemicals(size=(10, 10), deposits='end_of_tick', replicas=2)
+        with self.assertRaises(ValueError):
+            Chemicals(
+                size=(10, 10),
+                deposits='end_of_tick',
+                boundary='reflecting'
+            )
+
+    def test_buffer_state_round_trips(self):
+        buffer = DepositBuffer()
+        buffer.add('found', 1, 2, 0.5)
+
+        restored = DepositBuffer.from_state(buffer.state())
+
+        self.assertEqual(len(restored), 1)
+        self.assertEqual(restored.state()['found.y'].tolist(), [2])
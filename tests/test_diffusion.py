@@ -0,0 +1,77 @@
+from unittest import TestCase
+
+import numpy as np
+
+from core.ant import Chemicals
+from core.diffusion import Diffusion, FFT_STEPS
+
+
+def reference_step(u, coefficient):
+    neighbours = sum(
+        np.roll(u, shift, axis=axis)
+        for shift in (-1, 1)
+        for axis in (-2, -1)
+    )
+    return u + coefficient * (neighbours - 4 * u)
+
+
+class TestDiffusion(TestCase):
+
+    def test_stencil_matches_a_periodic_laplacian(self):
+        values = np.random.default_rng(1).random((6, 7))
+        diffusion = Diffusion(values.shape, 0.2)
+        expected = reference_step(reference_step(values, 0.2), 0.2)
+
+        diffusion(values, steps=2)
+
+        np.testing.assert_allclose(values, expected)
+
+    def test_fft_matches_the_stencil(self):
+        rng = np.random.default_rng(1)
+        stencil = rng.random((3, 8, 5))
+        fft = stencil.copy()
+        diffusion = Diffusion(stencil.shape, 0.1)
+
+        for _ in range(FFT_STEPS):
+            diffusion(stencil)
+        diffusion(fft, steps=FFT_STEPS)
+
+        np.testing.assert_allclose(fft, stencil)
+
+    def test_amount_is_conserved_and_spreads(self):
+        values = np.zeros((5, 5))
+        values[0, 0] = 1.0
+        Diffusion(values.shape, 0.25)(values)
+
+        self.assertAlmostEqual(values.sum(), 1.0)
+        self.assertEqual(values[4, 0], 0.25)
+        self.assertEqual(values[0, 0], 0.0)
+
+    def test_unstable_coefficients_are_refused(self):
+        with self.assertRaises(ValueError):
+            Diffusion((5, 5), 0.3)
+
+
+class TestDiffusingChemicals(TestCase):
+
+    def test_tick_diffuses_after_decaying(self):
+        chemicals = Chemicals(size=(5, 5), diffusion={'search': 0.1})
+        chemicals.search[2, 2] = 1000.0
+        chemicals.tick()
+
+        self.assertAlmostEqual(
+            chemicals.search[2, 3],
+            0.6 * 0.01 + 0.1 * (999.0 + 3 * 0.01)
+        )
+        self.assertEqual(chemicals.found[2, 3], chemicals.min_chemical)
+
+    def test_diffusion_needs_the_default_lattices(self):
+        for options in (
+            {'lazy_decay': True},
+            {'boundary': 'reflecting'},
+            {'tile_size': 4},
+        ):
+            with self.assertRaises(ValueError):
+                Chemicals(size=(8, 8), diffusion={'search': 0.1}, **options)
+        with self.assertRaises(ValueError):
+            Chemicals(size=(8, 8), diffusion={'food': 0.1})
@@ -0,0 +1,130 @@
+from unittest import TestCase
+
+import numpy as np
+
+from core.ant import Ant, Chemicals, Nest
+from core.colony import Colony
+from core.food import FoodSources
+
+
+class TestFoodSources(TestCase):
+
+    def test_cells_without_a_source_are_empty(self):
+        food = FoodSources((10, 10))
+        food.add(12, -1, 5.0)
+
+        self.assertEqual(len(food), 1)
+        self.assertEqual(food[2, 9], 5.0)
+        self.assertEqual(food[3, 3], 0.0)
+        np.testing.assert_array_equal(
+            food.gather(np.array([2, 3]), np.array([9, 3])),
+            [5.0, 0.0]
+        )
+
+    def test_adding_a_source_again_replaces_it(self):
+        food = FoodSources((10, 10))
+        food.add(2, 2, 5.0)
+        food.add(2, 2, 3.0)
+
+        self.assertEqual(len(food), 1)
+        self.assertEqual(food[2, 2], 3.0)
+
+    def test_writes_and_scatter_add_match_a_dense_grid(self):
+        food = FoodSources((6, 7))
+        dense = np.zeros((6, 7))
+        food[1:3, 2:5] = 2.0
+        dense[1:3, 2:5] = 2.0
+        food[4, 4] += 1.5
+        dense[4, 4] += 1.5
+        x, y = np.array([1, 1, 4, 0]), np.array([2, 2, 4, 0])
+        food.scatter_add(x, y, -0.5)
+        np.add.at(dense, (x, y), -0.5)
+
+        np.testing.assert_array_equal(np.asarray(food), dense)
+
+    def test_refill_and_regrow_on_their_schedule(self):
+        food = FoodSources((10, 10))
+        food.add(1, 1, 0.0, refill=4.0, every=2)
+        food.add(5, 5, 0.0, regrow=1.0, capacity=2.5)
+
+        food.tick()
+        self.assertEqual((food[1, 1], food[5, 5]), (0.0, 1.0))
+        food.tick()
+        food.tick()
+        self.assertEqual((food[1, 1], food[5, 5]), (4.0, 2.5))
+
+    def test_depletions_are_recorded(self):
+        food = FoodSources((10, 10))
+        food.add(3, 4, 2.0, refill=2.0)
+        food.tick()
+        food[3, 4] -= 1.0
+        food[3, 4] -= 1.0
+
+        self.assertEqual(food.depletions, [(1, 3, 4)])
+
+    def test_replicas_get_their_own_sources(self):
+        food = FoodSources((2, 10, 10))
+        food.add(1, 1, 5.0)
+        food.add(2, 2, 1.0, replica=1)
+        food.scatter_add(np.array([1]), np.array([1]), -5.0, replica=0)
+
+        np.testing.assert_array_equal(
+            food.gather(
+                np.array([1, 1, 2, 2]),
+                np.array([1, 1, 2, 2]),
+                replica=np.array([0, 1, 0, 1])
+            ),
+            [0.0, 5.0, 0.0, 1.0]
+        )
+
+    def test_state_round_trip(self):
+        food = FoodSources((10, 10))
+        food.add(1, 2, 3.0, refill=3.0, every=5)
+        food[1, 2] = 0.0
+        food.tick()
+
+        restored = FoodSources.from_state(food.state())
+        restored.tick()
+        food.tick()
+
+        np.testing.assert_array_equal(np.asarray(restored), np.asarray(food))
+        self.assertEqual(restored.depletions, food.depletions)
+
+
+class TestFoodSourceChemicals(TestCase):
+
+    def test_ants_gather_from_a_source(self):
+        chemicals = Chemicals(size=(10, 10), food_sources=True)
+        chemicals.food.add(5, 5, 1.5)
+        ants = [
+            Ant(nest=Nest(0, 0), chemicals=chemicals) for _ in range(2)
+        ]
+        for ant in ants:
+            ant.x, ant.y = 5, 5
+            ant.tick()
+
+        self.assertEqual(sorted(ant.food for ant in ants), [0.5, 1.0])
+        self.assertEqual(chemicals.food[5, 5], 0.0)
+
+    def test_colony_gathers_like_the_ants(self):
+        chemicals = Chemicals(size=(10, 10), food_sources=True)
+        chemicals.food.add(5, 5, 1.5)
+        colony = Colony(Nest(0, 0), chemicals, n_ants=2, seed=1)
+        colony.x[:] = 5
+        colony.y[:] = 5
+        colony.tick()
+
+        self.assertEqual(sorted(colony.food), [0.5, 1.0])
+        self.assertEqual(chemicals.food[5, 5], 0.0)
+        self.assertEqual(chemicals.food.depletions, [(0, 5, 5)])
+
+    def test_tick_replenishes_the_sources(self):
+        chemicals = Chemicals(size=(10, 10), food_sources=True)
+        chemicals.food.add(5, 5, 0.0, refill=100.0)
+        chemicals.tick()
+
+        self.assertEqual(chemicals.food[5, 5], 100.0)
+
+    def test_a_boundary_is_not_supported(self):
+        with self.assertRaises(ValueError):
+            Chemicals(size=(10, 10), boundary='periodic', food_sources=True)
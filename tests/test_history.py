@@ -0,0 +1,90 @@
+from unittest import TestCase
+
+import numpy as np
+
+from core.ant import Nest
+from core.history import TimeSeries
+
+
+class TestTimeSeries(TestCase):
+
+    def test_grows_past_its_capacity(self):
+        series = TimeSeries(capacity=2)
+        for value in range(5):
+            series.append(value)
+
+        self.assertEqual(series.values.tolist(), [0, 1, 2, 3, 4])
+        self.assertEqual(series.values.dtype, np.float64)
+
+    def test_ring_keeps_the_last_values_in_order(self):
+        series = TimeSeries(capacity=3, ring=True)
+        for value in range(7):
+            series.append(value)
+
+        self.assertEqual(series.values.tolist(), [4, 5, 6])
+        self.assertEqual(series.ticks.tolist(), [4, 5, 6])
+
+    def test_every(self):
+        series = TimeSeries(every=3)
+        for value in range(7):
+            series.append(value)
+
+        self.assertEqual(series.values.tolist(), [0, 3, 6])
+        self.assertEqual(series.ticks.tolist(), [0, 3, 6])
+
+    def test_window(self):
+        series = TimeSeries(window=2)
+        for value in (1, 3, 5, 4, 9):
+            series.append(value)
+
+        self.assertEqual(series.values.tolist(), [2.0, 4.5])
+        self.assertEqual(series.minimum.tolist(), [1, 4])
+        self.assertEqual(series.maximum.tolist(), [3, 5])
+
+    def test_values_are_read_only_views(self):
+        series = TimeSeries()
+        series.append(1)
+
+        with self.assertRaises(ValueError):
+            series.values[0] = 2
+
+
+class TestHistoryAttr(TestCase):
+
+    def test_nest_records_its_food(self):
+        nest = Nest(0, 0)
+        nest.food += 1
+        nest.tick()
+
+        self.assertEqual(nest.food, 1)
+        self.assertEqual(nest.food_history.tolist(), [0, 1, 1])
+
+    def test_nests_record_separately(self):
+        first = Nest(0, 0)
+        second = Nest(0, 0)
+        first.food += 1
+
+        self.assertEqual(len(first.food_history), 2)
+        self.assertEqual(len(second.food_history), 1)
+
+    def test_series_can_be_replaced_per_nest(self):
+        nest = Nest(0, 0)
+        nest.food_series = TimeSeries(capacity=2, ring=True)
+        for _ in range(5):
+            nest.food += 1
+
+        self.assertEqual(nest.food_history.tolist(), [4, 5])
+
+    def test_series_rebuilt_from_its_state_carries_on(self):
+        for options in ({}, {'capacity': 3, 'ring': True}, {'window': 2}):
+            series = TimeSeries(**options)
+            for value in range(5):
+                series.append(value)
+
+            rebuilt = TimeSeries.from_state(series.state())
+            for value in range(5, 8):
+                series.append(value)
+                rebuilt.append(value)
+
+            self.assertEqual(rebuilt.values.tolist(), series.values.tolist())
+            self.assertEqual(rebuilt.ticks.tolist(), series.ticks.tolist())
@@ -0,0 +1,380 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from core import streams
+from core.ant import Ant, Chemicals, Nest, Location, \
+    search_with_avoidance_and_jumps
+from core.colony import Colony
+from core.lattice import PeriodicLattice, HaloLattice, LazyDecayLattice, \
+    TiledLattice, MappedLattice
+
+
+class TestPeriodicLattice(TestCase):
+
+    def test_scalar_indexes_wrap(self):
+        lattice = PeriodicLattice(np.zeros((4, 5)))
+        lattice[-1, 5] = 1.0
+
+        self.assertEqual(lattice[3, 0], 1.0)
+
+    def test_decay_is_in_place(self):
+        lattice = PeriodicLattice(np.ones((4, 5)))
+        lattice.decay(0.5, a_min=0.6)
+
+        self.assertTrue(np.all(lattice == 0.6))
+
+
+class TestHaloLattice(TestCase):
+
+    def test_reads_inside_and_past_the_edges(self):
+        lattice = HaloLattice(np.arange(20.0).reshape(4, 5))
+
+        self.assertEqual(lattice[1, 2], 7.0)
+        self.assertEqual(lattice[-1, 0], 15.0)
+        self.assertEqual(lattice[4, 5], 0.0)
+        self.assertEqual(lattice[9, 12], lattice[1, 2])
+
+    def test_ghost_writes_are_folded_on_sync(self):
+        lattice = HaloLattice(np.zeros((4, 5)))
+        lattice[-1, 2] += 1.0
+        lattice[-1, -1] += 2.0
+
+        lattice.sync()
+
+        self.assertEqual(lattice[3, 2], 1.0)
+        self.assertEqual(lattice[3, 4], 2.0)
+        self.assertEqual(lattice.sum(), 3.0)
+
+    def test_slice_writes_wrap_at_the_edges(self):
+        lattice = HaloLattice(np.zeros((4, 5)))
+        lattice[-1:2, -1:2] += 1.0
+
+        lattice.sync()
+
+        self.assertEqual(lattice.sum(), 9.0)
+        self.assertEqual(lattice[3, 4], 1.0)
+        self.assertEqual(lattice[1, 1], 1.0)
+
+    def test_reflecting_boundary(self):
+        lattice = HaloLattice(
+            np.arange(20.0).reshape(4, 5),
+            boundary='reflecting'
+        )
+        self.assertEqual(lattice[-1, 2], lattice[0, 2])
+        self.assertEqual(lattice[4, 5], lattice[3, 4])
+
+        lattice[-1, 2] += 1.0
+        lattice.sync()
+
+        self.assertEqual(lattice[0, 2], 3.0)
+
+    def test_absorbing_boundary(self):
+        lattice = HaloLattice(
+            np.ones((4, 5)),
+            boundary='absorbing'
+        )
+        self.assertEqual(lattice[-1, 2], 0.0)
+
+        lattice[-1, 2] += 1.0
+        lattice.sync()
+
+        self.assertEqual(lattice.sum(), 20.0)
+        self.assertEqual(lattice[-1, 2], 0.0)
+
+    def test_indexes_past_the_halo_keep_the_boundary(self):
+        reflecting = HaloLattice(
+            np.arange(20.0).reshape(4, 5),
+            boundary='reflecting'
+        )
+        self.assertEqual(reflecting[-2, 2], reflecting[1, 2])
+        self.assertEqual(reflecting[6, 2], reflecting[1, 2])
+
+        reflecting[-2, 2] += 1.0
+        reflecting.sync()
+
+        self.assertEqual(reflecting[1, 2], 8.0)
+        self.assertEqual(reflecting[2, 2], 12.0)
+
+        absorbing = HaloLattice(np.ones((4, 5)), boundary='absorbing')
+        self.assertEqual(absorbing[-2, 2], 0.0)
+
+        absorbing[-2, 2] += 1.0
+        absorbing[2, 7] += 1.0
+        absorbing.sync()
+
+        self.assertEqual(absorbing.sum(), 20.0)
+
+    def test_decay_keeps_the_ghost_cells_in_step(self):
+        lattice = HaloLattice(np.ones((4, 5)))
+        lattice.decay(0.5)
+
+        self.assertEqual(lattice[-1, -1], 0.5)
+        lattice.sync()
+        self.assertTrue(np.all(lattice == 0.5))
+
+    def test_neighbourhood(self):
+        lattice = HaloLattice(np.zeros((4, 5)))
+        lattice[3, 4] = 1.0
+        lattice.sync()
+
+        self.assertEqual(lattice.neighbourhood(0, 0)[0, 0], 1.0)
+
+    def test_arithmetic_results_are_plain_lattices(self):
+        lattice = HaloLattice(np.ones((4, 5)))
+        difference = lattice - lattice
+
+        self.assertIsNone(difference.padded)
+        self.assertEqual(difference[-1, 7], 0.0)
+
+    def test_unknown_boundary(self):
+        with self.assertRaises(ValueError):
+            HaloLattice(np.zeros((4, 5)), boundary='sticky')
+
+
+class TestLazyDecayLattice(TestCase):
+
+    def test_matches_a_decayed_and_clipped_lattice(self):
+        values = np.array([[0.0, 0.0105], [1.0, 5.0]])
+        lazy = LazyDecayLattice(values)
+        dense = PeriodicLattice(values.copy())
+
+        for _ in range(10):
+            lazy.decay(0.99, a_min=0.01, a_max=4.0)
+            dense.decay(0.99, a_min=0.01, a_max=4.0)
+
+        np.testing.assert_allclose(np.asarray(lazy), np.asarray(dense))
+
+    def test_writes_are_not_clipped_until_the_next_decay(self):
+        lazy = LazyDecayLattice(np.zeros((3, 3)))
+        lazy.decay(0.5, a_min=0.01)
+        lazy[1, 1] = 0.0
+
+        self.assertEqual(lazy[1, 1], 0.0)
+        self.assertEqual(lazy[1, 2], 0.01)
+
+        lazy.decay(0.5, a_min=0.01)
+
+        self.assertEqual(lazy[1, 1], 0.01)
+
+    def test_deposits_decay_with_the_lattice(self):
+        lazy = LazyDecayLattice(np.zeros((3, 3)))
+        lazy.decay(0.5, a_min=0.01)
+        lazy[4, 4] += 1.0
+        lazy.decay(0.5, a_min=0.01)
+
+        self.assertAlmostEqual(lazy[1, 1], 0.505)
+
+    def test_gather_and_scatter_add(self):
+        lazy = LazyDecayLattice(np.zeros((3, 3)))
+        lazy.decay(0.5, a_min=0.01)
+        lazy.scatter_add(np.array([0, 0]), np.array([1, 1]), 1.0)
+
+        np.testing.assert_allclose(
+            lazy.gather(np.array([0, 2]), np.array([1, 2])),
+            [2.01, 0.01]
+        )
+
+    def test_renormalises_when_the_scale_drifts(self):
+        lazy = LazyDecayLattice(np.ones((3, 3)), renormalise_below=0.1)
+        for _ in range(4):
+            lazy.decay(0.5, a_min=0.01)
+
+        self.assertEqual(lazy.scale, 1.0)
+        self.assertEqual(lazy[0, 0], 0.0625)
+
+
+class TestTiledLattice(TestCase):
+
+    def test_unwritten_cells_read_as_fill_without_tiles(self):
+        tiled = TiledLattice((20000, 20000), tile_size=64)
+
+        self.assertEqual(tiled[123, -5], 0.0)
+        self.assertEqual(tiled.n_tiles, 0)
+        self.assertLess(tiled.nbytes, 2 * 10 ** 6)
+
+    def test_writes_allocate_one_tile(self):
+        tiled = TiledLattice((10, 7), tile_size=4)
+        tiled[-1, -1] += 2.0
+
+        self.assertEqual(tiled[9, 6], 2.0)
+        self.assertEqual(tiled.n_tiles, 1)
+        self.assertEqual(np.asarray(tiled).sum(), 2.0)
+
+    def test_matches_a_dense_lattice(self):
+        rng = np.random.default_rng(1)
+        tiled = TiledLattice((10, 7), tile_size=4)
+        dense = PeriodicLattice(np.zeros((10, 7)))
+        for _ in range(5):
+            x = rng.integers(0, 10, size=6)
+            y = rng.integers(0, 7, size=6)
+            amounts = rng.random(6)
+            tiled.scatter_add(x, y, amounts)
+            dense.scatter_add(x, y, amounts)
+            tiled.decay(0.9, a_min=0.01, a_max=1.5)
+            dense.decay(0.9, a_min=0.01, a_max=1.5)
+
+        np.testing.assert_allclose(np.asarray(tiled), np.asarray(dense))
+        np.testing.assert_allclose(
+            tiled.gather(np.array([0, 9, 5]), np.array([0, 6, 3])),
+            dense.gather(np.array([0, 9, 5]), np.array([0, 6, 3]))
+        )
+
+    def test_array_writes_allocate_only_changed_tiles(self):
+        tiled = TiledLattice((8, 8), tile_size=4)
+        tiled[0:2, 5:7] = 1.0
+        tiled += 1.0
+
+        self.assertEqual(tiled.n_tiles, 1)
+        self.assertEqual(tiled[0, 5], 2.0)
+        self.assertEqual(tiled[7, 0], 1.0)
+
+
+class TestTiledChemicals(TestCase):
+
+    def test_ants_move_as_on_dense_chemicals(self):
+        runs = []
+        for tile_size in (None, 8):
+            streams.seed(4)
+            chemicals = Chemicals(size=(50, 50), tile_size=tile_size)
+            chemicals.food[30, 30] = 10
+            nest = Nest(25, 25)
+            ants = [Ant(nest=nest, chemicals=chemicals) for _ in range(5)]
+            for _ in range(30):
+                for ant in ants:
+                    ant.tick()
+                chemicals.tick()
+            runs.append((
+                [(ant.x, ant.y, ant.direction) for ant in ants],
+                np.asarray(chemicals.search)
+            ))
+
+        self.assertEqual(runs[0][0], runs[1][0])
+        np.testing.assert_allclose(runs[0][1], runs[1][1])
+
+
+class TestHaloChemicals(TestCase):
+
+    def test_ant_leaves_behind_search_chemical(self):
+        ant = Ant(
+            nest=Nest(0, 0),
+            chemicals=Chemicals(size=(10, 10), boundary='periodic')
+        )
+        ant.location = Location(-1, -1)
+
+        ant.tick()
+        ant.chemicals.tick()
+
+        self.assertAlmostEqual(
+            0.975 * (1 - Chemicals.decay_rate),
+            ant.chemicals.search[9, 9],
+            6
+        )
+
+
+class TestLazyDecayChemicals(TestCase):
+
+    def test_ant_leaves_behind_found_chemical(self):
+        ant = Ant(
+            nest=Nest(0, 0),
+            chemicals=Chemicals(lazy_decay=True)
+        )
+        ant.location = Location(10, 10)
+        ant.food = 1
+
+        ant.tick()
+        ant.chemicals.tick()
+
+        self.assertEqual(ant.chemicals.search[10, 10], 0.01)
+        self.assertAlmostEqual(
+            0.975 * (1 - Chemicals.decay_rate),
+            ant.chemicals.found[10, 10]
+        )
+
+
+class TestMappedLattice(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'field.dat')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_flushed_lattice_opens_again(self):
+        lattice = MappedLattice(self.path, (4, 5), fill=2.0)
+        lattice[-1, 5] = 1.0
+        lattice.flush()
+
+        reopened = MappedLattice(self.path, (4, 5))
+
+        self.assertEqual(reopened[3, 0], 1.0)
+        self.assertEqual(reopened[1, 1], 2.0)
+
+    def test_decays_tile_by_tile_like_a_lattice_in_memory(self):
+        values = np.random.default_rng(2).random((3, 6, 5))
+        lattice = MappedLattice(self.path, values.shape, tile_bytes=80)
+        lattice[...] = values
+        expected = PeriodicLattice(values.copy())
+
+        lattice.decay(0.5, a_min=0.1, a_max=0.4)
+        expected.decay(0.5, a_min=0.1, a_max=0.4)
+
+        self.assertEqual(lattice.tile_rows, 2)
+        np.testing.assert_array_equal(
+            np.asarray(lattice),
+            np.asarray(expected)
+        )
+
+    def test_a_file_of_another_shape_is_refused(self):
+        MappedLattice(self.path, (4, 5))
+
+        with self.assertRaises(ValueError):
+            MappedLattice(self.path, (5, 5))
+
+    def test_derived_arrays_are_in_memory(self):
+        lattice = MappedLattice(self.path, (4, 5))
+
+        self.assertIsNone((lattice + 1).memmap)
+
+
+class TestMappedChemicals(TestCase):
+
+    def run_colony(self, **options):
+        chemicals = Chemicals(size=(20, 20), **options)
+        chemicals.food[16, 16] = 10
+        colony = Colony(
+            Nest(10, 10),
+            chemicals,
+            n_ants=30,
+            search_strategy=search_with_avoidance_and_jumps,
+            seed=1
+        )
+        for _ in range(40):
+            colony.tick()
+            chemicals.tick()
+        return chemicals
+
+    def test_colony_runs_as_on_chemicals_in_memory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            mapped = self.run_colony(memmap_dir=directory)
+            expected = self.run_colony()
+            mapped.flush_fields()
+
+            self.assertIsInstance(mapped.search, MappedLattice)
+            for name in ('search', 'found', 'food'):
+                np.testing.assert_array_equal(
+                    np.asarray(getattr(mapped, name)),
+                    np.asarray(getattr(expected, name))
+                )
+            snapshot = Chemicals(size=(20, 20), memmap_dir=directory)
+            np.testing.assert_array_equal(
+                np.asarray(snapshot.found),
+                np.asarray(expected.found)
+            )
+
+    def test_memmap_dir_needs_the_default_lattices(self):
+        with self.assertRaises(ValueError):
+            Chemicals(size=(5, 5), memmap_dir='unused', lazy_decay=True)
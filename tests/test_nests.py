@@ -0,0 +1,86 @@
+from unittest import TestCase
+
+import numpy as np
+
+from core.ant import Ant, Chemicals, Nest
+from core.colony import Colony
+from core.nests import NestMap, NO_NEST
+
+
+class TestNestMap(TestCase):
+
+    def test_home_zone_matches_the_distance_to_the_nest(self):
+        nests = NestMap((10, 10))
+        nest = Nest(4, 5)
+        nests.add(nest)
+        x, y = np.mgrid[0:10, 0:10]
+
+        np.testing.assert_array_equal(
+            nests.is_home(nest, x, y),
+            np.abs(x - 4) + np.abs(y - 5) < 2
+        )
+
+    def test_home_zone_wraps(self):
+        nests = NestMap((10, 10))
+        nest = Nest(0, 0)
+
+        self.assertTrue(nests.is_home(nest, -1, 0))
+        self.assertTrue(nests.is_home(nest, 10, 1))
+        self.assertFalse(nests.is_home(nest, 9, 9))
+
+    def test_nests_get_their_own_index(self):
+        nests = NestMap((10, 10))
+        first, second = Nest(2, 2), Nest(7, 7)
+
+        self.assertEqual(nests.add(first), 0)
+        self.assertEqual(nests.add(second), 1)
+        self.assertEqual(nests.add(Nest(2, 12)), 0)
+        self.assertEqual(nests.nest_at(7, 8), 1)
+        self.assertEqual(nests.nest_at(5, 5), NO_NEST)
+        np.testing.assert_array_equal(
+            nests.gather(np.array([2, 7, 5]), np.array([1, 7, 5])),
+            [0, 1, NO_NEST]
+        )
+
+    def test_overlapping_nests_are_refused(self):
+        nests = NestMap((10, 10))
+        nests.add(Nest(2, 2))
+
+        with self.assertRaises(ValueError):
+            nests.add(Nest(3, 3))
+
+
+class TestSharedChemicals(TestCase):
+
+    def test_ants_are_at_home_only_at_their_own_nest(self):
+        chemicals = Chemicals(size=(20, 20))
+        first, second = Nest(2, 2), Nest(12, 12)
+        ant = Ant(nest=first, chemicals=chemicals)
+        ant.x, ant.y = 12, 12
+
+        self.assertFalse(ant.is_at_home)
+        ant.nest = second
+        self.assertTrue(ant.is_at_home)
+
+    def test_ants_without_chemicals_are_at_home_near_their_nest(self):
+        ant = Ant(nest=Nest(2, 2))
+        ant.x = 3
+
+        self.assertTrue(ant.is_at_home)
+        ant.y = 3
+        self.assertFalse(ant.is_at_home)
+
+    def test_colonies_share_one_chemicals(self):
+        chemicals = Chemicals(size=(20, 20))
+        first = Colony(Nest(2, 2), chemicals, n_ants=2, seed=1)
+        second = Colony(Nest(12, 12), chemicals, n_ants=2, seed=1)
+        for colony in (first, second):
+            colony.food[:] = 1
+        first.x[1], first.y[1] = 12, 12
+
+        first.tick()
+        second.tick()
+
+        self.assertEqual(first.nest.food, 1.0)
+        self.assertEqual(second.nest.food, 2.0)
+        self.assertEqual(len(chemicals.nests), 2)
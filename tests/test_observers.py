@@ -0,0 +1,48 @@
+from unittest import TestCase
+
+import numpy as np
+
+from experiments.image_search_strategies import build_colony, run
+from experiments.observers import Curve, Observer, log_ticks
+
+
+class TestObservers(TestCase):
+
+    def test_observers_are_called_at_their_ticks(self):
+        colony = build_colony(3, size=(20, 20), seed=1)
+        seen = []
+        every = Observer(lambda state: seen.append(('every', state.t)), 4)
+        ticks = Observer(
+            lambda state: seen.append(('ticks', state.t)),
+            ticks=[0, 1, 5, 5, 50]
+        )
+        run(10, colony, observers=[every, ticks])
+
+        self.assertEqual(seen, [
+            ('ticks', 1), ('every', 4), ('ticks', 5), ('every', 8)
+        ])
+
+    def test_one_run_gives_the_whole_curve(self):
+        colony = build_colony(3, size=(20, 20), seed=1)
+        coverage = Curve(lambda state: state.coverage, ticks=log_ticks(30))
+        food = Curve(lambda state: state.nest_food, every=1)
+        run(30, colony, observers=[coverage, food])
+
+        np.testing.assert_array_equal(coverage.ticks, log_ticks(30))
+        np.testing.assert_array_equal(
+            coverage.values[-1],
+            colony.chemicals.coverage.fraction
+        )
+        np.testing.assert_array_equal(
+            coverage.values,
+            colony.chemicals.coverage.curve[coverage.ticks - 1]
+        )
+        self.assertEqual(len(food.values), 30)
+
+    def test_the_state_is_read_only(self):
+        colony = build_colony(3, size=(20, 20), seed=1)
+
+        def write(state):
+            state.search[0, 0] = 1.0
+        with self.assertRaises(ValueError):
+            run(1, colony, observers=[Observer(write)])
@@ -0,0 +1,82 @@
+from unittest import TestCase
+
+import numpy as np
+
+from core.ant import Chemicals, Nest
+from core.colony import Colony
+from core.parallel import ParallelColony
+from experiments.image_search_strategies import build_chemicals, run
+
+
+class TestParallelColony(TestCase):
+
+    def test_first_tick_deposits_as_a_colony(self):
+        chemicals = Chemicals(size=(20, 20))
+        colony = Colony(nest=Nest(10, 10), chemicals=chemicals, n_ants=50)
+        colony.tick()
+        chemicals.tick()
+
+        with ParallelColony(Nest(10, 10), 50, (20, 20), workers=3) as ants:
+            ants.tick()
+
+            np.testing.assert_allclose(
+                np.asarray(ants.chemicals.search),
+                np.asarray(chemicals.search)
+            )
+
+    def test_one_worker_runs_like_a_colony(self):
+        colony = Colony(
+            nest=Nest(10, 10),
+            chemicals=build_chemicals((20, 20)),
+            n_ants=20,
+            seed=5
+        )
+        run(20, colony)
+
+        with ParallelColony(
+            Nest(10, 10), 20, (20, 20), workers=1, seed=5
+        ) as ants:
+            run(20, ants)
+            state = ants.collect()
+
+            np.testing.assert_array_equal(
+                np.asarray(ants.chemicals.search),
+                np.asarray(colony.chemicals.search)
+            )
+        np.testing.assert_array_equal(state['x'], colony.x)
+        np.testing.assert_array_equal(state['y'], colony.y)
+
+    def test_ants_are_kept_by_the_worker_of_their_strip(self):
+        with ParallelColony(
+            Nest(10, 10), 60, (20, 20), workers=3, seed=1
+        ) as ants:
+            for _ in range(30):
+                ants.tick()
+            state = ants.collect()
+            bounds = ants.bounds
+
+        self.assertEqual(len(state['x']), 60)
+        # Ants spread out from the nest over every strip
+        strips = np.searchsorted(bounds, state['x'] % 20, side='right') - 1
+        self.assertEqual(set(strips), {0, 1, 2})
+
+    def test_food_is_delivered_to_the_nest(self):
+        nest = Nest(3, 3)
+        with ParallelColony(nest, 20, (20, 20), workers=2, seed=2) as ants:
+            ants.chemicals.food[4, 4] = 5
+            run(60, ants)
+
+        self.assertGreater(nest.food, 0)
+
+    def test_run_lays_and_refills_the_food_sources(self):
+        nest = Nest(3, 3)
+        food = ({'x': 5, 'y': 5, 'amount': 2, 'refill': 2},)
+        with ParallelColony(nest, 20, (20, 20), workers=2, seed=2) as ants:
+            run(100, ants, food=food)
+
+            self.assertEqual(ants.chemicals.food[5, 5], 2)
+        self.assertGreater(nest.food, 2)
+
+    def test_too_many_workers(self):
+        with self.assertRaises(ValueError):
+            ParallelColony(Nest(0, 0), 1, (2, 2), workers=3)
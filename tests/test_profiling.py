@@ -0,0 +1,82 @@
+from unittest import TestCase
+
+from core import streams
+from core.ant import Ant, Chemicals, Nest, SearchWithAvoidance
+from core.colony import Colony
+from core.profiling import Profiler
+from tests.helpers import tick_ants
+
+
+def build_ants():
+    nest = Nest(5, 5)
+    chemicals = Chemicals(size=(10, 10))
+    ants = [Ant(nest=nest, chemicals=chemicals) for _ in range(3)]
+    ants[0].food = 1
+    ants[0].x = 0
+    return ants
+
+
+class TestProfiler(TestCase):
+
+    def test_records_phases_split_by_strategy(self):
+        ants = build_ants()
+        with Profiler() as profiler:
+            tick_ants(ants, 4)
+
+        self.assertEqual(profiler.calls['Ant.tick'], 12)
+        self.assertEqual(profiler.calls['Ant.step'], 12)
+        self.assertEqual(profiler.calls['Chemicals.tick'], 4)
+        # The strategy is picked twice per tick
+        self.assertEqual(profiler.calls['Ant.strategy'], 24)
+        self.assertEqual(
+            profiler.calls['SearchWithAvoidance.move'] +
+            profiler.calls['ReturnState.move'] +
+            profiler.calls['GatherState.move'],
+            12
+        )
+        self.assertGreater(profiler.calls['ReturnState.chemicals'], 0)
+        self.assertGreaterEqual(
+            profiler.seconds['Ant.tick'],
+            profiler.seconds['Ant.step']
+        )
+        self.assertIn('Ant.tick', profiler.summary())
+
+    def test_disabling_restores_the_classes(self):
+        tick_method = Ant.__dict__['tick']
+        strategy = Ant.__dict__['strategy']
+        with Profiler():
+            self.assertIsNot(Ant.__dict__['tick'], tick_method)
+
+        self.assertIs(Ant.__dict__['tick'], tick_method)
+        self.assertIs(Ant.__dict__['strategy'], strategy)
+        self.assertNotIn('step', Ant.__dict__)
+        self.assertNotIn('chemicals', SearchWithAvoidance.__dict__)
+
+    def test_profiled_runs_are_unchanged(self):
+        runs = []
+        for profiled in (False, True):
+            streams.seed(2)
+            ants = build_ants()
+            profiler = Profiler()
+            if profiled:
+                profiler.enable()
+            try:
+                tick_ants(ants, 10)
+            finally:
+                profiler.disable()
+            runs.append([(a.x, a.y, a.direction, a.food) for a in ants])
+
+        self.assertEqual(runs[0], runs[1])
+
+    def test_only_one_profiler_at_a_time(self):
+        with Profiler():
+            with self.assertRaises(RuntimeError):
+                Profiler().enable()
+
+    def test_colony_phases(self):
+        colony = Colony(Nest(5, 5), Chemicals(size=(10, 10)), n_ants=10)
+        with Profiler() as profiler:
+            colony.tick()
+
+        self.assertEqual(profiler.calls['Colony.tick'], 1)
+        self.assertEqual(profiler.calls['Colony._search_directions'], 1)
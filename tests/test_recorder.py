@@ -0,0 +1,66 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from core.ant import Chemicals, Nest
+from experiments.image_search_strategies import build_colony, run
+from experiments.recorder import Recorder, load_frames, render
+
+
+class TestRecorder(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'frames')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_records_every_k_ticks(self):
+        chemicals = Chemicals(size=(4, 5))
+        nest = Nest(0, 0)
+        with Recorder(self.path, chemicals, n_frames=10, every=2) as recorder:
+            for t in range(5):
+                chemicals.search[1, 2] = t
+                nest.food = 10 * t
+                recorder.record(t, chemicals, nest)
+
+        frames = load_frames(self.path)
+        self.assertEqual(frames['ticks'].tolist(), [0, 2, 4])
+        self.assertEqual(frames['nest_food'].tolist(), [0, 20, 40])
+        self.assertEqual(frames['search'].shape, (3, 4, 5))
+        self.assertEqual(frames['search'][:, 1, 2].tolist(), [0, 2, 4])
+
+    def test_snapshots_do_not_change_with_the_chemicals(self):
+        chemicals = Chemicals(size=(4, 4))
+        nest = Nest(0, 0)
+        with Recorder(self.path, chemicals, n_frames=2, every=1) as recorder:
+            recorder.record(0, chemicals, nest)
+            chemicals.food += 1
+
+        self.assertEqual(load_frames(self.path)['food'].sum(), 0)
+
+    def test_full_recorder_raises(self):
+        chemicals = Chemicals(size=(4, 4))
+        nest = Nest(0, 0)
+        with Recorder(self.path, chemicals, n_frames=1, every=1) as recorder:
+            recorder.record(0, chemicals, nest)
+            with self.assertRaises(IndexError):
+                recorder.record(1, chemicals, nest)
+
+    def test_run_records_and_render_draws_each_frame(self):
+        colony = build_colony(3, size=(20, 20), seed=1)
+        with Recorder(self.path, colony.chemicals, n_frames=3) as recorder:
+            run(25, colony, recorder=recorder)
+
+        images = os.path.join(self.directory.name, 'images')
+        written = render(self.path, out_dir=images, processes=1)
+
+        self.assertEqual(
+            [os.path.basename(p) for p in written],
+            ['0.png', '10.png', '20.png']
+        )
+        self.assertTrue(all(os.path.exists(p) for p in written))
+        self.assertTrue(np.all(load_frames(self.path)['search'][1] > 0))
@@ -0,0 +1,81 @@
+import json
+from unittest import TestCase
+
+import numpy as np
+
+from core.ant import Chemicals, Nest
+from core.colony import Colony
+from core.streams import RandomStream
+from experiments.image_search_strategies import build_ants
+
+
+class TestRandomStream(TestCase):
+
+    def test_blocks_follow_the_generator(self):
+        stream = RandomStream(1, block=4)
+        expected = np.random.Generator(
+            np.random.PCG64(np.random.SeedSequence(1))
+        ).random(11)
+
+        values = [stream.random()] + stream.random((2, 3)).ravel().tolist()
+        values += [stream.random() for _ in range(4)]
+
+        np.testing.assert_array_equal(values, expected)
+
+    def test_spawned_streams_do_not_depend_on_their_number(self):
+        few = RandomStream(1).spawn(2)
+        many = RandomStream(1).spawn(5)
+
+        self.assertEqual(few[1].random(), many[1].random())
+        self.assertNotEqual(many[0].random(), many[1].random())
+
+    def test_state_round_trip(self):
+        stream = RandomStream(2, block=8)
+        stream.random(5)
+        state = json.loads(json.dumps(stream.state()))
+
+        restored = RandomStream.from_state(state)
+
+        np.testing.assert_array_equal(restored.random(20), stream.random(20))
+        self.assertEqual(
+            restored.spawn(1)[0].random(),
+            stream.spawn(1)[0].random()
+        )
+
+    def test_choice_and_integers_stay_in_range(self):
+        stream = RandomStream(3)
+        draws = [stream.choice('abc') for _ in range(300)]
+
+        self.assertEqual(set(draws), set('abc'))
+        self.assertTrue(np.all(stream.integers(3, size=100) < 3))
+
+
+class TestAntStreams(TestCase):
+
+    def test_seeded_ants_are_reproducible(self):
+        runs = []
+        for _ in range(2):
+            ants = build_ants(5, size=(30, 30), seed=7)
+            for _ in range(20):
+                for ant in ants:
+                    ant.tick()
+                ants[0].chemicals.tick()
+            runs.append([(ant.x, ant.y, ant.direction) for ant in ants])
+
+        self.assertEqual(runs[0], runs[1])
+
+    def test_a_colony_runs_like_the_first_replica_of_an_ensemble(self):
+        runs = []
+        for replicas in (None, 3):
+            colony = Colony(
+                nest=Nest(10, 10),
+                chemicals=Chemicals(size=(20, 20), replicas=replicas),
+                n_ants=6,
+                seed=5
+            )
+            for _ in range(20):
+                colony.tick()
+                colony.chemicals.tick()
+            runs.append((colony.x[:6].tolist(), colony.y[:6].tolist()))
+
+        self.assertEqual(runs[0], runs[1])
@@ -0,0 +1,50 @@
+import os
+import random
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from experiments.plot_effect_of_jump_distance import calc_coverage
+from experiments.sweep import sweep, load_sweep
+
+
+def draw(scale, seed=None):
+    return {'draw': scale * random.random(), 'seed_mod': seed % 7}
+
+
+class TestSweep(TestCase):
+
+    def test_one_row_per_run(self):
+        results = sweep(
+            draw,
+            grid={'scale': [1, 10]},
+            replicates=3,
+            processes=1
+        )
+
+        self.assertEqual(results['scale'].tolist(), [1, 1, 1, 10, 10, 10])
+        self.assertEqual(results['replicate'].tolist(), [0, 1, 2] * 2)
+        self.assertEqual(len(set(results['seed'].tolist())), 6)
+        self.assertTrue(np.all(results['seed_mod'] == results['seed'] % 7))
+
+    def test_results_do_not_depend_on_the_number_of_processes(self):
+        serial = sweep(draw, {'scale': [1, 2]}, replicates=4, processes=1)
+        parallel = sweep(draw, {'scale': [1, 2]}, replicates=4, processes=2)
+
+        np.testing.assert_array_equal(serial['draw'], parallel['draw'])
+
+    def test_results_are_saved(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'sweep.npz')
+            results = sweep(
+                calc_coverage,
+                {'jump_distance': [1, 2], 'size': [(10, 10)]},
+                replicates=2,
+                processes=1,
+                path=path
+            )
+            saved = load_sweep(path)
+
+        self.assertEqual(saved['size'].shape, (4, 2))
+        np.testing.assert_array_equal(saved['result'], results['result'])
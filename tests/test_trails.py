@@ -0,0 +1,139 @@
+from unittest import TestCase
+
+import numpy as np
+
+from core.ant import Chemicals
+from core.trails import STALE, TIE_SLOTS, TrackedLattice, TrailTable, \
+    tie_slots
+from tests.helpers import build_colony
+
+
+def fresh_masks(chemicals, lattice, highest):
+    """Every entry of a table for lattice, computed from scratch"""
+    table = TrailTable(lattice.shape, highest)
+    shape = lattice.shape
+    for direction in range(8):
+        cells = np.indices(shape).reshape(len(shape), -1)
+        replica = {} if len(shape) == 2 else {'replica': cells[0]}
+        values = chemicals.sense(
+            lattice, cells[-2], cells[-1], direction, **replica
+        )
+        table.store(
+            np.full(cells.shape[1], direction), cells[-2], cells[-1],
+            values, **replica
+        )
+    return table.masks
+
+
+class TestTrailTable(TestCase):
+
+    def test_store_records_the_slots_holding_the_extreme(self):
+        table = TrailTable((4, 4), highest=True)
+        values = np.array([[1.0, 3.0, 3.0], [2.0, 1.0, 0.0]])
+
+        masks = table.store(np.array([0, 5]), np.array([1, 2]),
+                            np.array([1, 3]), values)
+
+        self.assertEqual(masks.tolist(), [6, 1])
+        self.assertEqual(table.masks[0, 1, 1], 6)
+        self.assertEqual(table.masks[5, 2, 3], 1)
+
+    def test_invalidate_marks_the_neighbourhood_stale(self):
+        table = TrailTable((5, 5), highest=False)
+        table.masks[...] = 1
+
+        table.invalidate(0, 0)
+
+        stale = table.masks[3] == STALE
+        expected = np.zeros((5, 5), dtype=bool)
+        expected[np.ix_([4, 0, 1], [4, 0, 1])] = True
+        np.testing.assert_array_equal(stale, expected)
+
+    def test_tie_slots_picks_evenly_among_the_tied_slots(self):
+        uniforms = (np.arange(300) + 0.5) / 300
+        slots = tie_slots(np.full(300, 5, dtype=np.uint8), uniforms)
+
+        self.assertEqual(np.bincount(slots, minlength=3).tolist(),
+                         [150, 0, 150])
+        self.assertEqual(TIE_SLOTS[4].tolist()[0], 2)
+
+
+class TestTrackedLattice(TestCase):
+
+    def setUp(self):
+        self.lattice = TrackedLattice(np.zeros((6, 6)))
+        self.table = self.lattice.table(True)
+        self.table.masks[...] = 7
+
+    def test_writes_invalidate_the_cells_around_them(self):
+        self.lattice[7, 1] = 2.0
+        self.lattice.scatter_add(np.array([4]), np.array([4]), 1.0)
+
+        stale = self.table.masks[0] == STALE
+        self.assertEqual(stale.sum(), 18)
+        self.assertTrue(stale[0, 0] and stale[5, 5])
+        self.assertEqual(self.lattice[1, 1], 2.0)
+
+    def test_writing_a_slice_invalidates_everything(self):
+        self.lattice[2:4, :] = 1.0
+
+        self.assertTrue((self.table.masks == STALE).all())
+
+    def test_decay_only_invalidates_the_cells_it_clips(self):
+        self.lattice[...] = 1.0
+        self.lattice[1, 1] = 0.01
+        self.lattice[3, 3] = 0.0105
+        self.table.masks[...] = 7
+
+        self.lattice.decay(0.9, a_min=0.01, a_max=100)
+
+        self.assertEqual((self.table.masks[0] == STALE).sum(), 9)
+        self.assertEqual(self.lattice[1, 1], 0.01)
+        self.assertEqual(self.lattice[3, 3], 0.01)
+        self.assertAlmostEqual(self.lattice[0, 0], 0.9)
+
+    def test_derived_arrays_keep_no_tables(self):
+        self.assertEqual((self.lattice + 1).tables, {})
+
+
+class TestColonyTrailTables(TestCase):
+
+    def test_chemicals_only_track_search_and_found(self):
+        with self.assertRaises(ValueError):
+            Chemicals(size=(5, 5), trail_tables=('food',))
+        with self.assertRaises(ValueError):
+            Chemicals(size=(5, 5), trail_tables=('found',), lazy_decay=True)
+        with self.assertRaises(ValueError):
+            Chemicals(
+                size=(5, 5),
+                trail_tables=('found',),
+                diffusion={'found': 0.1}
+            )
+        chemicals = Chemicals(size=(5, 5), trail_tables=('found',))
+        self.assertIsInstance(chemicals.found, TrackedLattice)
+        self.assertNotIsInstance(chemicals.search, TrackedLattice)
+
+    def test_entries_agree_with_the_chemicals_after_a_run(self):
+        for replicas in (None, 3):
+            colony = build_colony(
+                trail_tables=('search', 'found'),
+                replicas=replicas
+            )
+            chemicals = colony.chemicals
+            for _ in range(60):
+                colony.tick()
+                chemicals.tick()
+                chemicals.search[chemicals.cell(10, 10)] = 20
+                chemicals.found[chemicals.cell(10, 10)] = 0
+
+            self.assertGreater(chemicals.found.sum(), 0)
+            found = chemicals.found.table(True)
+            self.assertTrue((found.masks != STALE).any())
+            for lattice in (chemicals.search, chemicals.found):
+                for highest, table in lattice.tables.items():
+                    expected = fresh_masks(chemicals, lattice, highest)
+                    stored = table.masks != STALE
+                    np.testing.assert_array_equal(
+                        table.masks[stored],
+                        expected[stored]
+                    )